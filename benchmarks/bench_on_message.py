@@ -0,0 +1,237 @@
+"""Throughput benchmark for on_message against fake Discord objects.
+
+Drives ``main.on_message`` with a realistic mix of chat, keyword triggers,
+commands and messages hitting reaction rules. REST calls are recorded by
+the fakes in ``benchmarks/fakes.py`` instead of being sent. Reports
+messages per second, p50/p99 handler latency, REST calls per message and
+memory allocated per message. Run from the repository root:
+
+    python benchmarks/bench_on_message.py
+
+Pass --min-rate and/or --max-p99 to exit non-zero when a run regresses.
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Keep cooldown writes away from the real database
+os.environ.setdefault('PORKBOT_DB_PATH', os.path.join(tempfile.mkdtemp(), 'bench.db'))
+
+import main  # noqa: E402
+from fakes import FakeChannel, FakeGuild, FakeMessage, RestRecorder  # noqa: E402
+
+CHAT = [
+    "anyone want to go mining later",
+    "gg that was a close one",
+    "lol",
+    "does anyone know when the next event is",
+    "i just found diamonds at y -58",
+    "brb dinner",
+    "who wants to trade some iron for emeralds",
+    "the nether portal near spawn is broken again",
+]
+
+KEYWORDS = ["hello", "hello everyone", "what is the ip", "the ip?", "when is the end fight", "how do i contact staff"]
+
+# (content, needs a mention, sent by a moderator)
+COMMANDS = [
+    ("?help", False, False),
+    ("?about", False, False),
+    ("?serverinfo", False, True),
+    ("?snipe", False, True),
+    ("?mute {mention} 10m spam", True, True),
+    ("?ban {mention} spam", True, False),  # permission denied
+    ("?notacommand", False, False),
+]
+
+# Words used for reaction rules; a few also appear in chat
+RULE_WORDS = ["gg", "diamonds", "pork", "chop", "nether"]
+
+
+async def build_world(members, rules, seed):
+    rng = random.Random(seed)
+    rest = RestRecorder()
+    mod_role_id = next(role_id for role_id, names in main.ROLE_PERMISSIONS.items() if '*' in names)
+    guild = FakeGuild("Porkchop SMP", rest, members=members, roles=[("Moderator", mod_role_id)])
+    channel = guild.add_text_channel('general')
+    guild.text_channels.append(FakeChannel(guild, 'mod-log', channel_id=main.MOD_LOG_CHANNEL_ID))
+    moderators = [guild.add_member(f'mod{index}', roles=[guild.get_role(mod_role_id)]) for index in range(5)]
+    users = [member for member in guild.members if not member.bot][:500]
+
+    # The mod log and guild counters look the guild up through the client
+    main.client.get_channel = guild.get_channel
+    main.guild_stats[guild.id] = main.GuildStats.from_guild(guild)
+
+    # Rules are added through ?reaction add, so a command that forgets to
+    # update the index shows up as a benchmark failure
+    main.reaction_rules.clear()
+    main.reaction_index.rebuild(main.reaction_rules)
+    for index in range(rules):
+        if index < len(RULE_WORDS):
+            target = RULE_WORDS[index]
+        elif index % 4 == 0:
+            target = rng.choice(users).mention
+        else:
+            target = f'word{index}'
+        content = f'?reaction add {target} 🐷'
+        handler, args = main.resolve_command(content)
+        await handler(FakeMessage(channel, moderators[0], content), args)
+    if rules and not main.reaction_index.emojis_for(FakeMessage(channel, users[0], f"so much {RULE_WORDS[0]}")):
+        sys.exit("FAIL: a rule added with ?reaction add does not match")
+    await check_restart(channel, moderators[0], users[0])
+    rest.reset()
+    return rest, channel, users, moderators
+
+
+async def check_restart(channel, moderator, user):
+    """Exit with a failure unless jobs created through commands survive a restart."""
+    for content in (f'?autosend {channel.id} 0m never', f'?autosend {channel.id} 1h restart check'):
+        handler, args = main.resolve_command(content)
+        await handler(FakeMessage(channel, moderator, content), args)
+    # A zero interval saved by an older version is dropped instead of stopping the load
+    main.store.set('autosend', 'zero', {'channel_id': channel.id, 'interval_seconds': 0, 'interval_str': '0m', 'content': 'never'})
+    action_id = main.schedule_action('unban', 3600, channel.guild.id, user.id)
+    job_ids = list(main.autosend_jobs)
+    if len(job_ids) != 1:
+        sys.exit("FAIL: ?autosend did not start exactly the one valid job")
+
+    # Forget everything that is only in memory and load it back from the store
+    main.store.flush()
+    for job_id in job_ids:
+        main.scheduler.cancel(('autosend', job_id))
+    main.scheduler.cancel(('action', action_id))
+    main.autosend_jobs.clear()
+    main.scheduled_actions.clear()
+    main.state_loaded = False
+    await main.load_state()
+    main.store.flush()
+    if list(main.autosend_jobs) != job_ids or action_id not in main.scheduled_actions or 'zero' in main.store.load('autosend'):
+        sys.exit("FAIL: autosend jobs or scheduled actions were not restored after a restart")
+
+    for job_id in job_ids:
+        main.stop_autosend(job_id)
+    main.scheduler.cancel(('action', action_id))
+    main.scheduled_actions.pop(action_id)
+    main.store.delete('actions', action_id)
+
+
+def build_workload(size, channel, users, moderators, ratios, seed):
+    rng = random.Random(seed)
+    chat_ratio, keyword_ratio, command_ratio = ratios
+    messages = []
+    for _ in range(size):
+        roll = rng.random()
+        author = rng.choice(users)
+        if roll < chat_ratio:
+            messages.append(FakeMessage(channel, author, rng.choice(CHAT)))
+        elif roll < chat_ratio + keyword_ratio:
+            messages.append(FakeMessage(channel, author, rng.choice(KEYWORDS)))
+        elif roll < chat_ratio + keyword_ratio + command_ratio:
+            content, needs_mention, by_moderator = rng.choice(COMMANDS)
+            target = rng.choice(users)
+            messages.append(FakeMessage(
+                channel,
+                rng.choice(moderators) if by_moderator else author,
+                content.format(mention=target.mention),
+                mentions=[target] if needs_mention else []
+            ))
+        else:
+            # Chat that mentions someone, so user-ID rules are checked too
+            target = rng.choice(users)
+            messages.append(FakeMessage(channel, author, f"{target.mention} {rng.choice(CHAT)}", mentions=[target]))
+    return messages
+
+
+async def drive(messages):
+    latencies = []
+    for message in messages:
+        start = time.perf_counter()
+        await main.on_message(message)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def measure_allocations(messages):
+    """Return (peak bytes allocated, bytes retained) per message under tracemalloc."""
+    tracemalloc.start()
+    start_size = tracemalloc.get_traced_memory()[0]
+    peak_total = 0
+    for message in messages:
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        await main.on_message(message)
+        peak_total += tracemalloc.get_traced_memory()[1] - before
+    retained = tracemalloc.get_traced_memory()[0] - start_size
+    tracemalloc.stop()
+    return peak_total / len(messages), retained / len(messages)
+
+
+async def benchmark(options):
+    rest, channel, users, moderators = await build_world(options.members, options.rules, options.seed)
+    ratios = (options.chat, options.keywords, options.commands)
+    messages = build_workload(options.messages, channel, users, moderators, ratios, options.seed)
+    warmup = build_workload(min(1000, options.messages), channel, users, moderators, ratios, options.seed + 1)
+
+    await drive(warmup)
+    rest.reset()
+
+    start = time.perf_counter()
+    latencies = await drive(messages)
+    elapsed = time.perf_counter() - start
+    calls = dict(rest.calls)
+
+    peak, retained = await measure_allocations(messages[:options.alloc_sample])
+    return elapsed, latencies, calls, peak, retained
+
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--messages', type=int, default=20_000)
+    parser.add_argument('--members', type=int, default=2_000)
+    parser.add_argument('--rules', type=int, default=200, help="number of reaction rules")
+    parser.add_argument('--chat', type=float, default=0.85, help="share of plain chat")
+    parser.add_argument('--keywords', type=float, default=0.05, help="share of keyword triggers")
+    parser.add_argument('--commands', type=float, default=0.05, help="share of commands; the rest mention users")
+    parser.add_argument('--alloc-sample', type=int, default=2_000, help="messages replayed under tracemalloc")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--min-rate', type=float, help="fail if throughput is below this many msgs/s")
+    parser.add_argument('--max-p99', type=float, help="fail if p99 latency is above this many microseconds")
+    options = parser.parse_args()
+
+    elapsed, latencies, calls, peak, retained = asyncio.run(benchmark(options))
+    main.store.close()
+
+    count = len(latencies)
+    rate = count / elapsed
+    quantiles = statistics.quantiles(latencies, n=100)
+    p50, p99 = quantiles[49] * 1e6, quantiles[98] * 1e6
+
+    print(f"messages: {count:,}, members: {options.members:,}, reaction rules: {options.rules}")
+    print(f"throughput:          {rate:>12,.0f} msgs/s")
+    print(f"latency p50 / p99:   {p50:>12.1f} / {p99:.1f} us")
+    print(f"REST calls/message:  {sum(calls.values()) / count:>12.3f}")
+    for route, total in sorted(calls.items(), key=lambda item: -item[1]):
+        print(f"  {total / count:8.3f}  {route}")
+    print(f"allocated/message:   {peak / 1024:>12.1f} KiB peak, {retained / 1024:.2f} KiB retained")
+
+    failed = False
+    if options.min_rate and rate < options.min_rate:
+        print(f"FAIL: throughput below {options.min_rate:,.0f} msgs/s")
+        failed = True
+    if options.max_p99 and p99 > options.max_p99:
+        print(f"FAIL: p99 latency above {options.max_p99:.1f} us")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,87 @@
+"""Microbenchmark for command dispatch in on_message.
+
+Compares the old linear chain of ``startswith`` checks against the command
+registry lookup in ``main.resolve_command``. Run from the repository root:
+
+    python benchmarks/bench_router.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+
+# Order of the checks in the old on_message chain
+LEGACY_PREFIXES = [
+    '?report', '?reaction', '?memcount', '?unban', '?ban', '?unmute', '?kick',
+    '?mute', '?purge', '?slowmode', '?lock', '?unlock', '?snipe',
+    '?serverinfo', '?help', '?about', '?autosend', '?autosendstop',
+]
+
+CHAT = [
+    "anyone want to go mining later",
+    "gg that was a close one",
+    "lol",
+    "does anyone know when the next event is",
+    "i just found diamonds at y -58",
+    "brb dinner",
+]
+
+COMMANDS = [
+    "?ban 123456789012345678 spam",
+    "?mute @user 10m spam",
+    "?unmute @user",
+    "?autosendstop 123456789012345678",
+    "?serverinfo",
+    "?notacommand",
+]
+
+
+def legacy_dispatch(content):
+    """Replicate the old chain: every message walks every check."""
+    matched = []
+    for prefix in LEGACY_PREFIXES:
+        if content.startswith(prefix):
+            matched.append(prefix)
+    if content == '?nuke':
+        matched.append('?nuke')
+    return matched
+
+
+def registry_dispatch(content):
+    handler, _ = main.resolve_command(content)
+    return handler
+
+
+def build_workload(size, command_ratio, seed=0):
+    rng = random.Random(seed)
+    return [
+        rng.choice(COMMANDS) if rng.random() < command_ratio else rng.choice(CHAT)
+        for _ in range(size)
+    ]
+
+
+def measure(func, workload, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for content in workload:
+            func(content)
+        best = min(best, time.perf_counter() - start)
+    return len(workload) / best
+
+
+def run():
+    workload = build_workload(200_000, command_ratio=0.05)
+    before = measure(legacy_dispatch, workload)
+    after = measure(registry_dispatch, workload)
+    print(f"legacy startswith chain: {before:>14,.0f} msgs/s")
+    print(f"command registry:        {after:>14,.0f} msgs/s")
+    print(f"speedup:                 {after / before:>14.1f}x")
+
+
+if __name__ == '__main__':
+    run()
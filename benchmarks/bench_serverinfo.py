@@ -0,0 +1,98 @@
+"""Benchmark ?serverinfo on a synthetic 100k-member guild.
+
+Compares rebuilding the embed from full member scans (the old handler)
+against the cached GuildStats embed, with a member joining every
+``--churn`` calls to include invalidation. Run from the repository root:
+
+    python benchmarks/bench_serverinfo.py
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import discord  # noqa: E402
+
+import main  # noqa: E402
+
+
+def build_guild(members, bot_ratio=0.02):
+    bot_every = int(1 / bot_ratio)
+    owner = SimpleNamespace(id=1, mention='<@1>', bot=False)
+    return SimpleNamespace(
+        id=1083270436349018163,
+        name="Porkchop SMP",
+        owner=owner,
+        owner_id=owner.id,
+        created_at=datetime(2023, 3, 13, tzinfo=timezone.utc),
+        members=[SimpleNamespace(id=i, bot=(i % bot_every == 0)) for i in range(members)],
+        member_count=members,
+        chunked=True,
+        text_channels=[object()] * 60,
+        voice_channels=[object()] * 12,
+        categories=[object()] * 10,
+        roles=[object()] * 80,
+        features=['COMMUNITY', 'NEWS'],
+        icon=None,
+    )
+
+
+def legacy_serverinfo(guild):
+    """The old handler: scan every member and build a fresh embed."""
+    total_members = len(guild.members)
+    bot_count = sum(1 for member in guild.members if member.bot)
+    stats = main.GuildStats(
+        humans=total_members - bot_count,
+        bots=bot_count,
+        text_channels=len(guild.text_channels),
+        voice_channels=len(guild.voice_channels),
+        categories=len(guild.categories),
+        roles=len(guild.roles),
+    )
+    return main.build_serverinfo_embed(guild, stats)
+
+
+def measure(func, calls):
+    start = time.perf_counter()
+    for i in range(calls):
+        func(i)
+    return time.perf_counter() - start
+
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--members', type=int, default=100_000)
+    parser.add_argument('--calls', type=int, default=200)
+    parser.add_argument('--churn', type=int, default=10, help="a member joins every N calls")
+    options = parser.parse_args()
+
+    guild = build_guild(options.members)
+
+    seed_start = time.perf_counter()
+    stats = main.GuildStats.from_guild(guild)
+    seed_time = time.perf_counter() - seed_start
+
+    joiner = SimpleNamespace(bot=False)
+
+    def cached(i):
+        if i % options.churn == 0:
+            stats.member_joined(joiner)
+        stats.embed(guild)
+
+    legacy = measure(lambda i: legacy_serverinfo(guild), options.calls)
+    incremental = measure(cached, options.calls)
+
+    assert isinstance(stats.embed(guild), discord.Embed)
+    print(f"guild: {options.members:,} members, {options.calls} calls, join every {options.churn} calls")
+    print(f"one-time seed:           {seed_time * 1000:10.2f} ms")
+    print(f"legacy scan per call:    {legacy / options.calls * 1e6:10.1f} us")
+    print(f"incremental per call:    {incremental / options.calls * 1e6:10.1f} us")
+    print(f"speedup:                 {legacy / incremental:10.1f}x")
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,184 @@
+"""Lightweight stand-ins for discord.py objects used by the benchmarks.
+
+The fakes carry only the attributes and coroutines the bot's handlers touch.
+Every call that would reach Discord's REST API is counted by a RestRecorder
+instead of being sent, so benchmarks can report REST calls per message.
+"""
+import asyncio
+import itertools
+from collections import Counter
+from datetime import datetime, timezone
+
+# Snowflake-sized IDs, so handlers that parse IDs from text accept them
+_ids = itertools.count(1083270436349018163)
+
+
+def next_id():
+    return next(_ids)
+
+
+class RestRecorder:
+    """Counts REST calls by name; optionally waits to mimic network latency."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = Counter()
+
+    def __len__(self):
+        return sum(self.calls.values())
+
+    async def call(self, name, result=None):
+        self.calls[name] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return result
+
+    def reset(self):
+        self.calls.clear()
+
+
+class FakeRole:
+    def __init__(self, name, role_id=None, bot_managed=False):
+        self.id = role_id or next_id()
+        self.name = name
+        self.mention = f'<@&{self.id}>'
+        self._bot_managed = bot_managed
+
+    def is_bot_managed(self):
+        return self._bot_managed
+
+
+class FakeMember:
+    def __init__(self, guild, name, roles=(), bot=False, member_id=None):
+        self.id = member_id or next_id()
+        self.guild = guild
+        self.name = name
+        self.display_name = name
+        self.mention = f'<@{self.id}>'
+        self.bot = bot
+        self.roles = list(roles)
+
+    def __str__(self):
+        return self.name
+
+    async def timeout(self, until, reason=None):
+        await self.guild.rest.call('PATCH /guilds/{guild_id}/members/{user_id}')
+
+    async def add_roles(self, *roles, reason=None):
+        for _ in roles:
+            await self.guild.rest.call('PUT /guilds/{guild_id}/members/{user_id}/roles/{role_id}')
+
+    async def remove_roles(self, *roles, reason=None):
+        for _ in roles:
+            await self.guild.rest.call('DELETE /guilds/{guild_id}/members/{user_id}/roles/{role_id}')
+
+
+class FakeChannel:
+    def __init__(self, guild, name, channel_id=None):
+        self.id = channel_id or next_id()
+        self.guild = guild
+        self.name = name
+        self.mention = f'<#{self.id}>'
+
+    async def send(self, content=None, **kwargs):
+        await self.guild.rest.call('POST /channels/{channel_id}/messages')
+        return FakeMessage(self, self.guild.me, content or '')
+
+    async def fetch_message(self, message_id):
+        return await self.guild.rest.call('GET /channels/{channel_id}/messages/{message_id}')
+
+    async def edit(self, **kwargs):
+        await self.guild.rest.call('PATCH /channels/{channel_id}')
+
+    async def set_permissions(self, target, **kwargs):
+        await self.guild.rest.call('PUT /channels/{channel_id}/permissions/{overwrite_id}')
+
+
+class FakeMessage:
+    def __init__(self, channel, author, content, mentions=(), role_mentions=()):
+        self.id = next_id()
+        self.channel = channel
+        self.guild = channel.guild
+        self.author = author
+        self.content = content
+        self.mentions = list(mentions)
+        self.role_mentions = list(role_mentions)
+        self.attachments = []
+        self.reference = None
+        self.created_at = datetime.now(timezone.utc)
+
+    async def add_reaction(self, emoji):
+        await self.guild.rest.call('PUT /channels/{channel_id}/messages/{message_id}/reactions/{emoji}/@me')
+
+    async def delete(self, delay=None):
+        await self.guild.rest.call('DELETE /channels/{channel_id}/messages/{message_id}')
+
+    async def edit(self, **kwargs):
+        await self.guild.rest.call('PATCH /channels/{channel_id}/messages/{message_id}')
+        return self
+
+
+class FakeGuild:
+    def __init__(self, name, rest, members=0, bot_ratio=0.02, roles=()):
+        self.id = next_id()
+        self.name = name
+        self.rest = rest
+        self.created_at = datetime(2023, 3, 13, tzinfo=timezone.utc)
+        self.features = ['COMMUNITY']
+        self.icon = None
+        self.default_role = FakeRole('@everyone', role_id=self.id)
+        self.roles = [self.default_role] + [FakeRole(name, role_id) for name, role_id in roles]
+        self.text_channels = []
+        self.voice_channels = []
+        self.categories = []
+        self._members = {}
+        self.me = self.add_member('PorkBot', bot=True)
+        self.owner = self.add_member('Owner')
+        self.owner_id = self.owner.id
+
+        bot_every = int(1 / bot_ratio) if bot_ratio else 0
+        for index in range(members):
+            self.add_member(f'member{index}', bot=bool(bot_every) and index % bot_every == 0)
+
+    @property
+    def members(self):
+        return list(self._members.values())
+
+    @property
+    def member_count(self):
+        return len(self._members)
+
+    @property
+    def chunked(self):
+        return True
+
+    def add_member(self, name, roles=(), bot=False):
+        member = FakeMember(self, name, roles, bot)
+        self._members[member.id] = member
+        return member
+
+    def add_text_channel(self, name):
+        channel = FakeChannel(self, name)
+        self.text_channels.append(channel)
+        return channel
+
+    def get_member(self, member_id):
+        return self._members.get(member_id)
+
+    def get_role(self, role_id):
+        return next((role for role in self.roles if role.id == role_id), None)
+
+    def get_channel(self, channel_id):
+        return next((channel for channel in self.text_channels if channel.id == channel_id), None)
+
+    async def fetch_member(self, member_id):
+        return await self.rest.call('GET /guilds/{guild_id}/members/{user_id}', self._members.get(member_id))
+
+    async def ban(self, user, reason=None, **kwargs):
+        await self.rest.call('PUT /guilds/{guild_id}/bans/{user_id}')
+
+    async def unban(self, user, reason=None):
+        await self.rest.call('DELETE /guilds/{guild_id}/bans/{user_id}')
+
+    async def kick(self, user, reason=None):
+        await self.rest.call('DELETE /guilds/{guild_id}/members/{user_id}')
@@ -0,0 +1,560 @@
+"""Local stand-in for Discord's gateway and REST API, for end-to-end load tests.
+
+Starts an aiohttp server that speaks enough of the gateway (HELLO, IDENTIFY,
+READY, GUILD_CREATE, member chunking, heartbeats) and the REST API for the
+bot to log in and run. The bot runs as its own process, pointed at the mock
+through DISCORD_API_BASE and DISCORD_GATEWAY_URL. REST routes answer with
+Discord-style rate-limit headers and 429s. A scripted scenario then sends
+traffic through the gateway, and the mock reports how long the bot took to
+reply. Run from the repository root:
+
+    python benchmarks/mock_discord.py --scenario help_flood --rate 200 --duration 10
+
+Use --no-spawn to only serve the mock and start the bot yourself.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict, deque
+from datetime import datetime, timezone
+
+from aiohttp import web
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import main  # noqa: E402  (for role IDs and the mod-log channel)
+
+DISCORD_EPOCH = 1420070400000
+HEARTBEAT_INTERVAL = 41250  # milliseconds, as Discord sends
+CHUNK_SIZE = 1000  # members per GUILD_MEMBERS_CHUNK
+
+# (method, route template) -> (requests, per seconds); others use DEFAULT_RATE_LIMIT
+RATE_LIMITS = {
+    ('POST', '/channels/{channel_id}/messages'): (5, 5.0),
+    ('PUT', '/channels/{channel_id}/messages/{message_id}/reactions/{emoji}/@me'): (1, 0.25),
+    ('DELETE', '/channels/{channel_id}/messages/{message_id}'): (5, 1.0),
+    ('PATCH', '/channels/{channel_id}'): (2, 600.0),
+}
+DEFAULT_RATE_LIMIT = (50, 1.0)
+
+# Route parameters that get their own bucket, as on Discord
+MAJOR_PARAMETERS = ('channel_id', 'guild_id', 'webhook_id')
+
+CHAT = [
+    "anyone want to go mining later",
+    "gg that was a close one",
+    "lol",
+    "does anyone know when the next event is",
+    "i just found diamonds at y -58",
+    "brb dinner",
+]
+
+_sequence = itertools.count()
+
+
+def snowflake(at=None):
+    """Return a snowflake ID whose timestamp is the given Unix time (default now)."""
+    milliseconds = int((time.time() if at is None else at) * 1000) - DISCORD_EPOCH
+    return (milliseconds << 22) | (next(_sequence) & 0x3FFFFF)
+
+
+def iso_now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def user_payload(user_id, name, bot=False):
+    return {'id': str(user_id), 'username': name, 'global_name': name, 'discriminator': '0', 'avatar': None, 'bot': bot}
+
+
+def member_payload(user, roles=()):
+    return {'user': user, 'roles': [str(role_id) for role_id in roles], 'joined_at': iso_now(), 'deaf': False, 'mute': False, 'flags': 0}
+
+
+def message_payload(message_id, channel_id, guild_id, author, content='', member=None, embeds=()):
+    payload = {
+        'id': str(message_id), 'channel_id': str(channel_id), 'guild_id': str(guild_id),
+        'author': author, 'content': content, 'timestamp': iso_now(), 'edited_timestamp': None,
+        'tts': False, 'mention_everyone': False, 'mentions': [], 'mention_roles': [],
+        'attachments': [], 'embeds': list(embeds), 'pinned': False, 'type': 0, 'flags': 0,
+    }
+    if member:
+        payload['member'] = member
+    return payload
+
+
+def json_response(data, status=200, headers=None):
+    # discord.py only parses bodies whose Content-Type is exactly application/json
+    return web.Response(body=json.dumps(data).encode(), status=status, headers={**(headers or {}), 'Content-Type': 'application/json'})
+
+
+class RateLimiter:
+    """Fixed-window buckets per route and major parameter, answered with Discord's headers."""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._windows = {}  # bucket key -> [window reset time, remaining]
+
+    def check(self, method, template, params):
+        """Return (allowed, headers) for one request."""
+        limit, per = RATE_LIMITS.get((method, template), DEFAULT_RATE_LIMIT)
+        major = tuple(params.get(name) for name in MAJOR_PARAMETERS)
+        key = (method, template, major)
+        now = time.time()
+        window = self._windows.get(key)
+        if window is None or window[0] <= now:
+            window = self._windows[key] = [now + per, limit]
+
+        allowed = not self.enabled or window[1] > 0
+        if allowed:
+            window[1] = max(window[1] - 1, 0)
+        reset_after = window[0] - now
+        headers = {
+            'X-RateLimit-Limit': str(limit),
+            'X-RateLimit-Remaining': str(window[1]),
+            'X-RateLimit-Reset': f'{window[0]:.3f}',
+            'X-RateLimit-Reset-After': f'{reset_after:.3f}',
+            'X-RateLimit-Bucket': f'{abs(hash((method, template))):x}',
+        }
+        if not allowed:
+            # discord.py treats a 429 without Via as a Cloudflare ban and gives up
+            headers['Via'] = '1.1 google'
+            headers['X-RateLimit-Scope'] = 'user'
+            headers['Retry-After'] = str(max(1, int(reset_after + 0.999)))
+        return allowed, headers
+
+
+class MockDiscord:
+    """One guild served over a mock gateway and REST API."""
+
+    def __init__(self, members=1000, channels=10, moderators=5, history=2000, rate_limits=True):
+        self.rate_limiter = RateLimiter(rate_limits)
+        self.started = time.perf_counter()
+        self.url = None
+
+        self.bot_user = user_payload(snowflake(time.time() - 86400 * 365), 'PorkBot', bot=True)
+        self.guild_id = snowflake(time.time() - 86400 * 365)
+        self.mod_role_id = next(role_id for role_id, names in main.ROLE_PERMISSIONS.items() if '*' in names)
+        self.roles = [
+            {'id': str(self.guild_id), 'name': '@everyone', 'permissions': '0', 'position': 0},
+            {'id': str(self.mod_role_id), 'name': 'Moderator', 'permissions': '8', 'position': 1},
+        ]
+        for role in self.roles:
+            role.update({'color': 0, 'hoist': False, 'managed': False, 'mentionable': False})
+
+        self.channel_ids = [snowflake() for _ in range(channels)]
+        channel_payloads = [
+            {'id': str(channel_id), 'type': 0, 'name': f'channel-{index}', 'position': index, 'permission_overwrites': []}
+            for index, channel_id in enumerate(self.channel_ids)
+        ]
+        channel_payloads.append({
+            'id': str(main.MOD_LOG_CHANNEL_ID), 'type': 0, 'name': 'mod-log',
+            'position': channels, 'permission_overwrites': []
+        })
+        self.channel_payloads = channel_payloads
+
+        joined = time.time() - 86400 * 30
+        self.members = [member_payload(self.bot_user)]
+        for index in range(members):
+            user = user_payload(snowflake(joined), f'member{index}', bot=index % 50 == 49)
+            roles = [self.mod_role_id] if index < moderators else []
+            self.members.append(member_payload(user, roles))
+        self.moderators = self.members[1:moderators + 1]
+        self.regulars = [member for member in self.members[moderators + 1:] if not member['user']['bot']]
+        self.history = {channel_id: history for channel_id in self.channel_ids}
+
+        # Gateway state
+        self.socket = None
+        self.sequence = 0
+        self.identified_at = None
+        self.ready = asyncio.Event()
+        self.ready_at = None
+
+        # Measurements
+        self.rest_calls = Counter()
+        self.rate_limited = Counter()
+        self.pending_replies = defaultdict(deque)  # channel ID -> send times awaiting a reply
+        self.latencies = []
+        self.route_times = defaultdict(list)  # route -> perf_counter times of each call
+        self.last_rest_at = time.perf_counter()
+
+        self.app = web.Application(middlewares=[self.rest_middleware])
+        self.app.router.add_get('/gateway', self.handle_gateway)
+        api = [
+            ('GET', '/users/@me', self.get_current_user),
+            ('GET', '/oauth2/applications/@me', self.get_application),
+            ('GET', '/gateway', self.get_gateway),
+            ('GET', '/gateway/bot', self.get_gateway),
+            ('POST', '/channels/{channel_id}/messages', self.create_message),
+            ('GET', '/channels/{channel_id}/messages', self.get_history),
+            ('POST', '/channels/{channel_id}/messages/bulk-delete', self.bulk_delete),
+            ('GET', '/channels/{channel_id}/messages/{message_id}', self.get_message),
+            ('PATCH', '/channels/{channel_id}/messages/{message_id}', self.edit_message),
+            ('DELETE', '/channels/{channel_id}/messages/{message_id}', self.delete_message),
+            ('GET', '/guilds/{guild_id}/members/{user_id}', self.get_member),
+            ('PATCH', '/guilds/{guild_id}/members/{user_id}', self.edit_member),
+        ]
+        for method, path, handler in api:
+            self.app.router.add_route(method, '/api/v10' + path, handler)
+        self.app.router.add_route('*', '/api/v10/{tail:.*}', self.no_content)
+
+    # REST
+
+    @web.middleware
+    async def rest_middleware(self, request, handler):
+        if not request.path.startswith('/api/'):
+            return await handler(request)
+        resource = request.match_info.route.resource
+        template = resource.canonical[len('/api/v10'):] if resource else request.path
+        if template == '/{tail}':
+            # Unknown routes are bucketed by their path with IDs removed
+            template = re.sub(r'/\d+', '/{id}', request.path[len('/api/v10'):])
+        route = f'{request.method} {template}'
+        self.rest_calls[route] += 1
+        self.last_rest_at = time.perf_counter()
+        self.route_times[route].append(self.last_rest_at)
+
+        allowed, headers = self.rate_limiter.check(request.method, template, request.match_info)
+        if not allowed:
+            self.rate_limited[route] += 1
+            body = {'message': 'You are being rate limited.', 'retry_after': float(headers['X-RateLimit-Reset-After']), 'global': False}
+            return json_response(body, status=429, headers=headers)
+        response = await handler(request)
+        response.headers.update(headers)
+        return response
+
+    async def read_json(self, request):
+        if request.content_type == 'application/json':
+            return await request.json()
+        if request.content_type.startswith('multipart/'):
+            form = await request.post()
+            return json.loads(form.get('payload_json', '{}'))
+        return {}
+
+    async def get_current_user(self, request):
+        return json_response(self.bot_user)
+
+    async def get_application(self, request):
+        return json_response({
+            'id': self.bot_user['id'], 'name': 'PorkBot', 'icon': None, 'description': '', 'verify_key': '',
+            'bot_public': False, 'bot_require_code_grant': False, 'owner': self.bot_user, 'flags': 0,
+        })
+
+    async def get_gateway(self, request):
+        return json_response({
+            'url': f'{self.url.replace("http", "ws")}/gateway', 'shards': 1,
+            'session_start_limit': {'total': 1000, 'remaining': 1000, 'reset_after': 0, 'max_concurrency': 1},
+        })
+
+    async def create_message(self, request):
+        channel_id = int(request.match_info['channel_id'])
+        pending = self.pending_replies.get(channel_id)
+        if pending:
+            self.latencies.append(time.perf_counter() - pending.popleft())
+
+        body = await self.read_json(request)
+        embeds = body.get('embeds') or ([body['embed']] if body.get('embed') else [])
+        payload = message_payload(snowflake(), channel_id, self.guild_id, self.bot_user, body.get('content') or '', embeds=embeds)
+        # Discord echoes the bot's own messages back through the gateway
+        await self.dispatch('MESSAGE_CREATE', payload)
+        return json_response(payload)
+
+    async def get_history(self, request):
+        channel_id = int(request.match_info['channel_id'])
+        limit = min(int(request.query.get('limit', 50)), 100)
+        before = int(request.query.get('before', snowflake()))
+        count = min(limit, self.history.get(channel_id, 0))
+        self.history[channel_id] = self.history.get(channel_id, 0) - count
+        author = self.regulars[0]['user'] if self.regulars else self.bot_user
+        messages = [
+            message_payload(before - (index + 1) * (1 << 22) * 1000, channel_id, self.guild_id, author, random.choice(CHAT))
+            for index in range(count)
+        ]
+        return json_response(messages)
+
+    async def bulk_delete(self, request):
+        body = await self.read_json(request)
+        await self.dispatch('MESSAGE_DELETE_BULK', {
+            'ids': body.get('messages', []), 'channel_id': request.match_info['channel_id'], 'guild_id': str(self.guild_id)
+        })
+        return web.Response(status=204)
+
+    async def get_message(self, request):
+        channel_id = int(request.match_info['channel_id'])
+        author = self.regulars[0]['user'] if self.regulars else self.bot_user
+        return json_response(message_payload(request.match_info['message_id'], channel_id, self.guild_id, author, 'hello'))
+
+    async def edit_message(self, request):
+        body = await self.read_json(request)
+        payload = message_payload(
+            request.match_info['message_id'], request.match_info['channel_id'], self.guild_id,
+            self.bot_user, body.get('content') or '', embeds=body.get('embeds') or []
+        )
+        return json_response(payload)
+
+    async def delete_message(self, request):
+        await self.dispatch('MESSAGE_DELETE', {
+            'id': request.match_info['message_id'], 'channel_id': request.match_info['channel_id'], 'guild_id': str(self.guild_id)
+        })
+        return web.Response(status=204)
+
+    async def get_member(self, request):
+        user_id = request.match_info['user_id']
+        member = next((member for member in self.members if member['user']['id'] == user_id), None)
+        if member is None:
+            return json_response({'message': 'Unknown Member', 'code': 10007}, status=404)
+        return json_response(member)
+
+    async def edit_member(self, request):
+        body = await self.read_json(request)
+        member = member_payload(user_payload(request.match_info['user_id'], 'member'))
+        member['communication_disabled_until'] = body.get('communication_disabled_until')
+        return json_response(member)
+
+    async def no_content(self, request):
+        return web.Response(status=204)
+
+    # Gateway
+
+    async def dispatch(self, event, data):
+        if self.socket is None or self.socket.closed:
+            return
+        self.sequence += 1
+        await self.socket.send_str(json.dumps({'op': 0, 't': event, 's': self.sequence, 'd': data}))
+
+    def guild_payload(self):
+        # Like Discord for large guilds, only the bot and moderators come inline
+        inline = [self.members[0]] + self.moderators
+        return {
+            'id': str(self.guild_id), 'name': 'Porkchop SMP', 'icon': None, 'owner_id': self.moderators[0]['user']['id'] if self.moderators else self.bot_user['id'],
+            'roles': self.roles, 'channels': self.channel_payloads, 'members': inline, 'member_count': len(self.members),
+            'large': len(self.members) > 250, 'features': [], 'emojis': [], 'stickers': [], 'voice_states': [],
+            'presences': [], 'threads': [], 'stage_instances': [], 'guild_scheduled_events': [],
+            'unavailable': False, 'premium_tier': 0, 'joined_at': iso_now(),
+        }
+
+    async def handle_gateway(self, request):
+        socket = web.WebSocketResponse(max_msg_size=0)
+        await socket.prepare(request)
+        await socket.send_str(json.dumps({'op': 10, 's': None, 't': None, 'd': {'heartbeat_interval': HEARTBEAT_INTERVAL}}))
+
+        async for message in socket:
+            payload = json.loads(message.data)
+            op = payload['op']
+            if op == 1:
+                await socket.send_str(json.dumps({'op': 11, 's': None, 't': None, 'd': None}))
+            elif op in (2, 6):
+                # Resumes are refused, so the bot identifies again
+                if op == 6:
+                    await socket.send_str(json.dumps({'op': 9, 's': None, 't': None, 'd': False}))
+                    continue
+                self.socket = socket
+                self.sequence = 0
+                self.identified_at = time.perf_counter()
+                await self.dispatch('READY', {
+                    'v': 10, 'user': self.bot_user, 'guilds': [{'id': str(self.guild_id), 'unavailable': True}],
+                    'session_id': 'mock-session', 'resume_gateway_url': f'{self.url.replace("http", "ws")}/gateway',
+                    'shard': payload['d'].get('shard', [0, 1]), 'application': {'id': self.bot_user['id'], 'flags': 0},
+                    'private_channels': [], 'relationships': [],
+                })
+                await self.dispatch('GUILD_CREATE', self.guild_payload())
+            elif op == 8:
+                await self.send_member_chunks(payload['d'])
+            elif op == 3 and not self.ready.is_set():
+                # The bot sets its presence in on_ready
+                self.ready_at = time.perf_counter()
+                self.ready.set()
+        return socket
+
+    async def send_member_chunks(self, request):
+        chunks = [self.members[index:index + CHUNK_SIZE] for index in range(0, len(self.members), CHUNK_SIZE)]
+        for index, members in enumerate(chunks):
+            await self.dispatch('GUILD_MEMBERS_CHUNK', {
+                'guild_id': request['guild_id'], 'members': members, 'chunk_index': index,
+                'chunk_count': len(chunks), 'nonce': request.get('nonce'),
+            })
+
+    # Traffic
+
+    async def send_message(self, author, content, channel_id=None, expect_reply=False):
+        """Deliver a MESSAGE_CREATE from a member; optionally time the bot's reply."""
+        channel_id = channel_id or random.choice(self.channel_ids)
+        if expect_reply:
+            self.pending_replies[channel_id].append(time.perf_counter())
+        await self.dispatch('MESSAGE_CREATE', message_payload(
+            snowflake(), channel_id, self.guild_id, author['user'], content,
+            member={key: value for key, value in author.items() if key != 'user'}
+        ))
+
+    async def add_member(self, name):
+        user = user_payload(snowflake(), name)
+        member = member_payload(user)
+        self.members.append(member)
+        await self.dispatch('GUILD_MEMBER_ADD', dict(member, guild_id=str(self.guild_id)))
+        return member
+
+
+async def paced(rate, duration, send):
+    """Call send(index) rate times per second for duration seconds; returns the count sent."""
+    start = time.perf_counter()
+    total = int(rate * duration)
+    for index in range(total):
+        delay = start + index / rate - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        await send(index)
+    return total
+
+
+async def scenario_chat(mock, options):
+    """Regular chat, with an ?about probe every 20 messages to time replies."""
+    async def send(index):
+        author = random.choice(mock.regulars)
+        if index % 20 == 0:
+            await mock.send_message(author, '?about', expect_reply=True)
+        else:
+            await mock.send_message(author, random.choice(CHAT))
+    return await paced(options.rate, options.duration, send)
+
+
+async def scenario_help_flood(mock, options):
+    """Members spamming ?help across every channel."""
+    async def send(index):
+        await mock.send_message(random.choice(mock.regulars), '?help', expect_reply=True)
+    return await paced(options.rate, options.duration, send)
+
+
+async def scenario_raid(mock, options):
+    """Accounts join and spam, then moderators mass-ban them."""
+    raiders = []
+
+    async def join_and_spam(index):
+        raider = await mock.add_member(f'raider{index}')
+        raiders.append(raider)
+        await mock.send_message(raider, 'hello hello JOIN MY SERVER discord.gg/spam')
+
+    sent = await paced(options.rate, options.duration, join_and_spam)
+
+    # At most 90 IDs per command keeps each message under Discord's 2000 characters
+    moderator = mock.moderators[0]
+    for index in range(0, len(raiders), 90):
+        ids = ' '.join(raider['user']['id'] for raider in raiders[index:index + 90])
+        await mock.send_message(moderator, f'?massban {ids} raid', channel_id=mock.channel_ids[0], expect_reply=True)
+    return sent + (len(raiders) + 89) // 90
+
+
+async def scenario_purge_storm(mock, options):
+    """Moderators purging every channel at once, repeatedly."""
+    async def send(index):
+        channel_id = mock.channel_ids[index % len(mock.channel_ids)]
+        await mock.send_message(random.choice(mock.moderators), f'?purge {options.purge_amount}', channel_id=channel_id, expect_reply=True)
+    return await paced(options.rate, options.duration, send)
+
+
+SCENARIOS = {
+    'chat': scenario_chat,
+    'help_flood': scenario_help_flood,
+    'raid': scenario_raid,
+    'purge_storm': scenario_purge_storm,
+}
+
+
+def spawn_bot(mock, options):
+    data_dir = tempfile.mkdtemp()
+    env = dict(
+        os.environ,
+        DISCORD_TOKEN='mock-token',
+        DISCORD_API_BASE=f'{mock.url}/api/v10',
+        DISCORD_GATEWAY_URL=f'{mock.url.replace("http", "ws")}/gateway',
+        PORKBOT_DB_PATH=os.path.join(data_dir, 'porkbot.db'),
+        PERF_LOG_PATH=os.path.join(data_dir, 'perf.log'),
+        MEMBER_CACHE_POLICY=options.member_cache,
+    )
+    return asyncio.create_subprocess_exec(sys.executable, os.path.join(ROOT, 'main.py'), env=env)
+
+
+def summarize(mock, sent, elapsed, login):
+    print(f"events sent:         {sent:,} in {elapsed:.1f}s ({sent / elapsed:,.0f}/s)")
+    if login is not None:
+        print(f"login to ready:      {login:.2f}s ({len(mock.members):,} members chunked)")
+    if mock.latencies:
+        latencies = sorted(mock.latencies)
+        p50 = statistics.median(latencies)
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        print(f"replies timed:       {len(latencies):,}")
+        print(f"reply latency:       p50 {p50 * 1000:.1f} ms, p99 {p99 * 1000:.1f} ms, max {latencies[-1] * 1000:.1f} ms")
+    unanswered = sum(len(pending) for pending in mock.pending_replies.values())
+    if unanswered:
+        print(f"unanswered:          {unanswered:,}")
+    print("REST calls (429s):")
+    for route, count in mock.rest_calls.most_common():
+        times = mock.route_times[route]
+        span = times[-1] - times[0] if len(times) > 1 else 0
+        rate = f", {count / span:,.1f}/s" if span else ""
+        print(f"  {count:8,} ({mock.rate_limited[route]:,}{rate})  {route}")
+
+
+async def run(options):
+    mock = MockDiscord(options.members, options.channels, options.moderators, options.history, not options.no_rate_limits)
+    runner = web.AppRunner(mock.app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, options.host, options.port).start()
+    mock.url = f'http://{options.host}:{options.port}'
+    print(f"Mock Discord listening on {mock.url} (gateway {mock.url.replace('http', 'ws')}/gateway)")
+
+    bot = None
+    spawned_at = time.perf_counter()
+    if not options.no_spawn:
+        bot = await spawn_bot(mock, options)
+    try:
+        await asyncio.wait_for(mock.ready.wait(), options.ready_timeout)
+        login = mock.ready_at - spawned_at if bot else None
+
+        start = time.perf_counter()
+        sent = await SCENARIOS[options.scenario](mock, options)
+        elapsed = time.perf_counter() - start
+
+        # Give the bot time to answer what is still queued and finish follow-up calls
+        deadline = time.perf_counter() + options.drain
+        while time.perf_counter() < deadline:
+            if not any(mock.pending_replies.values()) and time.perf_counter() - mock.last_rest_at > 1:
+                break
+            await asyncio.sleep(0.1)
+        summarize(mock, sent, elapsed, login)
+    finally:
+        if bot and bot.returncode is None:
+            bot.terminate()
+            await bot.wait()
+        await runner.cleanup()
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scenario', choices=sorted(SCENARIOS), default='chat')
+    parser.add_argument('--rate', type=float, default=100, help="events per second")
+    parser.add_argument('--duration', type=float, default=10, help="seconds of traffic")
+    parser.add_argument('--members', type=int, default=10_000)
+    parser.add_argument('--channels', type=int, default=20)
+    parser.add_argument('--moderators', type=int, default=5)
+    parser.add_argument('--history', type=int, default=2_000, help="messages available to purge per channel")
+    parser.add_argument('--purge-amount', type=int, default=100)
+    parser.add_argument('--member-cache', default='full', help="MEMBER_CACHE_POLICY for the spawned bot")
+    parser.add_argument('--no-rate-limits', action='store_true', help="never answer with 429")
+    parser.add_argument('--no-spawn', action='store_true', help="do not start main.py; wait for an external bot")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--ready-timeout', type=float, default=120)
+    parser.add_argument('--drain', type=float, default=30, help="seconds to wait for outstanding replies")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main_cli()
@@ -0,0 +1,235 @@
+"""Replay a gateway capture through the bot's event handlers.
+
+Captures are written by the bot when GATEWAY_CAPTURE_PATH is set. Each event
+is handed to discord.py's own parser, so handlers see the same cache updates
+and dispatches as in production. REST calls are answered locally and
+counted instead of being sent. Run from the repository root:
+
+    python benchmarks/replay.py capture.jsonl.gz [--speed N] [--bot path/to/main.py]
+
+--speed 1 keeps the original timing, --speed 10 plays ten times faster and
+--speed 0 (the default) feeds events as fast as the handlers take them.
+Pass --bot to replay against another version of main.py, for example a
+checkout of the previous release, and compare CPU time and latencies.
+"""
+import argparse
+import asyncio
+import gzip
+import importlib.util
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import zlib
+from collections import Counter, defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Gaps longer than this (restarts, quiet nights) are shortened when replaying
+DEFAULT_MAX_GAP = 5.0  # seconds
+
+# Events discord.py consumes before it dispatches on_ready
+STARTUP_EVENTS = {'READY', 'GUILD_CREATE', 'GUILD_MEMBERS_CHUNK'}
+
+
+def load_bot(path):
+    """Import a version of main.py as the module 'main'."""
+    workdir = tempfile.mkdtemp()
+    os.environ['PORKBOT_DB_PATH'] = os.path.join(workdir, 'replay.db')
+    os.environ['PERF_LOG_PATH'] = os.path.join(workdir, 'perf.log')
+    # Replay drives one plain client and must not record or serve anything itself
+    for name in ('GATEWAY_CAPTURE_PATH', 'METRICS_PORT', 'SHARD_COUNT', 'SHARD_IDS', 'SHARDED'):
+        os.environ.pop(name, None)
+    spec = importlib.util.spec_from_file_location('main', path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules['main'] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def read_capture(path):
+    """Read captured events, stopping quietly at a truncated final batch."""
+    events = []
+    with gzip.open(path, 'rt', encoding='utf-8') as file:
+        try:
+            for line in file:
+                if line.strip():
+                    events.append(json.loads(line))
+        except (EOFError, zlib.error, json.JSONDecodeError):
+            print(f"Capture ends in an incomplete batch; replaying the first {len(events):,} events")
+    return events
+
+
+class FakeWebSocket:
+    """Stands in for the gateway connection the client sends presence and chunk requests on."""
+
+    latency = 0.0
+
+    def __init__(self):
+        self.sent = Counter()
+
+    def is_ratelimited(self):
+        return False
+
+    async def change_presence(self, **kwargs):
+        self.sent['PRESENCE_UPDATE'] += 1
+
+    async def request_chunks(self, guild_id, **kwargs):
+        self.sent['REQUEST_GUILD_MEMBERS'] += 1
+
+
+def build_http(bot):
+    """Create an HTTPClient that answers every request locally and counts it by route."""
+    from mock_discord import member_payload, message_payload, snowflake, user_payload
+
+    class ReplayHTTPClient(bot.discord.http.HTTPClient):
+        def __init__(self, loop):
+            super().__init__(loop)
+            self.calls = Counter()
+            self.bot_user = user_payload(0, 'PorkBot', bot=True)
+
+        async def request(self, route, *, files=None, form=None, **kwargs):
+            self.calls[f'{route.method} {route.path}'] += 1
+            return self.respond(route, kwargs.get('json') or {})
+
+        def respond(self, route, body):
+            method, path = route.method, route.path
+            last_id = route.url.rsplit('/', 1)[-1]
+            if path == '/channels/{channel_id}/messages':
+                if method == 'GET':
+                    return []
+                return message_payload(
+                    snowflake(), route.channel_id, route.guild_id or 0, self.bot_user,
+                    body.get('content') or '', embeds=body.get('embeds') or ()
+                )
+            if path == '/channels/{channel_id}/messages/{message_id}' and method in ('GET', 'PATCH'):
+                return message_payload(last_id, route.channel_id, route.guild_id or 0, self.bot_user, body.get('content') or '')
+            if path == '/guilds/{guild_id}/members/{user_id}' and method in ('GET', 'PATCH'):
+                return member_payload(user_payload(last_id, f'user{last_id[-4:]}'))
+            if path == '/users/{user_id}':
+                return user_payload(last_id, f'user{last_id[-4:]}')
+            return None
+
+    return ReplayHTTPClient
+
+
+def quantile_text(samples):
+    if len(samples) < 2:
+        value = samples[0] * 1e3 if samples else 0.0
+        return f"{value:9.2f} / {value:.2f}"
+    quantiles = statistics.quantiles(samples, n=100)
+    return f"{quantiles[49] * 1e3:9.2f} / {quantiles[98] * 1e3:.2f}"
+
+
+async def replay(bot, events, speed, max_gap, settle):
+    client = bot.client
+    await client._async_setup_hook()
+    http = build_http(bot)(client.loop)
+    ready = next((event['d'] for event in events if event['event'] == 'READY'), None)
+    if ready:
+        http.bot_user = ready['user']
+    client.http = client._connection.http = http
+    client.ws = FakeWebSocket()
+    state = client._connection
+    # Member chunks are in the capture already; don't request them again, and
+    # don't wait long for guilds that are not in it
+    state._chunk_guilds = False
+    state.guild_ready_timeout = 0.1
+
+    # Time each dispatched handler from scheduling to completion, by event name
+    latencies = defaultdict(list)
+    pending = set()
+    schedule_event = client._schedule_event
+
+    def timed_schedule_event(coro, event_name, *args, **kwargs):
+        task = schedule_event(coro, event_name, *args, **kwargs)
+        started = time.perf_counter()
+        pending.add(task)
+        task.add_done_callback(lambda _: latencies[event_name].append(time.perf_counter() - started))
+        task.add_done_callback(pending.discard)
+        return task
+
+    client._schedule_event = timed_schedule_event
+
+    parsers = state.parsers
+    skipped = Counter()
+    cpu_started = time.process_time()
+    started = time.perf_counter()
+    offset = 0.0
+    previous = events[0]['at']
+    for event in events:
+        offset += min(max(0.0, event['at'] - previous), max_gap)
+        previous = event['at']
+        ready_task = getattr(state, '_ready_task', None)
+        if ready_task and not ready_task.done() and event['event'] not in STARTUP_EVENTS:
+            # Live, startup finished before the first message arrived; the wait is not timed
+            waiting = time.perf_counter()
+            await ready_task
+            started += time.perf_counter() - waiting
+        if speed:
+            delay = started + offset / speed - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        parser = parsers.get(event['event'])
+        if parser is None:
+            skipped[event['event']] += 1
+            continue
+        try:
+            parser(event['d'])
+        except Exception as e:
+            print(f"Error parsing {event['event']}: {e!r}")
+        # Let handlers run between events, as they would between gateway frames
+        await asyncio.sleep(0)
+
+    fed = time.perf_counter() - started
+    deadline = time.perf_counter() + settle
+    while pending and time.perf_counter() < deadline:
+        await asyncio.wait(set(pending), timeout=deadline - time.perf_counter())
+    elapsed = time.perf_counter() - started
+    cpu = time.process_time() - cpu_started
+    return fed, elapsed, cpu, latencies, http.calls, client.ws.sent, skipped, len(pending)
+
+
+def run():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('capture', help="gzip JSONL file written with GATEWAY_CAPTURE_PATH")
+    parser.add_argument('--bot', default=os.path.join(ROOT, 'main.py'), help="main.py to replay against")
+    parser.add_argument('--speed', type=float, default=0, help="timing multiplier; 0 replays as fast as possible")
+    parser.add_argument('--max-gap', type=float, default=DEFAULT_MAX_GAP, help="longest pause kept between events, in seconds")
+    parser.add_argument('--settle', type=float, default=30, help="seconds to wait for handlers still running at the end")
+    options = parser.parse_args()
+
+    events = read_capture(options.capture)
+    if not events:
+        sys.exit("The capture has no events")
+    bot = load_bot(os.path.abspath(options.bot))
+
+    fed, elapsed, cpu, latencies, calls, gateway, skipped, unfinished = asyncio.run(
+        replay(bot, events, options.speed, options.max_gap, options.settle)
+    )
+    bot.store.close()
+
+    messages = Counter(event['event'] for event in events)['MESSAGE_CREATE']
+    print(f"bot: {options.bot}")
+    print(f"events: {len(events):,} ({messages:,} messages), fed in {fed:.2f}s, finished in {elapsed:.2f}s")
+    print(f"CPU time:            {cpu:>10.2f} s ({cpu / len(events) * 1e6:.1f} us/event)")
+    print("handler latency p50 / p99 (ms):")
+    for name, samples in sorted(latencies.items(), key=lambda item: -len(item[1])):
+        print(f"  {name:<24} {len(samples):>8,}  {quantile_text(samples)}")
+    total_calls = sum(calls.values())
+    print(f"REST calls:          {total_calls:>10,}" + (f" ({total_calls / messages:.3f}/message)" if messages else ""))
+    for route, total in sorted(calls.items(), key=lambda item: -item[1]):
+        print(f"  {total:>8,}  {route}")
+    for name, total in gateway.items():
+        print(f"gateway {name}: {total:,}")
+    if skipped:
+        print(f"events without a parser: {dict(skipped)}")
+    if unfinished:
+        print(f"handlers still running after {options.settle:.0f}s: {unfinished}")
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,97 @@
+"""Run the bot as several processes, each serving a group of shards.
+
+Usage: python launcher.py [--processes N] [--shards N]
+
+The shard count defaults to SHARD_COUNT or, failing that, Discord's
+recommendation for the bot. Every process runs main.py with SHARD_COUNT and
+its own SHARD_IDS, and they all share the database at PORKBOT_DB_PATH.
+Processes that exit are restarted after a short delay.
+"""
+import argparse
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import aiohttp
+from dotenv import load_dotenv
+
+BOT_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'main.py')
+
+# Discord allows one shard to identify every 5 seconds
+IDENTIFY_DELAY = 5.5  # seconds per shard
+RESTART_DELAY = 10  # seconds before restarting a process that exited
+
+
+async def fetch_recommended_shards(token):
+    """Ask Discord how many shards the bot should use."""
+    headers = {'Authorization': f'Bot {token}'}
+    async with aiohttp.ClientSession(headers=headers) as session:
+        async with session.get('https://discord.com/api/v10/gateway/bot') as response:
+            response.raise_for_status()
+            data = await response.json()
+    return data['shards']
+
+
+def split_shards(shard_count, processes):
+    """Split shard IDs into contiguous groups, one per process."""
+    return [
+        list(range(index * shard_count // processes, (index + 1) * shard_count // processes))
+        for index in range(processes)
+    ]
+
+
+def spawn(shard_count, shard_ids):
+    env = dict(os.environ, SHARD_COUNT=str(shard_count), SHARD_IDS=','.join(map(str, shard_ids)))
+    print(f"Starting shards {shard_ids[0]}-{shard_ids[-1]} of {shard_count}")
+    return subprocess.Popen([sys.executable, BOT_SCRIPT], env=env)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1, help="number of bot processes")
+    parser.add_argument('--shards', type=int, help="total shard count (default: SHARD_COUNT or Discord's recommendation)")
+    args = parser.parse_args()
+
+    load_dotenv()
+    shard_count = args.shards or int(os.getenv('SHARD_COUNT', '0'))
+    if not shard_count:
+        shard_count = asyncio.run(fetch_recommended_shards(os.getenv('DISCORD_TOKEN')))
+    groups = split_shards(shard_count, max(1, min(args.processes, shard_count)))
+
+    # Stop the children too when the launcher is asked to stop
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+
+    children = []
+    restart_at = {}
+    try:
+        for shard_ids in groups:
+            children.append(spawn(shard_count, shard_ids))
+            # Let this group identify before the next one starts
+            time.sleep(IDENTIFY_DELAY * len(shard_ids))
+
+        while True:
+            time.sleep(1)
+            for index, child in enumerate(children):
+                if child.poll() is None:
+                    continue
+                if index not in restart_at:
+                    print(f"Shards {groups[index]} exited with code {child.returncode}, restarting in {RESTART_DELAY}s")
+                    restart_at[index] = time.monotonic() + RESTART_DELAY
+                elif time.monotonic() >= restart_at[index]:
+                    del restart_at[index]
+                    children[index] = spawn(shard_count, groups[index])
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for child in children:
+            if child.poll() is None:
+                child.terminate()
+        for child in children:
+            child.wait()
+
+
+if __name__ == '__main__':
+    main()
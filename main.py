@@ -5,6 +5,29 @@ from datetime import datetime, timedelta
 import asyncio
 import re
 import random
+import heapq
+import itertools
+import json
+import queue
+import signal
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+
+import aiohttp
+import bisect
+import concurrent.futures
+import gzip
+import yarl
+import contextvars
+import logging
+import sys
+import traceback
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+from aiohttp import web
 
 # Load environment variables from .env file
 load_dotenv()
@@ -14,1838 +37,4828 @@ intents = discord.Intents.default()
 intents.message_content = True  # Enable message content intent
 intents.members = True  # Enable member intents for muting
 
+# Member cache policy: 'full' chunks every guild at startup, 'recent' keeps only
+# members who joined, sat in voice or were seen since startup, 'none' keeps no
+# members and fetches them on demand. Counts come from gateway counters unless full.
+MEMBER_CACHE_POLICY = os.getenv('MEMBER_CACHE_POLICY', 'full').lower()
+RECENT_MEMBER_CACHE_SIZE = int(os.getenv('RECENT_MEMBER_CACHE_SIZE', '5000'))
+
 # Define channel IDs
 MOD_LOG_CHANNEL_ID = 1094940763441336340  # Channel for moderation logs
 
+# Mod-log entries are sent together once this many are queued or the delay passes
+MOD_LOG_BATCH_SIZE = 10  # Discord allows at most 10 embeds per message
+MOD_LOG_FLUSH_DELAY = 2.0  # seconds
+
+# Upper bound on entries held by each cooldown store
+COOLDOWN_MAX_ENTRIES = int(os.getenv('COOLDOWN_MAX_ENTRIES', '50000'))
+
+# Purge limits: most messages deleted per command and most scanned while filtering
+PURGE_MAX_AMOUNT = 10000
+PURGE_MAX_SCAN = 50000
+
+# Deleted messages kept for ?snipe
+SNIPE_BUFFER_SIZE = 20  # most recent deletions kept per channel
+SNIPE_TTL = 3600  # seconds a deleted message stays snipeable
+SNIPE_MAX_BYTES = 4 * 1024 * 1024  # approximate memory budget across all channels
+
+# Member count channel renames (Discord allows 2 renames per channel every 10 minutes)
+MEMCOUNT_RENAME_LIMIT = 2
+MEMCOUNT_RENAME_WINDOW = 600  # seconds
+MEMCOUNT_DEBOUNCE = 15  # seconds to wait for more joins/leaves before renaming
+
+# Bulk moderation: actions run at once per command, and most targets per command
+MASS_ACTION_CONCURRENCY = int(os.getenv('MASS_ACTION_CONCURRENCY', '5'))
+MASS_ACTION_MAX_TARGETS = 1000
+# Largest attached ID list read; room for MASS_ACTION_MAX_TARGETS IDs with separators and slack
+MASS_ACTION_MAX_FILE_BYTES = 64 * 1024
+
+# Warning escalation: comma-separated <count>/<window>:<timeout> rules, so 3/24h:1h
+# times a member out for an hour on their third warning within 24 hours. A member's
+# warnings are forgotten WARN_EXPIRY after their latest one.
+WARN_ESCALATIONS = os.getenv('WARN_ESCALATIONS', '3/24h:1h,5/7d:1d')
+WARN_EXPIRY = os.getenv('WARN_EXPIRY', '30d')
+
+# SQLite database holding state that must survive restarts
+DB_PATH = os.getenv('PORKBOT_DB_PATH', 'porkbot.db')
+
+# Sharding: SHARD_COUNT (or SHARDED=1 to let Discord pick the count) runs an
+# AutoShardedClient. SHARD_IDS limits this process to some of the shards, so shard
+# groups can run as separate processes (see launcher.py); those share state through
+# the database and pick up each other's changes every STATE_SYNC_INTERVAL seconds.
+SHARD_COUNT = int(os.getenv('SHARD_COUNT', '0')) or None
+SHARD_IDS = [int(shard_id) for shard_id in os.getenv('SHARD_IDS', '').split(',') if shard_id.strip()] or None
+SHARDED = bool(SHARD_COUNT or SHARD_IDS) or os.getenv('SHARDED', '').lower() in ('1', 'true', 'yes')
+STATE_SYNC_INTERVAL = float(os.getenv('STATE_SYNC_INTERVAL', '2'))
+
+# Prometheus /metrics endpoint, off unless METRICS_PORT is set. A process started
+# with SHARD_IDS listens on METRICS_PORT plus its first shard ID.
+METRICS_PORT = int(os.getenv('METRICS_PORT', '0'))
+METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+
+# Alternative Discord endpoints, such as the local mock in benchmarks/mock_discord.py
+DISCORD_API_BASE = os.getenv('DISCORD_API_BASE')  # e.g. http://127.0.0.1:8765/api/v10
+DISCORD_GATEWAY_URL = os.getenv('DISCORD_GATEWAY_URL')  # e.g. ws://127.0.0.1:8765/gateway
+if DISCORD_API_BASE:
+    discord.http.Route.BASE = DISCORD_API_BASE
+if DISCORD_GATEWAY_URL:
+    discord.gateway.DiscordWebSocket.DEFAULT_GATEWAY = yarl.URL(DISCORD_GATEWAY_URL)
+
+# Event-loop watchdog: handlers slower than the wall or CPU threshold, and loop
+# stalls longer than LOOP_STALL_THRESHOLD, are recorded with their stacks
+LOOP_LAG_INTERVAL = 0.5  # seconds between lag samples
+LOOP_STALL_THRESHOLD = float(os.getenv('LOOP_STALL_THRESHOLD', '0.25'))  # seconds
+SLOW_HANDLER_WALL = float(os.getenv('SLOW_HANDLER_WALL', '5'))  # seconds
+SLOW_HANDLER_CPU = float(os.getenv('SLOW_HANDLER_CPU', '0.1'))  # seconds of event-loop thread CPU
+PERF_LOG_PATH = os.getenv('PERF_LOG_PATH', 'perf.log')
+
+# Gateway capture for offline replay (benchmarks/replay.py): dispatch events are
+# appended to this gzip JSONL file. With GATEWAY_CAPTURE_REDACT, message text and
+# user names are blanked before they are written.
+GATEWAY_CAPTURE_PATH = os.getenv('GATEWAY_CAPTURE_PATH')
+GATEWAY_CAPTURE_REDACT = os.getenv('GATEWAY_CAPTURE_REDACT', '').lower() in ('1', 'true', 'yes')
+
 # Define role IDs and their permissions
 ROLE_PERMISSIONS = {
-    # Tier 1: Basic moderation (mute/unmute only)
-    1322109984036622346: ['mute', 'unmute'],
+    # Tier 1: Basic moderation (mute/unmute/warn only)
+    1322109984036622346: ['mute', 'unmute', 'warn'],
     
-    # Tier 2: Moderate moderation (mute, unmute, purge, kick)
-    1322099468480417832: ['mute', 'unmute', 'purge', 'kick'],
+    # Tier 2: Moderate moderation (mute, unmute, warn, purge, kick, case history)
+    1322099468480417832: ['mute', 'unmute', 'purge', 'kick', 'modlog', 'warn'],
     
-    # Tier 3: Advanced moderation (mute, unmute, kick, ban, unban, purge)
-    1322098045613248563: ['mute', 'unmute', 'kick', 'ban', 'unban', 'purge'],
+    # Tier 3: Advanced moderation (mute, unmute, warn, kick, ban, unban, purge, case history)
+    1322098045613248563: ['mute', 'unmute', 'kick', 'ban', 'unban', 'purge', 'modlog', 'warn'],
     
     # Tier 4: Full access (all commands)
-    1322094447030177863: ['*'],
-    1322091136059310100: ['*'],
+    1322094447030177863: ['*', 'autosend'],
+    1322091136059310100: ['*', 'autosend'],
     1330618191050969129: ['*'],
-    1322090684810924033: ['*']
+    1322090684810924033: ['*', 'autosend']
 }
 
-# Store reaction rules
-reaction_rules = {}
+# Every permission name used by a command check, one bit each
+PERMISSION_NAMES = [
+    'mute', 'unmute', 'purge', 'kick', 'ban', 'unban', 'reaction', 'memcount',
+    'slowmode', 'lock', 'snipe', 'serverinfo', 'autosend', 'temprole', 'debug', 'modlog', 'warn'
+]
+PERMISSION_BITS = {name: 1 << index for index, name in enumerate(PERMISSION_NAMES)}
 
-# Store active autosend tasks
-autosend_tasks = {}
+# Permissions that '*' does not grant; roles must list them explicitly
+EXPLICIT_PERMISSIONS = {'autosend'}
+WILDCARD_MASK = sum(bit for name, bit in PERMISSION_BITS.items() if name not in EXPLICIT_PERMISSIONS)
 
-client = discord.Client(intents=intents)
+def compile_role_masks(role_permissions):
+    """Compile a role ID -> permission names table into role ID -> bitmask."""
+    masks = {}
+    for role_id, permissions in role_permissions.items():
+        mask = 0
+        for permission in permissions:
+            mask |= WILDCARD_MASK if permission == '*' else PERMISSION_BITS[permission]
+        masks[role_id] = mask
+    return masks
 
-def has_command_permission(member, command):
-    """Check if a member has permission to use a specific command."""
-    # Get all role IDs the member has
-    member_role_ids = [role.id for role in member.roles]
-    
-    # Check each role's permissions
-    for role_id in member_role_ids:
-        if role_id in ROLE_PERMISSIONS:
-            permissions = ROLE_PERMISSIONS[role_id]
-            # If role has full access or specific command permission
-            if '*' in permissions or command in permissions:
-                return True
-    
-    return False
+ROLE_MASKS = compile_role_masks(ROLE_PERMISSIONS)
 
-@client.event
-async def on_ready():
-    print(f'We have logged in as {client.user}')
-    
-    # Set custom status
-    activity = discord.Activity(
-        type=discord.ActivityType.watching,  # You can change this to playing, listening, etc.
-        name="over Porkchop SMP"  # Custom status text
-    )
-    await client.change_presence(activity=activity, status=discord.Status.online)
-    
-    # Set about me
-    about_me = {
-        "name": "PorkBot",
-        "description": "Made by <@799190402896494612> to guard Porkchop SMP. Join today discord.gg/porkchopsmp.",
-        "version": "1.0.0",
-        "features": [
-            "Moderation commands",
-            "Server management",
-            "Automatic reactions",
-            "Member tracking"
-        ]
-    }
-    
-    # You can access this information later if needed
-    client.about_me = about_me
+# Effective permission mask per (guild ID, member ID), invalidated on role changes
+member_permission_cache = {}
 
-# Add a dictionary to track the last "hello" response time for each user
-last_hello_time = {}
+class BotStore:
+    """SQLite (WAL mode) store for bot state that must survive restarts.
 
-# Add a dictionary to track the last report time for each user
-last_report_time = {}
+    State is kept as JSON values under (namespace, key). Writes are queued and
+    committed in batches by a background thread, so callers never block on
+    disk. Reads are blocking and should go through asyncio.to_thread.
 
-@client.event
-async def on_message(message):
-    if message.author == client.user:
-        return
+    Every batch that writes a namespace bumps its row in namespace_versions,
+    so processes sharing the database can tell which namespaces another
+    process has changed without rereading them.
+    """
 
-    # Handle report command
-    if message.content.startswith('?report'):
-        # Check if the message is a reply
-        if not message.reference:
-            error_embed = discord.Embed(
-                title="❌ Invalid Usage",
-                description="You must reply to a message to report it!",
-                color=discord.Color.red()
-            )
-            await message.channel.send(embed=error_embed)
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS state (
+            namespace TEXT NOT NULL,
+            key TEXT NOT NULL,
+            value TEXT NOT NULL,
+            PRIMARY KEY (namespace, key)
+        );
+        CREATE TABLE IF NOT EXISTS namespace_versions (
+            namespace TEXT PRIMARY KEY,
+            version INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS mod_cases (
+            guild_id INTEGER NOT NULL,
+            case_id INTEGER NOT NULL,
+            action TEXT NOT NULL,
+            target_id INTEGER NOT NULL,
+            moderator_id INTEGER NOT NULL,
+            reason TEXT,
+            duration INTEGER,
+            created_at INTEGER NOT NULL,
+            details TEXT,
+            PRIMARY KEY (guild_id, case_id)
+        );
+        CREATE INDEX IF NOT EXISTS mod_cases_target ON mod_cases (guild_id, target_id, case_id);
+        CREATE INDEX IF NOT EXISTS mod_cases_moderator ON mod_cases (guild_id, moderator_id, case_id);
+        CREATE INDEX IF NOT EXISTS mod_cases_action ON mod_cases (guild_id, action, case_id);
+        CREATE INDEX IF NOT EXISTS mod_cases_time ON mod_cases (guild_id, created_at);
+    """
+
+    # Maximum number of queued writes committed in one transaction
+    BATCH_SIZE = 500
+
+    def __init__(self, path):
+        self.path = path
+        self._queue = queue.Queue()
+        self._local = threading.local()
+        self._writer = None
+        self._lock = threading.Lock()
+        # Latest version of each namespace this process has written or seen,
+        # and namespaces another process wrote in between our own writes
+        self._seen_versions = {}
+        self._foreign_changes = set()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def _ensure_open(self):
+        # The database is only created and the writer started on first use
+        if self._writer:
             return
+        with self._lock:
+            if self._writer:
+                return
+            conn = self._connect()
+            conn.executescript(self.SCHEMA)
+            conn.close()
+            self._writer = threading.Thread(target=self._write_loop, name='bot-store-writer', daemon=True)
+            self._writer.start()
 
-        # Check if the user is on cooldown
-        user_id = message.author.id
-        current_time = datetime.utcnow()
-        if user_id in last_report_time:
-            time_since_last_report = (current_time - last_report_time[user_id]).total_seconds()
-            if time_since_last_report < 300:  # 1800 seconds = 30 minutes
-                cooldown_embed = discord.Embed(
-                    title="⏳ Cooldown Active",
-                    description="You can only make one report every 30 minutes.",
-                    color=discord.Color.orange()
-                )
-                await message.channel.send(embed=cooldown_embed)
+    def _reader(self):
+        self._ensure_open()
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def _write_loop(self):
+        conn = self._connect()
+        while True:
+            batch = [self._queue.get()]
+            # Drain whatever else is waiting so it commits in the same transaction
+            while len(batch) < self.BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            namespaces = set()
+            results = []
+            for entry in batch:
+                if entry is None:
+                    continue
+                sql, params, namespace, result = entry
+                try:
+                    row = conn.execute(sql, params).fetchone()
+                except sqlite3.Error as e:
+                    if result:
+                        result.set_exception(e)
+                    else:
+                        print(f"Error writing bot state: {e}")
+                    continue
+                if result:
+                    results.append((result, row))
+                if namespace:
+                    namespaces.add(namespace)
+
+            # The batch's writes hold the write lock, so no other process can
+            # bump a version between reading and replacing it
+            bumps = []
+            for namespace in namespaces:
+                try:
+                    row = conn.execute('SELECT version FROM namespace_versions WHERE namespace = ?', (namespace,)).fetchone()
+                    previous = row[0] if row else 0
+                    conn.execute('INSERT OR REPLACE INTO namespace_versions (namespace, version) VALUES (?, ?)', (namespace, previous + 1))
+                    bumps.append((namespace, previous))
+                except sqlite3.Error as e:
+                    print(f"Error writing bot state: {e}")
+            conn.commit()
+
+            with self._lock:
+                for namespace, previous in bumps:
+                    seen = self._seen_versions.get(namespace, 0)
+                    if previous > seen:
+                        # Another process wrote since we last looked
+                        self._foreign_changes.add(namespace)
+                    self._seen_versions[namespace] = max(seen, previous + 1)
+
+            # Statements waiting on their result only see it once it is committed
+            for result, row in results:
+                result.set_result(row)
+            for _ in batch:
+                self._queue.task_done()
+            if None in batch:
+                conn.close()
                 return
 
-        # Update the last report time for the user
-        last_report_time[user_id] = current_time
+    def execute(self, sql, params=(), namespace=None):
+        """Queue a write statement; returns immediately.
 
-        # Get the replied-to message
-        try:
-            replied_message = await message.channel.fetch_message(message.reference.message_id)
-        except discord.NotFound:
-            error_embed = discord.Embed(
-                title="❌ Error",
-                description="Could not find the message you're replying to!",
-                color=discord.Color.red()
-            )
-            await message.channel.send(embed=error_embed)
-            return
+        Pass the namespace a statement writes to bump its version.
+        """
+        self._ensure_open()
+        self._queue.put((sql, params, namespace, None))
 
-        # Parse the reason
-        args = message.content.split(maxsplit=1)
-        if len(args) < 2:
-            error_embed = discord.Embed(
-                title="❌ Missing Reason",
-                description="You must provide a reason for the report!",
-                color=discord.Color.red()
-            )
-            await message.channel.send(embed=error_embed)
-            return
-        reason = args[1]
+    def execute_returning(self, sql, params=(), namespace=None):
+        """Queue a write statement; returns a concurrent Future for its first row.
 
-        # Get the report channel
-        report_channel = client.get_channel(1362287716460396675)
-        if not report_channel:
-            error_embed = discord.Embed(
-                title="❌ Error",
-                description="Report channel not found!",
-                color=discord.Color.red()
-            )
-            await message.channel.send(embed=error_embed)
-            return
+        The future resolves once the statement is committed, or fails with
+        the sqlite3.Error it raised. Use with a RETURNING clause.
+        """
+        self._ensure_open()
+        result = concurrent.futures.Future()
+        self._queue.put((sql, params, namespace, result))
+        return result
 
-        # Create the report embed
-        report_embed = discord.Embed(
-            title="🚨 New Report",
-            description=f"**Reported Message:**\n{replied_message.content}",
-            color=discord.Color.red()
-        )
-        report_embed.add_field(
-            name="Reporter",
-            value=message.author.mention,
-            inline=False
-        )
-        report_embed.add_field(
-            name="Reported User",
-            value=replied_message.author.mention,
-            inline=False
+    def set(self, namespace, key, value):
+        """Queue storing a JSON-serialisable value under namespace/key."""
+        self.execute(
+            'INSERT OR REPLACE INTO state (namespace, key, value) VALUES (?, ?, ?)',
+            (namespace, str(key), json.dumps(value)),
+            namespace
         )
-        report_embed.add_field(
-            name="Reason",
-            value=reason,
-            inline=False
+
+    def delete(self, namespace, key):
+        """Queue removing namespace/key."""
+        self.execute('DELETE FROM state WHERE namespace = ? AND key = ?', (namespace, str(key)), namespace)
+
+    def load(self, namespace):
+        """Return every key -> value stored in a namespace (blocking)."""
+        rows = self._reader().execute(
+            'SELECT key, value FROM state WHERE namespace = ?', (namespace,)
+        ).fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    def load_raw(self, namespace):
+        """Return every key -> JSON text stored in a namespace, without decoding (blocking)."""
+        return dict(self._reader().execute(
+            'SELECT key, value FROM state WHERE namespace = ?', (namespace,)
+        ).fetchall())
+
+    def query(self, sql, params=()):
+        """Run a read query and return all rows (blocking)."""
+        return self._reader().execute(sql, params).fetchall()
+
+    def changed_namespaces(self):
+        """Return the namespaces other processes have written since the last call (blocking).
+
+        This process's own writes are not reported. The first call only
+        records the current versions.
+        """
+        rows = self.query('SELECT namespace, version FROM namespace_versions')
+        with self._lock:
+            changed = self._foreign_changes
+            self._foreign_changes = set()
+            for namespace, version in rows:
+                if version > self._seen_versions.get(namespace, 0):
+                    changed.add(namespace)
+                    self._seen_versions[namespace] = version
+        return changed
+
+    def flush(self):
+        """Block until every queued write has been committed."""
+        if self._writer:
+            self._queue.join()
+
+    def close(self):
+        """Commit outstanding writes and stop the writer thread."""
+        if self._writer:
+            self._queue.put(None)
+            self._writer.join()
+            self._writer = None
+
+store = BotStore(DB_PATH)
+
+class Scheduler:
+    """Runs callbacks at absolute event-loop deadlines.
+
+    All pending entries share one min-heap and one wakeup task, so the cost
+    of waiting does not grow with the number of jobs. Entries are keyed;
+    scheduling an existing key replaces it and cancelled entries are dropped
+    lazily when they reach the top of the heap.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._entries = {}
+        self._counter = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def schedule(self, key, deadline, callback):
+        """Run the coroutine function callback() at loop time deadline."""
+        seq = next(self._counter)
+        self._entries[key] = (deadline, seq, callback)
+        heapq.heappush(self._heap, (deadline, seq, key))
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        elif self._heap[0][1] == seq:
+            # The new entry is now the earliest, so the sleeper must wake sooner
+            self._wakeup.set()
+
+    def cancel(self, key):
+        """Cancel a pending entry; returns False if there was none."""
+        if self._entries.pop(key, None) is None:
+            return False
+        # Rebuild once stale entries dominate so cancelled jobs do not pile up
+        if len(self._heap) > 64 and len(self._heap) > 2 * len(self._entries):
+            self._heap = [(deadline, seq, key) for key, (deadline, seq, _) in self._entries.items()]
+            heapq.heapify(self._heap)
+        return True
+
+    def deadline(self, key):
+        """Return the loop time an entry is due, or None."""
+        entry = self._entries.get(key)
+        return entry[0] if entry else None
+
+    def _pop_stale(self):
+        while self._heap:
+            deadline, seq, key = self._heap[0]
+            entry = self._entries.get(key)
+            if entry and entry[1] == seq:
+                return
+            heapq.heappop(self._heap)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            self._pop_stale()
+            delay = self._heap[0][0] - loop.time() if self._heap else None
+            if delay is None or delay > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            _, _, key = heapq.heappop(self._heap)
+            _, _, callback = self._entries.pop(key)
+            asyncio.create_task(self._invoke(key, callback))
+
+    async def _invoke(self, key, callback):
+        try:
+            with watchdog.watch(f'scheduled:{key[0]}'):
+                await callback()
+        except Exception as e:
+            print(f"Error in scheduled job {key}: {e}")
+
+# Shared scheduler for every timed job in the bot
+scheduler = Scheduler()
+
+class CooldownStore:
+    """Per-key cooldowns on monotonic time with bounded memory.
+
+    Each key maps to its monotonic expiry, and a heap of (expiry, key) pairs
+    keeps the keys in expiry order whatever window each was hit with or the
+    order restore() is called in. Expired keys are popped from the top of the
+    heap; when max_entries is reached the key closest to expiring is evicted
+    early. Heap pairs left behind by a key that was hit again are skipped
+    when they surface, and dropped in bulk once they outnumber live keys.
+    """
+
+    def __init__(self, window, max_entries=COOLDOWN_MAX_ENTRIES):
+        self.window = window
+        self.max_entries = max_entries
+        self._expires = {}
+        self._heap = []
+
+    def __len__(self):
+        return len(self._expires)
+
+    def _pop_first(self):
+        """Remove the key closest to expiring."""
+        while self._heap:
+            expires, key = heapq.heappop(self._heap)
+            if self._expires.get(key) == expires:
+                del self._expires[key]
+                return
+
+    def _evict_expired(self, now):
+        heap, expires = self._heap, self._expires
+        while heap and heap[0][0] <= now:
+            at, key = heapq.heappop(heap)
+            if expires.get(key) == at:
+                del expires[key]
+
+    def remaining(self, key):
+        """Return the seconds left on the key's cooldown (0 if none)."""
+        now = time.monotonic()
+        self._evict_expired(now)
+        expires = self._expires.get(key)
+        return expires - now if expires and expires > now else 0
+
+    def hit(self, key, window=None):
+        """Start the key's cooldown and return its wall-clock expiry time."""
+        window = self.window if window is None else window
+        expires = time.monotonic() + window
+        self._expires[key] = expires
+        heapq.heappush(self._heap, (expires, key))
+        if len(self._heap) > 2 * len(self._expires) + 64:
+            self._heap = [(at, key) for key, at in self._expires.items()]
+            heapq.heapify(self._heap)
+        if len(self._expires) > self.max_entries:
+            self._pop_first()
+        return time.time() + window
+
+    def restore(self, key, expires_at):
+        """Re-arm a cooldown from a persisted wall-clock expiry; returns False if it has passed."""
+        window = expires_at - time.time()
+        if window <= 0:
+            return False
+        self.hit(key, window)
+        return True
+
+class ModLogSink:
+    """Coalesces mod-log embeds into multi-embed messages.
+
+    Handlers enqueue embeds and return immediately. A background task sends
+    them once a full batch is waiting, after a short delay, or right away
+    for priority entries. Fewer messages means less pressure on the mod-log
+    channel's rate limit during raids.
+    """
+
+    # Discord's limit on the combined size of all embeds in one message
+    MAX_MESSAGE_EMBED_CHARS = 6000
+
+    def __init__(self, channel_id, batch_size=MOD_LOG_BATCH_SIZE, flush_delay=MOD_LOG_FLUSH_DELAY):
+        self.channel_id = channel_id
+        self.batch_size = batch_size
+        self.flush_delay = flush_delay
+        self._pending = deque()
+        self._flush_now = asyncio.Event()
+        self._task = None
+
+    def __len__(self):
+        return len(self._pending)
+
+    def enqueue(self, embed, priority=False):
+        """Queue an embed for the mod log; priority entries flush immediately."""
+        self._pending.append(embed)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        if priority or len(self._pending) >= self.batch_size:
+            self._flush_now.set()
+
+    def _next_batch(self):
+        batch = []
+        size = 0
+        while self._pending and len(batch) < self.batch_size:
+            embed_size = len(self._pending[0])
+            if batch and size + embed_size > self.MAX_MESSAGE_EMBED_CHARS:
+                break
+            batch.append(self._pending.popleft())
+            size += embed_size
+        return batch
+
+    async def _run(self):
+        while self._pending:
+            try:
+                await asyncio.wait_for(self._flush_now.wait(), self.flush_delay)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_now.clear()
+            await self.flush()
+
+    async def flush(self):
+        """Send every queued entry now."""
+        while self._pending:
+            batch = self._next_batch()
+            channel = client.get_channel(self.channel_id)
+            if channel is None and SHARD_IDS:
+                # The log channel may be in a guild served by another process
+                channel = client.get_partial_messageable(self.channel_id)
+            if channel is None:
+                print(f"Mod log channel {self.channel_id} not found, dropping {len(batch)} entries")
+                continue
+            try:
+                await channel.send(embeds=batch)
+            except discord.HTTPException as e:
+                print(f"Error sending mod log entries: {e}")
+
+# Batched writer for MOD_LOG_CHANNEL_ID
+mod_log = ModLogSink(MOD_LOG_CHANNEL_ID)
+
+# Actions recorded as moderation cases, with the label shown for each
+CASE_ACTIONS = {
+    'warn': "⚠️ Warn",
+    'mute': "🔇 Mute",
+    'unmute': "🔊 Unmute",
+    'kick': "👢 Kick",
+    'ban': "🔨 Ban",
+    'tempban': "⏳ Tempban",
+    'unban': "🔓 Unban",
+    'nuke': "💥 Nuke",
+    'purge': "🧹 Purge",
+}
+
+# Cases shown per ?modlog page
+CASES_PER_PAGE = 10
+
+CASE_COLUMNS = 'case_id, action, target_id, moderator_id, reason, duration, created_at, details'
+
+# Last case number used in each guild, by guild ID; loaded on first use
+case_numbers = {}
+
+# Pending case-number loads, by guild ID, so concurrent commands share one query
+case_number_loads = {}
+
+async def load_case_number(guild_id):
+    """Make sure case_numbers holds the guild's highest case number."""
+    task = case_number_loads.get(guild_id)
+    if task is None:
+        task = case_number_loads[guild_id] = asyncio.create_task(asyncio.to_thread(
+            store.query, 'SELECT MAX(case_id) FROM mod_cases WHERE guild_id = ?', (guild_id,)
+        ))
+    try:
+        rows = await task
+    finally:
+        # A failed load is retried by the next case instead of being cached
+        if case_number_loads.get(guild_id) is task:
+            del case_number_loads[guild_id]
+    case_numbers.setdefault(guild_id, rows[0][0] or 0)
+
+async def record_case(guild_id, action, target_id, moderator_id, reason=None, duration=None, details=None):
+    """Store a moderation case and return the number it was stored under.
+
+    Numbers count up per guild. Only the process serving a guild records
+    cases for it, so once the guild's highest number is loaded the in-memory
+    counter cannot hand out a number twice. Should a number be taken anyway,
+    the insert falls back to the next free one rather than dropping the case,
+    and the counter catches up with it.
+    """
+    if guild_id not in case_numbers:
+        await load_case_number(guild_id)
+    number = case_numbers[guild_id] + 1
+    case_numbers[guild_id] = number
+    result = store.execute_returning(
+        f'''INSERT INTO mod_cases (guild_id, {CASE_COLUMNS}) VALUES (?,
+            CASE WHEN EXISTS (SELECT 1 FROM mod_cases WHERE guild_id = ? AND case_id = ?)
+                THEN (SELECT MAX(case_id) + 1 FROM mod_cases WHERE guild_id = ?)
+                ELSE ? END,
+            ?, ?, ?, ?, ?, ?, ?)
+            RETURNING case_id''',
+        (guild_id, guild_id, number, guild_id, number,
+         action, target_id, moderator_id, reason or None, duration, int(time.time()), details)
+    )
+    try:
+        stored = (await asyncio.wrap_future(result))[0]
+    except sqlite3.Error as e:
+        print(f"Error recording {action} case #{number}: {e}")
+        return number
+    case_numbers[guild_id] = max(case_numbers[guild_id], stored)
+    return stored
+
+def query_cases(guild_id, column=None, value=None, action=None, page=0):
+    """Return (total, rows) for one page of a guild's cases, newest first (blocking).
+
+    column is 'target_id' or 'moderator_id' to filter by a user; each filter
+    is served by one of the mod_cases indexes.
+    """
+    # Include cases still waiting in the write queue
+    store.flush()
+    conditions = ['guild_id = ?']
+    params = [guild_id]
+    if column:
+        conditions.append(f'{column} = ?')
+        params.append(value)
+    if action:
+        conditions.append('action = ?')
+        params.append(action)
+    where = ' AND '.join(conditions)
+    total = store.query(f'SELECT COUNT(*) FROM mod_cases WHERE {where}', params)[0][0]
+    rows = store.query(
+        f'SELECT {CASE_COLUMNS} FROM mod_cases WHERE {where} ORDER BY case_id DESC LIMIT ? OFFSET ?',
+        params + [CASES_PER_PAGE, page * CASES_PER_PAGE]
+    )
+    return total, rows
+
+def fetch_case(guild_id, case_id):
+    """Return one case row, or None (blocking)."""
+    store.flush()
+    rows = store.query(f'SELECT {CASE_COLUMNS} FROM mod_cases WHERE guild_id = ? AND case_id = ?', (guild_id, case_id))
+    return rows[0] if rows else None
+
+class DeletedMessage:
+    """Compact record of a deleted message."""
+
+    __slots__ = ('author_id', 'content', 'attachments', 'deleted_at', 'size')
+
+    def __init__(self, author_id, content, attachments, deleted_at):
+        self.author_id = author_id
+        self.content = content
+        self.attachments = attachments
+        self.deleted_at = deleted_at
+        # Rough footprint used for the global memory budget
+        self.size = 96 + len(content) + sum(len(url) for url in attachments)
+
+class SnipeCache:
+    """Per-channel ring buffers of recently deleted messages.
+
+    Each channel keeps its last buffer_size deletions. Records older than
+    ttl seconds are ignored and pruned, and once the estimated size of all
+    records exceeds max_bytes the oldest records of the least recently
+    active channels are evicted.
+    """
+
+    def __init__(self, buffer_size=SNIPE_BUFFER_SIZE, ttl=SNIPE_TTL, max_bytes=SNIPE_MAX_BYTES):
+        self.buffer_size = buffer_size
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._channels = OrderedDict()
+
+    def __len__(self):
+        return sum(len(buffer) for buffer in self._channels.values())
+
+    def record(self, channel_id, author_id, content, attachments):
+        """Remember a deleted message for its channel."""
+        buffer = self._channels.pop(channel_id, None)
+        if buffer is None:
+            buffer = deque(maxlen=self.buffer_size)
+        elif len(buffer) == self.buffer_size:
+            self.size -= buffer[0].size
+        entry = DeletedMessage(author_id, content, tuple(attachments), time.time())
+        buffer.append(entry)
+        self.size += entry.size
+        # Most recently active channel goes to the end
+        self._channels[channel_id] = buffer
+
+        while self.size > self.max_bytes and self._channels:
+            oldest_id, oldest = next(iter(self._channels.items()))
+            self.size -= oldest.popleft().size
+            if not oldest:
+                del self._channels[oldest_id]
+
+    def get(self, channel_id, index=1):
+        """Return the index-th most recent live deletion in a channel, or None."""
+        buffer = self._channels.get(channel_id)
+        if not buffer:
+            return None
+        cutoff = time.time() - self.ttl
+        while buffer and buffer[0].deleted_at < cutoff:
+            self.size -= buffer.popleft().size
+        if not buffer:
+            del self._channels[channel_id]
+            return None
+        if index > len(buffer):
+            return None
+        return buffer[-index]
+
+# Recently deleted messages for ?snipe
+snipe_cache = SnipeCache()
+
+class GuildStats:
+    """Counters for one guild, seeded once and updated from gateway events.
+
+    The rendered ?serverinfo embed is cached until a counter or the guild
+    itself changes, so repeated calls cost a dict lookup.
+    """
+
+    def __init__(self, humans=0, bots=0, text_channels=0, voice_channels=0, categories=0, roles=0):
+        self.humans = humans
+        self.bots = bots
+        self.text_channels = text_channels
+        self.voice_channels = voice_channels
+        self.categories = categories
+        self.roles = roles
+        self._embed = None
+
+    @classmethod
+    def from_guild(cls, guild):
+        """Seed the counters with one pass over the guild's caches."""
+        if guild.chunked:
+            bots = sum(1 for member in guild.members if member.bot)
+            humans = len(guild.members) - bots
+        else:
+            # No full member cache: take the gateway's member count and
+            # estimate bots from the roles Discord manages for them
+            bots = sum(1 for role in guild.roles if role.is_bot_managed())
+            humans = max((guild.member_count or 0) - bots, 0)
+        return cls(
+            humans=humans,
+            bots=bots,
+            text_channels=len(guild.text_channels),
+            voice_channels=len(guild.voice_channels),
+            categories=len(guild.categories),
+            roles=len(guild.roles)
         )
-        report_embed.add_field(
-            name="Message Link",
-            value=f"[Jump to Message]({replied_message.jump_url})",
+
+    def invalidate(self):
+        """Forget the cached embed after a change."""
+        self._embed = None
+
+    def member_joined(self, member):
+        if member.bot:
+            self.bots += 1
+        else:
+            self.humans += 1
+        self._embed = None
+
+    def member_left(self, member):
+        if member.bot:
+            self.bots = max(self.bots - 1, 0)
+        else:
+            self.humans = max(self.humans - 1, 0)
+        self._embed = None
+
+    def _count_channel(self, channel, delta):
+        if isinstance(channel, discord.TextChannel):
+            self.text_channels += delta
+        elif isinstance(channel, discord.VoiceChannel):
+            self.voice_channels += delta
+        elif isinstance(channel, discord.CategoryChannel):
+            self.categories += delta
+        self._embed = None
+
+    def channel_created(self, channel):
+        self._count_channel(channel, 1)
+
+    def channel_deleted(self, channel):
+        self._count_channel(channel, -1)
+
+    def role_created(self):
+        self.roles += 1
+        self._embed = None
+
+    def role_deleted(self):
+        self.roles = max(self.roles - 1, 0)
+        self._embed = None
+
+    def embed(self, guild):
+        """Return the ?serverinfo embed, building it only after a change."""
+        if self._embed is None:
+            self._embed = build_serverinfo_embed(guild, self)
+        return self._embed
+
+def build_serverinfo_embed(guild, stats):
+    """Build the ?serverinfo embed from the guild and its counters."""
+    # Create server info embed
+    info_embed = discord.Embed(
+        title=f"📊 {guild.name} Server Information",
+        color=discord.Color.blue()
+    )
+    
+    # Basic information
+    info_embed.add_field(
+        name="🆔 Server ID",
+        value=guild.id,
+        inline=True
+    )
+    info_embed.add_field(
+        name="👑 Owner",
+        value=guild.owner.mention if guild.owner else f"<@{guild.owner_id}>",
+        inline=True
+    )
+    info_embed.add_field(
+        name="📅 Created",
+        value=guild.created_at.strftime("%B %d, %Y"),
+        inline=True
+    )
+    
+    # Member counts
+    info_embed.add_field(
+        name="👥 Members",
+        value=f"Total: {stats.humans + stats.bots}\nHumans: {stats.humans}\nBots: {stats.bots}",
+        inline=True
+    )
+    
+    # Channel counts
+    info_embed.add_field(
+        name="📺 Channels",
+        value=f"Text: {stats.text_channels}\nVoice: {stats.voice_channels}\nCategories: {stats.categories}",
+        inline=True
+    )
+    
+    # Role count
+    info_embed.add_field(
+        name="🎭 Roles",
+        value=str(stats.roles),
+        inline=True
+    )
+    
+    # Server features
+    if guild.features:
+        info_embed.add_field(
+            name="✨ Features",
+            value=", ".join(guild.features),
             inline=False
         )
-        report_embed.set_footer(text=f"Reported at {datetime.utcnow()}")
+    
+    # Server icon
+    if guild.icon:
+        info_embed.set_thumbnail(url=guild.icon.url)
+    
+    return info_embed
 
-        # Send the report to the report channel
-        await report_channel.send(embed=report_embed)
+# Guild statistics by guild ID
+guild_stats = {}
 
-        # Confirm the report to the reporter
-        confirm_embed = discord.Embed(
-            title="✅ Report Submitted",
-            description="Your report has been submitted successfully.",
-            color=discord.Color.green()
-        )
-        await message.channel.send(embed=confirm_embed)
+def get_guild_stats(guild):
+    """Return the guild's statistics, seeding them on first use.
 
-    # Handle "hello" command with a 5-minute cooldown per user
-    if 'hello' in message.content.lower().split():
-        user_id = message.author.id
-        current_time = datetime.utcnow()
+    Event handlers only update guilds that are already seeded, since a
+    fresh seed already reflects the event being handled.
+    """
+    stats = guild_stats.get(guild.id)
+    if stats is None:
+        stats = guild_stats[guild.id] = GuildStats.from_guild(guild)
+    return stats
 
-        # Check if the user is in the last_hello_time dictionary
-        if user_id in last_hello_time:
-            time_since_last_hello = (current_time - last_hello_time[user_id]).total_seconds()
-            if time_since_last_hello < 300:  # 300 seconds = 5 minutes
-                return  # Ignore the message if it's within the cooldown period
+class MemberCountChannel:
+    """Keeps a voice channel named after a guild's human member count.
 
-        # Update the last_hello_time for the user
-        last_hello_time[user_id] = current_time
+    Update requests are debounced and coalesced into a single pending rename
+    that reads the latest count, and renames are spaced to stay within
+    Discord's per-channel rename limit.
+    """
 
-        # Send the "hello" response
-        embed = discord.Embed(
-            title="👋 Welcome to Porkchop SMP!",
-            description="We're glad to have you here!",
-            color=discord.Color.green()
-        )
-        await message.channel.send(content=message.author.mention, embed=embed)
+    def __init__(self, guild_id, channel_id):
+        self.guild_id = guild_id
+        self.channel_id = channel_id
+        self._renames = deque()
+        self._dirty = False
+        self._task = None
 
-    # Check for reaction rules
-    for target, emoji in reaction_rules.items():
-        # Check if message mentions the target user
-        if message.mentions:
-            for mention in message.mentions:
-                if target.lower() in mention.name.lower() or target.lower() in str(mention.id):
-                    try:
-                        await message.add_reaction(emoji)
-                    except discord.HTTPException:
-                        pass
-        
-        # Check if message contains the target name
-        if target.lower() in message.content.lower():
+    def request_update(self):
+        """Ask for the channel name to be refreshed soon."""
+        self._dirty = True
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def cancel(self):
+        if self._task:
+            self._task.cancel()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while self._dirty:
+            await asyncio.sleep(MEMCOUNT_DEBOUNCE)
+
+            # Wait until another rename fits in the rate-limit window
+            while len(self._renames) >= MEMCOUNT_RENAME_LIMIT:
+                wait = self._renames[0] + MEMCOUNT_RENAME_WINDOW - loop.time()
+                if wait <= 0:
+                    self._renames.popleft()
+                else:
+                    await asyncio.sleep(wait)
+
+            self._dirty = False
+            guild = client.get_guild(self.guild_id)
+            channel = client.get_channel(self.channel_id)
+            if guild is None or channel is None:
+                return
+
+            name = f"Members: {get_guild_stats(guild).humans}"
+            if channel.name == name:
+                continue
             try:
-                await message.add_reaction(emoji)
-            except discord.HTTPException:
-                pass
-    
-    # Handle reaction rule commands
-    if message.content.startswith('?reaction'):
-        if not has_command_permission(message.author, 'reaction'):
-            error_embed = discord.Embed(
-                title="❌ Permission Denied",
-                description="You don't have permission to use this command!",
-                color=discord.Color.red()
-            )
-            await message.channel.send(embed=error_embed)
+                await channel.edit(name=name, reason="Member count update")
+                self._renames.append(loop.time())
+            except discord.HTTPException as e:
+                print(f"Error updating member count channel {self.channel_id}: {e}")
+
+# Member count channels by guild ID
+memcount_channels = {}
+
+class Metrics:
+    """Counters and latency histograms rendered in Prometheus text format.
+
+    Recording is a dict update and a bisect; everything else (gauges,
+    cumulative buckets) is computed only when /metrics is scraped.
+    """
+
+    # Upper bounds of the latency histogram buckets, in seconds
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+    def __init__(self):
+        self.commands = {}  # command -> [bucket counts..., +Inf count, sum]
+        self.rest_calls = {}  # (method, route) -> count
+        self.rate_limited = {}  # (method, route) -> count of 429 responses
+
+    def observe_command(self, name, seconds):
+        histogram = self.commands.get(name)
+        if histogram is None:
+            histogram = self.commands[name] = [0] * (len(self.BUCKETS) + 1) + [0.0]
+        histogram[bisect.bisect_left(self.BUCKETS, seconds)] += 1
+        histogram[-1] += seconds
+
+    def count_rest_call(self, key):
+        self.rest_calls[key] = self.rest_calls.get(key, 0) + 1
+
+    def count_rate_limit(self, key):
+        self.rate_limited[key] = self.rate_limited.get(key, 0) + 1
+
+    def render(self, gauges):
+        """Return the exposition text; gauges maps metric name -> (help, {labels: value})."""
+        lines = [
+            '# HELP porkbot_command_invocations_total Commands handled, by command.',
+            '# TYPE porkbot_command_invocations_total counter',
+        ]
+        for name, histogram in self.commands.items():
+            lines.append(f'porkbot_command_invocations_total{{command="{name}"}} {sum(histogram[:-1])}')
+
+        lines += [
+            '# HELP porkbot_command_latency_seconds Time from on_message to the command\'s last REST call.',
+            '# TYPE porkbot_command_latency_seconds histogram',
+        ]
+        for name, histogram in self.commands.items():
+            cumulative = 0
+            for bound, count in zip(self.BUCKETS + ('+Inf',), histogram):
+                cumulative += count
+                lines.append(f'porkbot_command_latency_seconds_bucket{{command="{name}",le="{bound}"}} {cumulative}')
+            lines.append(f'porkbot_command_latency_seconds_sum{{command="{name}"}} {histogram[-1]}')
+            lines.append(f'porkbot_command_latency_seconds_count{{command="{name}"}} {cumulative}')
+
+        for metric, description, counts in (
+            ('porkbot_rest_requests_total', 'REST requests made, by route.', self.rest_calls),
+            ('porkbot_rest_rate_limited_total', 'REST responses with status 429, by route.', self.rate_limited),
+        ):
+            lines += [f'# HELP {metric} {description}', f'# TYPE {metric} counter']
+            for (method, route), count in counts.items():
+                lines.append(f'{metric}{{method="{method}",route="{route}"}} {count}')
+
+        for metric, (description, values) in gauges.items():
+            lines += [f'# HELP {metric} {description}', f'# TYPE {metric} gauge']
+            for labels, value in values.items():
+                lines.append(f'{metric}{{{labels}}} {value}')
+        return '\n'.join(lines) + '\n'
+
+metrics = Metrics()
+
+def coroutine_stack(coro):
+    """Format the chain of awaits a suspended coroutine is waiting in."""
+    frames = []
+    while coro is not None:
+        frame = getattr(coro, 'cr_frame', None) or getattr(coro, 'gi_frame', None)
+        if frame is None:
+            break
+        frames.append((frame, frame.f_lineno))
+        coro = getattr(coro, 'cr_await', None) or getattr(coro, 'gi_yieldfrom', None)
+    return ''.join(traceback.StackSummary.extract(frames).format())
+
+def handler_name_from_frame(frame):
+    """Name the command handler (or else the innermost bot function) on a stack."""
+    innermost = None
+    while frame is not None:
+        name = frame.f_code.co_name
+        if name.startswith('handle_'):
+            return name[len('handle_'):]
+        if innermost is None and frame.f_code.co_filename == __file__:
+            innermost = name
+        frame = frame.f_back
+    return innermost or 'unknown'
+
+class LoopWatchdog:
+    """Samples event-loop lag and records stalls and slow handlers.
+
+    A sampler task measures how late its wakeups are. A separate thread
+    notices when the sampler has not run for LOOP_STALL_THRESHOLD and takes
+    the loop thread's stack with sys._current_frames, which shows the code
+    blocking the loop. Handlers run inside watch(), which records them when
+    they exceed the wall-clock or CPU threshold. CPU is the loop thread's CPU
+    time while the handler ran, so busy concurrent handlers can inflate it.
+    """
+
+    def __init__(self, interval=LOOP_LAG_INTERVAL, stall_threshold=LOOP_STALL_THRESHOLD,
+                 wall_threshold=SLOW_HANDLER_WALL, cpu_threshold=SLOW_HANDLER_CPU, history=50):
+        self.interval = interval
+        self.stall_threshold = stall_threshold
+        self.wall_threshold = wall_threshold
+        self.cpu_threshold = cpu_threshold
+        self.lags = deque(maxlen=int(300 / interval))  # last five minutes
+        self.records = deque(maxlen=history)
+        self.stalls = 0
+        self.log = logging.getLogger('porkbot.perf')
+        self.log.propagate = False
+        self._heartbeat = time.monotonic()
+        self._last_stall = None  # (monotonic time, stack) of the latest stall
+        self._loop_thread = None
+        self._task = None
+
+    def start(self, log_path=PERF_LOG_PATH):
+        """Start sampling; call from the event loop thread."""
+        if self._task:
             return
-        
-        args = message.content.split()
-        if len(args) < 2:
-            help_embed = discord.Embed(
-                title="ℹ️ Reaction Command Help",
-                description="Usage: ?reaction <add/remove/list> [target] [emoji]",
-                color=discord.Color.blue()
-            )
-            help_embed.add_field(
-                name="Commands",
-                value="```?reaction add <target> <emoji>\n?reaction remove <target>\n?reaction list```",
-                inline=False
-            )
-            help_embed.add_field(
-                name="Examples",
-                value="?reaction add @user 😊\n?reaction add username 😊\n?reaction remove @user\n?reaction list",
-                inline=False
-            )
-            await message.channel.send(embed=help_embed)
-            return
-        
-        command = args[1].lower()
-        
-        if command == "add":
-            if len(args) < 4:
-                error_embed = discord.Embed(
-                    title="❌ Missing Arguments",
-                    description="Usage: ?reaction add <target> <emoji>",
-                    color=discord.Color.red()
-                )
-                await message.channel.send(embed=error_embed)
-                return
-            
-            target = args[2]
-            emoji = args[3]
-            
-            # If target is a mention, extract the user ID
-            if target.startswith('<@') and target.endswith('>'):
-                target = target.strip('<@!>')
-            
-            reaction_rules[target] = emoji
-            
-            success_embed = discord.Embed(
-                title="✅ Reaction Rule Added",
-                description=f"Added reaction rule for '{target}' with emoji {emoji}",
-                color=discord.Color.green()
-            )
-            await message.channel.send(embed=success_embed)
-            
-        elif command == "remove":
-            if len(args) < 3:
-                error_embed = discord.Embed(
-                    title="❌ Missing Arguments",
-                    description="Usage: ?reaction remove <target>",
-                    color=discord.Color.red()
-                )
-                await message.channel.send(embed=error_embed)
-                return
-            
-            target = args[2]
-            
-            # If target is a mention, extract the user ID
-            if target.startswith('<@') and target.endswith('>'):
-                target = target.strip('<@!>')
-            
-            if target in reaction_rules:
-                del reaction_rules[target]
-                success_embed = discord.Embed(
-                    title="✅ Reaction Rule Removed",
-                    description=f"Removed reaction rule for '{target}'",
-                    color=discord.Color.green()
-                )
-            else:
-                error_embed = discord.Embed(
-                    title="❌ Rule Not Found",
-                    description=f"No reaction rule found for '{target}'",
-                    color=discord.Color.red()
-                )
-                await message.channel.send(embed=error_embed)
+        if log_path:
+            handler = RotatingFileHandler(log_path, maxBytes=5 * 1024 * 1024, backupCount=3)
+            handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+            self.log.addHandler(handler)
+            self.log.setLevel(logging.INFO)
+        self._loop_thread = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._task = asyncio.create_task(self._sample())
+        threading.Thread(target=self._watch_stalls, name='loop-watchdog', daemon=True).start()
+
+    async def _sample(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(0.0, loop.time() - expected))
+            self._heartbeat = time.monotonic()
+
+    def _watch_stalls(self):
+        reported = None
+        while True:
+            time.sleep(self.stall_threshold / 2)
+            heartbeat = self._heartbeat
+            blocked = time.monotonic() - heartbeat - self.interval
+            if blocked < self.stall_threshold or heartbeat == reported:
+                continue
+            # Report each stall once, while the loop is still blocked in it
+            reported = heartbeat
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            stack = ''.join(traceback.format_stack(frame))
+            self.stalls += 1
+            self._last_stall = (time.monotonic(), stack)
+            self._record('stall', handler_name_from_frame(frame), blocked, None, stack)
+
+    def _record(self, kind, name, wall, cpu, stack):
+        record = {'at': datetime.utcnow(), 'kind': kind, 'name': name, 'wall': wall, 'cpu': cpu, 'stack': stack}
+        self.records.append(record)
+        cpu_text = 'n/a' if cpu is None else f'{cpu:.3f}s'
+        self.log.info('%s %s wall=%.3fs cpu=%s\n%s', kind, name, wall, cpu_text, stack or '')
+        return record
+
+    def _record_waiting(self, name, task, started):
+        # Still running at the wall threshold: keep the await chain it is stuck in
+        stack = coroutine_stack(task.get_coro()) if task else None
+        return self._record('wall', name, time.perf_counter() - started, None, stack)
+
+    @contextmanager
+    def watch(self, name):
+        """Record the enclosed handler if it runs too long or uses too much CPU."""
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        started_monotonic = time.monotonic()
+        cpu_started = time.thread_time()
+        task = asyncio.current_task()
+        waiting = []
+        timer = loop.call_later(
+            self.wall_threshold,
+            lambda: waiting.append(self._record_waiting(name, task, started))
+        )
+        try:
+            yield
+        finally:
+            timer.cancel()
+            wall = time.perf_counter() - started
+            cpu = time.thread_time() - cpu_started
+            if waiting:
+                waiting[0]['wall'] = wall
+                waiting[0]['cpu'] = cpu
+            elif cpu >= self.cpu_threshold:
+                # Use the stack of a stall this handler caused, if one was caught
+                stall = self._last_stall
+                stack = stall[1] if stall and stall[0] >= started_monotonic else None
+                self._record('cpu', name, wall, cpu, stack)
+
+watchdog = LoopWatchdog()
+
+# Message words kept by redaction because commands depend on them: mentions,
+# IDs, numbers and durations
+REDACTION_KEEP_PATTERN = re.compile(r'^(<[@#][!&]?\d+>|\d+[smhd]?)$')
+
+# Payload fields that name or picture a person, blanked in redacted captures
+REDACTED_FIELDS = {'username', 'global_name', 'nick', 'avatar', 'banner', 'bio', 'filename', 'url', 'proxy_url'}
+
+def redact_content(text):
+    """Blank the words of a message, keeping the command name and its mentions and numbers."""
+    words = text.split(' ')
+    return ' '.join(
+        word if (index == 0 and word.startswith(COMMAND_PREFIX)) or REDACTION_KEEP_PATTERN.match(word) else 'x' * len(word)
+        for index, word in enumerate(words)
+    )
+
+def redact_payload(value):
+    """Return a copy of a gateway payload with message text and personal fields blanked."""
+    if isinstance(value, list):
+        return [redact_payload(item) for item in value]
+    if not isinstance(value, dict):
+        return value
+    redacted = {}
+    for key, item in value.items():
+        if key == 'content' and isinstance(item, str):
+            redacted[key] = redact_content(item)
+        elif key == 'embeds':
+            redacted[key] = []
+        elif key in REDACTED_FIELDS and isinstance(item, str):
+            redacted[key] = 'redacted'
+        else:
+            redacted[key] = redact_payload(item)
+    return redacted
+
+class GatewayRecorder:
+    """Appends received gateway dispatches to a gzip JSONL file.
+
+    The event loop only queues the raw frame; decoding, redaction and
+    compression happen on a background thread. Each batch is written as its
+    own gzip member, so a capture stays readable up to the last batch even if
+    the process is killed.
+    """
+
+    def __init__(self, path, redact=False):
+        self.path = path
+        self.redact = redact
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._write_loop, name='gateway-recorder', daemon=True)
+        self._thread.start()
+
+    def record(self, frame):
+        self._queue.put((time.time(), frame))
+
+    def _write_loop(self):
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            closing = None in batch
+            lines = []
+            for item in filter(None, batch):
+                # A frame that cannot be decoded is skipped; the thread must keep draining the queue
+                try:
+                    line = self._encode(item)
+                except Exception as e:
+                    print(f"Skipping gateway frame that could not be recorded: {e!r}")
+                    continue
+                if line:
+                    lines.append(line)
+            if lines:
+                try:
+                    with gzip.open(self.path, 'at', encoding='utf-8') as file:
+                        file.writelines(lines)
+                except OSError as e:
+                    print(f"Error writing gateway capture: {e}")
+            if closing:
                 return
-            
-            await message.channel.send(embed=success_embed)
-            
-        elif command == "list":
-            if not reaction_rules:
-                info_embed = discord.Embed(
-                    title="ℹ️ No Reaction Rules",
-                    description="There are no active reaction rules.",
-                    color=discord.Color.blue()
-                )
-            else:
-                info_embed = discord.Embed(
-                    title="ℹ️ Active Reaction Rules",
-                    description="Current reaction rules:",
-                    color=discord.Color.blue()
-                )
-                for target, emoji in reaction_rules.items():
-                    info_embed.add_field(
-                        name=f"Target: {target}",
-                        value=f"Emoji: {emoji}",
-                        inline=False
-                    )
-            await message.channel.send(embed=info_embed)
-            
+
+    def _encode(self, item):
+        at, frame = item
+        if isinstance(frame, bytes):
+            frame = frame.decode('utf-8')
+        payload = json.loads(frame)
+        # Only dispatches reach the handlers; heartbeats and hellos are not replayed
+        if payload.get('op') != 0:
+            return None
+        data = redact_payload(payload['d']) if self.redact else payload['d']
+        return json.dumps({'at': round(at, 6), 'event': payload['t'], 'd': data}, separators=(',', ':')) + '\n'
+
+    def close(self):
+        """Write everything queued so far and stop the writer thread."""
+        self._queue.put(None)
+        self._thread.join()
+
+gateway_recorder = GatewayRecorder(GATEWAY_CAPTURE_PATH, GATEWAY_CAPTURE_REDACT) if GATEWAY_CAPTURE_PATH else None
+
+# Store reaction rules
+reaction_rules = {}
+
+# Store active autosend jobs by job ID
+autosend_jobs = {}
+
+# Prefix shared by every command
+COMMAND_PREFIX = '?'
+
+# Map of command name (without prefix) to its handler coroutine
+COMMANDS = {}
+
+def command(*names):
+    """Register the decorated coroutine as the handler for the given command names."""
+    def decorator(func):
+        for name in names:
+            COMMANDS[name] = func
+        return func
+    return decorator
+
+def resolve_command(content):
+    """Return the handler and arguments for a command message, or (None, None)."""
+    if not content.startswith(COMMAND_PREFIX):
+        return None, None
+    args = content.split()
+    handler = COMMANDS.get(args[0][len(COMMAND_PREFIX):]) if args else None
+    return handler, args
+
+# Seconds per unit for durations such as 30m or 2d
+DURATION_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+def parse_duration(text):
+    """Parse a duration like 30m into seconds; returns None if it is invalid."""
+    match = re.match(r'^(\d+)([smhd])$', text.lower())
+    if not match:
+        return None
+    return int(match.group(1)) * DURATION_UNITS[match.group(2)]
+
+def format_duration(seconds):
+    """Format seconds with the largest unit that divides them, like 90m or 2d."""
+    for unit, size in sorted(DURATION_UNITS.items(), key=lambda item: -item[1]):
+        if seconds % size == 0:
+            return f'{seconds // size}{unit}'
+
+def parse_escalations(text):
+    """Parse WARN_ESCALATIONS into (count, window seconds, timeout seconds) rules."""
+    rules = []
+    for rule in filter(None, (part.strip() for part in text.split(','))):
+        match = re.match(r'^(\d+)/(\w+):(\w+)$', rule)
+        window = parse_duration(match.group(2)) if match else None
+        timeout = parse_duration(match.group(3)) if match else None
+        if not (window and timeout and int(match.group(1)) > 0) or timeout > 2592000:
+            raise ValueError(f"Invalid WARN_ESCALATIONS rule {rule!r}; expected e.g. 3/24h:1h with a timeout of at most 30d")
+        rules.append((int(match.group(1)), window, timeout))
+    return rules
+
+class WarningLedger:
+    """Recent warning times per (guild ID, user ID) for sliding-window escalation.
+
+    Each member keeps a deque of their latest warning times, capped at the
+    largest rule count. A rule of count warnings within window matches when
+    the count-th most recent warning is inside the window, so checking a rule
+    looks at one element however long the member's history is.
+    """
+
+    def __init__(self, rules, expiry):
+        # Most severe first, so the longest matching timeout wins
+        self.rules = sorted(rules, key=lambda rule: -rule[2])
+        # Warnings must outlive every window they can count towards
+        self.expiry = max([expiry] + [window for _, window, _ in rules])
+        self.capacity = max([count for count, _, _ in rules] or [1])
+        self._warnings = {}
+
+    def __len__(self):
+        return len(self._warnings)
+
+    def _prune(self, history, now):
+        while history and now - history[0] >= self.expiry:
+            history.popleft()
+
+    def add(self, key, at):
+        """Record a warning; returns the most severe (count, window, timeout) rule it triggers, or None."""
+        history = self._warnings.get(key)
+        if history is None:
+            history = self._warnings[key] = deque(maxlen=self.capacity)
+        self._prune(history, at)
+        history.append(at)
+        for count, window, timeout in self.rules:
+            if len(history) >= count and at - history[-count] <= window:
+                return count, window, timeout
+        return None
+
+    def recent(self, key, window, now):
+        """Count the key's warnings within window seconds, up to the capacity."""
+        history = self._warnings.get(key, ())
+        return sum(1 for at in history if now - at <= window)
+
+    def times(self, key):
+        return list(self._warnings.get(key, ()))
+
+    def restore(self, key, times, now):
+        """Load persisted warning times; returns False if all of them have expired."""
+        history = deque(sorted(times), maxlen=self.capacity)
+        self._prune(history, now)
+        if not history:
+            return False
+        self._warnings[key] = history
+        return True
+
+    def expire(self, key, now):
+        """Drop the key once its latest warning has expired; returns True if it was dropped."""
+        history = self._warnings.get(key)
+        if history is None:
+            return True
+        self._prune(history, now)
+        if history:
+            return False
+        del self._warnings[key]
+        return True
+
+warning_ledger = WarningLedger(parse_escalations(WARN_ESCALATIONS), parse_duration(WARN_EXPIRY) or 30 * 86400)
+
+def warning_store_key(key):
+    guild_id, user_id = key
+    return f'{guild_id}:{user_id}'
+
+def arm_warning_expiry(key):
+    """Forget the key's warnings when its latest one expires."""
+    times = warning_ledger.times(key)
+    if not times:
+        return
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max(0, times[-1] + warning_ledger.expiry - time.time())
+    scheduler.schedule(('warnings', key), deadline, lambda: expire_warnings(key))
+
+async def expire_warnings(key):
+    if warning_ledger.expire(key, time.time()):
+        store.delete('warnings', warning_store_key(key))
+    else:
+        arm_warning_expiry(key)
+
+async def load_warnings():
+    warnings = await asyncio.to_thread(store.load, 'warnings')
+    now = time.time()
+    for store_key, times in warnings.items():
+        guild_id, user_id = (int(part) for part in store_key.split(':'))
+        if not owns_guild(guild_id):
+            continue
+        key = (guild_id, user_id)
+        if warning_ledger.restore(key, times, now):
+            arm_warning_expiry(key)
         else:
-            error_embed = discord.Embed(
-                title="❌ Invalid Command",
-                description="Valid commands: add, remove, list",
-                color=discord.Color.red()
-            )
-            await message.channel.send(embed=error_embed)
-    
-    # Handle member count command
-    if message.content.startswith('?memcount'):
-        if not has_command_permission(message.author, 'memcount'):
-            error_embed = discord.Embed(
-                title="❌ Permission Denied",
-                description="You don't have permission to use this command!",
-                color=discord.Color.red()
-            )
-            await message.channel.send(embed=error_embed)
-            return
-        
+            store.delete('warnings', store_key)
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton that finds every pattern in one pass over a sequence.
+
+    Patterns are sequences of hashable symbols, so the same automaton works
+    over lists of words as well as over plain strings.
+    """
+
+    def __init__(self, patterns=()):
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+        for pattern, value in patterns:
+            self._add(pattern, value)
+        self._build()
+
+    def _add(self, pattern, value):
+        state = 0
+        for symbol in pattern:
+            next_state = self._goto[state].get(symbol)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][symbol] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            state = next_state
+        self._output[state] += (value,)
+
+    def _build(self):
+        # Breadth-first so every failure link points at an already finished state
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for symbol, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and symbol not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(symbol, 0)
+                self._output[next_state] += self._output[self._fail[next_state]]
+
+    def search(self, sequence):
+        """Yield the value of every pattern occurrence in the sequence."""
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for symbol in sequence:
+            while state and symbol not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(symbol, 0)
+            if output[state]:
+                yield from output[state]
+
+class ReactionIndex:
+    """Compiled form of reaction_rules used to pick the auto-reactions for a message.
+
+    Rules whose target is a user ID are matched against the IDs of mentioned
+    users. All other targets are matched as case-insensitive substrings of the
+    message content and mentioned usernames by one automaton.
+    """
+
+    def __init__(self, rules=None):
+        self.rebuild(rules or {})
+
+    def rebuild(self, rules):
+        """Recompile the index from a target -> emoji mapping."""
+        self.user_rules = {int(target): emoji for target, emoji in rules.items() if target.isdigit()}
+        name_rules = [(target.lower(), emoji) for target, emoji in rules.items() if not target.isdigit()]
+        self.name_automaton = KeywordAutomaton(name_rules) if name_rules else None
+
+    def emojis_for(self, message):
+        """Return the emojis to add to the message, each at most once and in rule order."""
+        emojis = {}
+        for mention in message.mentions:
+            emoji = self.user_rules.get(mention.id)
+            if emoji:
+                emojis[emoji] = None
+            if self.name_automaton:
+                emojis.update(dict.fromkeys(self.name_automaton.search(mention.name.lower())))
+        if self.name_automaton:
+            emojis.update(dict.fromkeys(self.name_automaton.search(message.content.lower())))
+        return list(emojis)
+
+# Compiled reaction rules, rebuilt whenever reaction_rules changes
+reaction_index = ReactionIndex(reaction_rules)
+
+# Information shown by the about command
+ABOUT_ME = {
+    "name": "PorkBot",
+    "description": "Made by <@799190402896494612> to guard Porkchop SMP. Join today discord.gg/porkchopsmp.",
+    "version": "1.0.0",
+    "features": [
+        "Moderation commands",
+        "Server management",
+        "Automatic reactions",
+        "Member tracking"
+    ]
+}
+
+# Static replies in Discord's embed format, built once into RESPONSES at startup
+STATIC_EMBEDS = {
+    'permission_denied': {
+        'title': "❌ Permission Denied",
+        'description': "You don't have permission to use this command!",
+        'color': discord.Color.red().value,
+    },
+    'hello': {
+        'title': "👋 Welcome to Porkchop SMP!",
+        'description': "We're glad to have you here!",
+        'color': discord.Color.green().value,
+    },
+    'ip': {
+        'title': "🌐 Server Status",
+        'description': "The ip is `mc.porkchopsmp.online`. Don't forget to claim your free start kits using /kit.",
+        'color': discord.Color.blue().value,
+    },
+    'end_fight': {
+        'title': "⚔️ End Fight Information",
+        'description': "Endfight will be held on 8th June.",
+        'color': discord.Color.red().value,
+    },
+    'staff': {
+        'title': "👨‍💼 Staff Contact",
+        'description': "To contact staff, please use [this channel](https://discord.com/channels/1083270436349018163/1292154352240431186).",
+        'color': discord.Color.gold().value,
+    },
+    'help_moderation': {
+        'title': "🔨 Moderation Commands",
+        'description': "Essential tools for server moderation and management. All commands require appropriate permissions.",
+        'color': discord.Color.blue().value,
+        'fields': [
+            {'name': "🛡️ User Management", 'value': "```?mute @user <duration> <reason>\n?unmute @user\n?ban @user/user_id <reason>\n?tempban @user/user_id <duration> <reason>\n?unban <user_id>\n?kick @user <reason>\n?temprole @user <role> <duration>\n?massban / ?masskick <users...> [reason]\n?massmute <duration> <users...> [reason]\n?warn @user <reason>\n?modlog [@user] [by] [action] [page]\n?case <number>```", 'inline': False},
+            {'name': "📝 Mute Command Details", 'value': "• Duration format: s/m/h/d (max 30 days)\n• Example: `?mute @user 30m Spamming`\n• Can also reply to message: `?mute 30m Spamming`", 'inline': False},
+            {'name': "🗑️ Message Management", 'value': "```?purge <amount> [@user] [filters]\n?snipe [n]```", 'inline': False},
+            {'name': "🔒 Channel Management", 'value': "```?lock / ?unlock\n?slowmode <seconds>```", 'inline': False},
+            {'name': "ℹ️ Additional Info", 'value': "• All moderation actions are logged\n• Maximum purge amount: 10000 messages\n• Slowmode range: 0-21600 seconds (6 hours)", 'inline': False},
+        ],
+        'footer': {'text': "Page 1/4 • Use the buttons to navigate"},
+    },
+    'help_server': {
+        'title': "⚙️ Server Management Commands",
+        'description': "Tools for server configuration, information, and member tracking.",
+        'color': discord.Color.blue().value,
+        'fields': [
+            {'name': "📊 Server Information", 'value': "```?serverinfo\n?memcount\n?debug memory / perf```", 'inline': False},
+            {'name': "📈 Server Info Details", 'value': "• Shows server statistics\n• Displays member counts\n• Lists channel information\n• Shows role information", 'inline': False},
+            {'name': "👥 Member Count Channel", 'value': "• Creates dynamic voice channel\n• Updates automatically\n• Shows non-bot members\n• Admin only command", 'inline': False},
+        ],
+        'footer': {'text': "Page 2/4 • Use the buttons to navigate"},
+    },
+    'help_general': {
+        'title': "ℹ️ General Commands",
+        'description': "General purpose commands for server information and assistance.",
+        'color': discord.Color.blue().value,
+        'fields': [
+            {'name': "📢 Information Commands", 'value': "```hello\nip / the ip\nend fight\nstaff```", 'inline': False},
+            {'name': "📋 Command Details", 'value': "• `hello` - Welcome message\n• `ip` - Server status\n• `end fight` - Event information\n• `staff` - Contact information", 'inline': False},
+            {'name': "ℹ️ Usage Notes", 'value': "• Commands are case-insensitive\n• No prefix needed for these commands\n• Available to all members", 'inline': False},
+        ],
+        'footer': {'text': "Page 3/4 • Use the buttons to navigate"},
+    },
+    'help_fun': {
+        'title': "🎮 Fun Commands",
+        'description': "Entertainment and fun commands for server members.",
+        'color': discord.Color.blue().value,
+        'fields': [
+            {'name': "💥 Fun Commands", 'value': "```?nuke```", 'inline': False},
+            {'name': "⚠️ Nuke Command", 'value': "• Troll command\n• Mutes the user for 24 hours\n• Includes funny message\n• Safe for server use", 'inline': False},
+            {'name': "🎯 Usage", 'value': "Simply type `?nuke` to activate the command", 'inline': False},
+        ],
+        'footer': {'text': "Page 4/4 • Use the buttons to navigate"},
+    },
+}
+
+# Replies with variable parts; {placeholders} in their text are filled by render_response
+EMBED_TEMPLATES = {
+    'error': {
+        'title': "❌ Error",
+        'description': "An error occurred: {error}",
+        'color': discord.Color.red().value,
+    },
+    'about': {
+        'title': f"🤖 About {ABOUT_ME['name']}",
+        'description': ABOUT_ME['description'],
+        'color': discord.Color.blue().value,
+        'fields': [
+            {'name': "Version", 'value': ABOUT_ME['version'], 'inline': True},
+            {'name': "Features", 'value': "\n".join(f"• {feature}" for feature in ABOUT_ME['features']), 'inline': False},
+            {'name': "Status", 'value': "Online and watching over Porkchop SMP", 'inline': False},
+        ],
+        'footer': {'text': "Requested by {requester}"},
+    },
+}
+
+# Prebuilt static embeds; never mutate these, they are shared by every reply
+RESPONSES = {name: discord.Embed.from_dict(data) for name, data in STATIC_EMBEDS.items()}
+
+# Help menu pages in display order
+HELP_PAGES = [RESPONSES['help_moderation'], RESPONSES['help_server'], RESPONSES['help_general'], RESPONSES['help_fun']]
+
+# Prefix of the custom IDs on help menu buttons; the rest encodes the target page
+HELP_BUTTON_PREFIX = 'help:'
+
+def build_help_view(page):
+    """Build the navigation buttons for a help page.
+
+    Each button's custom ID carries the page it leads to, so on_interaction
+    can serve clicks without per-menu state, waiters or timeouts, including
+    on menus sent before a restart.
+    """
+    page_count = len(HELP_PAGES)
+    view = discord.ui.View(timeout=None)
+    view.add_item(discord.ui.Button(
+        emoji="⬅️",
+        style=discord.ButtonStyle.secondary,
+        custom_id=f"{HELP_BUTTON_PREFIX}{(page - 1) % page_count}:prev"
+    ))
+    view.add_item(discord.ui.Button(
+        emoji="➡️",
+        style=discord.ButtonStyle.secondary,
+        custom_id=f"{HELP_BUTTON_PREFIX}{(page + 1) % page_count}:next"
+    ))
+    # Stopped views are still sent but not kept in discord.py's view store
+    view.stop()
+    return view
+
+def _fill_template(data, values):
+    if isinstance(data, str):
+        return data.format(**values)
+    if isinstance(data, dict):
+        return {key: _fill_template(value, values) for key, value in data.items()}
+    if isinstance(data, list):
+        return [_fill_template(item, values) for item in data]
+    return data
+
+def render_response(name, **values):
+    """Build a dynamic embed from EMBED_TEMPLATES, filling in the given values."""
+    return discord.Embed.from_dict(_fill_template(EMBED_TEMPLATES[name], values))
+
+# Keyword triggers: phrase (matched on whole words, case-insensitive) -> response key
+KEYWORD_TRIGGERS = {
+    'hello': 'hello',
+    'ip': 'ip',
+    'the ip': 'ip',
+    'end fight': 'end_fight',
+    'staff': 'staff',
+}
+
+# Keyword responses from the catalog, sent in this order when several match
+KEYWORD_RESPONSES = ['hello', 'ip', 'end_fight', 'staff']
+
+# Built once at startup from the trigger table
+keyword_automaton = KeywordAutomaton(
+    (phrase.split(), response) for phrase, response in KEYWORD_TRIGGERS.items()
+)
+
+def build_member_cache_flags(policy):
+    """Translate MEMBER_CACHE_POLICY into discord.py member cache flags."""
+    if policy == 'full':
+        return discord.MemberCacheFlags.from_intents(intents)
+    if policy == 'recent':
+        # discord.py keeps members in voice; joins and authors go to the bounded
+        # recent_members instead of the guild cache, which would never shrink
+        flags = discord.MemberCacheFlags.from_intents(intents)
+        flags.joined = False
+        return flags
+    if policy == 'none':
+        return discord.MemberCacheFlags.none()
+    raise ValueError(f"MEMBER_CACHE_POLICY must be full, recent or none, not {policy!r}")
+
+# Longest a shutdown waits for queued mod-log entries to be sent
+SHUTDOWN_FLUSH_TIMEOUT = 10  # seconds
+
+class FlushOnClose:
+    """Sends queued mod-log entries before the client disconnects."""
+
+    async def close(self):
+        if not self.is_closed():
+            try:
+                await asyncio.wait_for(mod_log.flush(), SHUTDOWN_FLUSH_TIMEOUT)
+            except Exception as e:
+                print(f"Error flushing the mod log on shutdown: {e!r}")
+        await super().close()
+
+class BotClient(FlushOnClose, discord.Client):
+    pass
+
+class ShardedBotClient(FlushOnClose, discord.AutoShardedClient):
+    pass
+
+def build_client():
+    """Create the plain or auto-sharded client described by the configuration."""
+    options = {
+        'intents': intents,
+        'member_cache_flags': build_member_cache_flags(MEMBER_CACHE_POLICY),
+        'chunk_guilds_at_startup': MEMBER_CACHE_POLICY == 'full',
+        # Raw gateway frames are only dispatched for the capture recorder
+        'enable_debug_events': bool(GATEWAY_CAPTURE_PATH),
+    }
+    if not SHARDED:
+        return BotClient(**options)
+    if SHARD_IDS and not SHARD_COUNT:
+        raise ValueError("SHARD_IDS needs SHARD_COUNT to be set")
+    return ShardedBotClient(shard_count=SHARD_COUNT, shard_ids=SHARD_IDS, **options)
+
+client = build_client()
+
+def owns_guild(guild_id):
+    """Return True if a shard run by this process serves the guild.
+
+    Timed jobs are only run by the owning process, so processes sharing the
+    database never run the same job twice.
+    """
+    if not SHARD_IDS:
+        return True
+    if guild_id is None:
+        return False
+    return (guild_id >> 22) % SHARD_COUNT in SHARD_IDS
+
+# Members seen recently, keyed by (guild_id, member_id), under the 'recent' policy
+recent_members = OrderedDict()
+
+def remember_member(member):
+    """Keep a member in the bounded recent-member cache."""
+    if MEMBER_CACHE_POLICY != 'recent':
+        return
+    key = (member.guild.id, member.id)
+    recent_members[key] = member
+    recent_members.move_to_end(key)
+    if len(recent_members) > RECENT_MEMBER_CACHE_SIZE:
+        recent_members.popitem(last=False)
+
+def forget_updated_members(connection):
+    """Drop recent_members entries when Discord reports the member changed.
+
+    Without joined caching discord.py ignores updates for members it does
+    not hold and dispatches no on_member_update, so the update is caught
+    where the gateway event is parsed; the next lookup fetches a fresh copy.
+    """
+    parse_member_update = connection.parsers['GUILD_MEMBER_UPDATE']
+
+    def parse_guild_member_update(data):
+        key = (int(data['guild_id']), int(data['user']['id']))
+        recent_members.pop(key, None)
+        member_permission_cache.pop(key, None)
+        parse_member_update(data)
+
+    connection.parsers['GUILD_MEMBER_UPDATE'] = parse_guild_member_update
+
+if MEMBER_CACHE_POLICY == 'recent':
+    forget_updated_members(client._connection)
+
+# REST route of the request in progress and when the task's latest request finished
+current_route = contextvars.ContextVar('current_route', default=None)
+last_rest_at = contextvars.ContextVar('last_rest_at', default=None)
+
+def instrument_http(http):
+    """Count REST calls by route and note when each task's latest call finished."""
+    original_request = http.request
+
+    async def request(route, **kwargs):
+        key = (route.method, route.path)
+        metrics.count_rest_call(key)
+        token = current_route.set(key)
         try:
-            # Count non-bot members
-            member_count = sum(1 for member in message.guild.members if not member.bot)
-            
-            # Create voice channel
-            channel = await message.guild.create_voice_channel(
-                name=f"Members: {member_count}",
-                reason="Member count tracking channel"
-            )
-            
-            # Send confirmation
-            success_embed = discord.Embed(
-                title="✅ Member Count Channel Created",
-                description=f"Created voice channel: {channel.mention}",
-                color=discord.Color.green()
-            )
-            success_embed.add_field(
-                name="Current Member Count",
-                value=str(member_count),
-                inline=False
-            )
-            success_embed.add_field(
-                name="Note",
-                value="The channel will automatically update when members join or leave.",
-                inline=False
-            )
-            await message.channel.send(embed=success_embed)
-            
-        except discord.Forbidden:
-            error_embed = discord.Embed(
-                title="❌ Permission Error",
-                description="I don't have permission to create voice channels!",
-                color=discord.Color.red()
-            )
-            await message.channel.send(embed=error_embed)
-        except Exception as e:
-            error_embed = discord.Embed(
-                title="❌ Error",
-                description=f"An error occurred: {str(e)}",
-                color=discord.Color.red()
-            )
-            await message.channel.send(embed=error_embed)
+            return await original_request(route, **kwargs)
+        finally:
+            current_route.reset(token)
+            last_rest_at.set(time.perf_counter())
+
+    http.request = request
+
+class RateLimitCounter(logging.Handler):
+    """Counts the 429s that discord.py retries internally, using its warnings.
+
+    discord.py logs one "responded with 429" warning per 429 response; a
+    global limit adds a second warning for the same response, which is not
+    counted.
+    """
+
+    def emit(self, record):
+        if 'responded with 429' in str(record.msg):
+            # Emitted synchronously inside the wrapped request, so the route is known
+            metrics.count_rate_limit(current_route.get() or ('?', 'global'))
+
+def collect_gauges():
+    """Read gauge values at scrape time."""
+    if isinstance(client, discord.AutoShardedClient):
+        latencies = client.latencies
+    else:
+        latencies = [(0, client.latency)]
+    structures = {
+        'reaction_rules': len(reaction_rules),
+        'autosend_jobs': len(autosend_jobs),
+        'scheduled_actions': len(scheduled_actions),
+        'scheduler': len(scheduler),
+        'hello_cooldowns': len(hello_cooldowns),
+        'report_cooldowns': len(report_cooldowns),
+        'member_permission_cache': len(member_permission_cache),
+        'recent_members': len(recent_members),
+        'snipe_cache': len(snipe_cache),
+        'mod_log_pending': len(mod_log),
+        'guild_stats': len(guild_stats),
+        'memcount_channels': len(memcount_channels),
+    }
+    lags = watchdog.lags
+    return {
+        'porkbot_event_loop_lag_seconds': (
+            'Event-loop lag: latest sample and maximum over the last five minutes.',
+            {'window="latest"': lags[-1] if lags else 0, 'window="max"': max(lags, default=0)}
+        ),
+        'porkbot_gateway_latency_seconds': (
+            'Gateway heartbeat latency, by shard.',
+            {f'shard="{shard_id}"': latency for shard_id, latency in latencies}
+        ),
+        'porkbot_structure_size': (
+            'Entries held by each in-memory structure.',
+            {f'structure="{name}"': size for name, size in structures.items()}
+        ),
+    }
+
+async def handle_metrics_request(request):
+    return web.Response(text=metrics.render(collect_gauges()), content_type='text/plain', charset='utf-8')
+
+# Runner for the metrics HTTP server once it has started
+metrics_runner = None
+
+async def start_metrics_server():
+    """Serve /metrics on METRICS_HOST:METRICS_PORT."""
+    global metrics_runner
+    app = web.Application()
+    app.router.add_get('/metrics', handle_metrics_request)
+    metrics_runner = web.AppRunner(app, access_log=None)
+    await metrics_runner.setup()
+    port = METRICS_PORT + (SHARD_IDS[0] if SHARD_IDS else 0)
+    await web.TCPSite(metrics_runner, METRICS_HOST, port).start()
+    print(f"Serving metrics on http://{METRICS_HOST}:{port}/metrics")
+
+if METRICS_PORT:
+    instrument_http(client.http)
+    logging.getLogger('discord.http').addHandler(RateLimitCounter(logging.WARNING))
+
+@client.event
+async def on_socket_raw_receive(frame):
+    # Only dispatched when GATEWAY_CAPTURE_PATH turned on the client's debug events
+    gateway_recorder.record(frame)
+
+async def resolve_member(guild, user_id):
+    """Return a member from the caches, fetching it from the API if needed."""
+    member = guild.get_member(user_id) or recent_members.get((guild.id, user_id))
+    if member is None:
+        member = await guild.fetch_member(user_id)
+        remember_member(member)
+    return member
+
+def member_permission_mask(member):
+    """Return the member's effective permission bitmask, computing it once per role set."""
+    key = (member.guild.id, member.id)
+    mask = member_permission_cache.get(key)
+    if mask is None:
+        mask = 0
+        for role in member.roles:
+            mask |= ROLE_MASKS.get(role.id, 0)
+        # Only cached members get on_member_update, which keeps the entry fresh
+        if member.guild.get_member(member.id) is not None:
+            member_permission_cache[key] = mask
+    return mask
+
+def has_command_permission(member, command):
+    """Check if a member has permission to use a specific command."""
+    return bool(member_permission_mask(member) & PERMISSION_BITS[command])
+
+@client.event
+async def on_ready():
+    print(f'We have logged in as {client.user}')
     
-    # Handle unban command
-    if message.content.startswith('?unban'):
-        if not has_command_permission(message.author, 'unban'):
-            error_embed = discord.Embed(
-                title="❌ Permission Denied",
-                description="You don't have permission to use this command!",
-                color=discord.Color.red()
-            )
-            await message.channel.send(embed=error_embed)
-            return
-        
-        # Parse command arguments
-        args = message.content.split()
-        if len(args) < 2:
-            help_embed = discord.Embed(
-                title="ℹ️ Unban Command Help",
-                description="Usage: ?unban <user_id>",
-                color=discord.Color.blue()
-            )
-            help_embed.add_field(
-                name="Example",
-                value="?unban 123456789012345678",
-                inline=False
-            )
-            await message.channel.send(embed=help_embed)
-            return
-        
-        try:
-            # Get user ID
-            user_id = int(args[1])
-            
-            # Get banned user
-            banned_user = await client.fetch_user(user_id)
-            
-            # Unban the user
-            await message.guild.unban(banned_user)
-            
-            # Create embed for unban confirmation
-            unban_embed = discord.Embed(
-                title="🔓 User Unbanned",
-                color=discord.Color.green()
-            )
-            unban_embed.add_field(
-                name="User",
-                value=f"{banned_user.mention} ({banned_user.id})",
-                inline=False
-            )
-            unban_embed.add_field(
-                name="Moderator",
-                value=message.author.mention,
-                inline=False
-            )
-            unban_embed.set_footer(text=f"Unbanned at {datetime.utcnow()}")
-            
-            # Send confirmation to the mod log channel
-            mod_log_channel = client.get_channel(MOD_LOG_CHANNEL_ID)
-            if mod_log_channel:
-                await mod_log_channel.send(embed=unban_embed)
-            
-            # Send quick confirmation to the command channel
-            confirm_embed = discord.Embed(
-                title="✅ Unban Successful",
-                description=f"{banned_user.mention} has been unbanned.",
-                color=discord.Color.green()
-            )
-            confirm_embed.add_field(
-                name="Details",
-                value=f"Check <#{MOD_LOG_CHANNEL_ID}> for more information.",
-                inline=False
-            )
-            await message.channel.send(embed=confirm_embed)
-            
-        except ValueError:
-            error_embed = discord.Embed(
-                title="❌ Invalid User ID",
-                description="Please provide a valid user ID!",
-                color=discord.Color.red()
-            )
-            await message.channel.send(embed=error_embed)
-        except discord.NotFound:
-            error_embed = discord.Embed(
-                title="❌ User Not Found",
-                description="Could not find a user with that ID!",
-                color=discord.Color.red()
-            )
-            await message.channel.send(embed=error_embed)
-        except discord.Forbidden:
-            error_embed = discord.Embed(
-                title="❌ Permission Error",
-                description="I don't have permission to unban that user!",
-                color=discord.Color.red()
-            )
-            await message.channel.send(embed=error_embed)
-        except Exception as e:
-            error_embed = discord.Embed(
-                title="❌ Error",
-                description=f"An error occurred: {str(e)}",
-                color=discord.Color.red()
-            )
-            await message.channel.send(embed=error_embed)
+    # Set custom status
+    activity = discord.Activity(
+        type=discord.ActivityType.watching,  # You can change this to playing, listening, etc.
+        name="over Porkchop SMP"  # Custom status text
+    )
+    await client.change_presence(activity=activity, status=discord.Status.online)
     
-    # Handle ban command
-    if message.content.startswith('?ban'):
-        if not has_command_permission(message.author, 'ban'):
-            error_embed = discord.Embed(
-                title="❌ Permission Denied",
-                description="You don't have permission to use this command!",
-                color=discord.Color.red()
-            )
-            await message.channel.send(embed=error_embed)
-            return
-        
-        # Parse command arguments
-        args = message.content.split()
-        if len(args) < 3:
-            help_embed = discord.Embed(
-                title="ℹ️ Ban Command Help",
-                description="Usage: ?ban @user/user_id <reason>",
-                color=discord.Color.blue()
-            )
-            help_embed.add_field(
-                name="Examples",
-                value="?ban @user Breaking server rules\n?ban 123456789012345678 Breaking server rules",
-                inline=False
-            )
-            await message.channel.send(embed=help_embed)
-            return
-        
+    # You can access this information later if needed
+    client.about_me = ABOUT_ME
+    
+    # Seed guild statistics once; gateway events keep them current afterwards
+    for guild in client.guilds:
+        guild_stats[guild.id] = GuildStats.from_guild(guild)
+    
+    # Restore state saved before the last restart
+    await load_state()
+    
+    if METRICS_PORT and metrics_runner is None:
+        await start_metrics_server()
+    
+    watchdog.start()
+
+@client.event
+async def on_member_update(before, after):
+    # Drop the cached permission mask when the member's roles change
+    if before.roles != after.roles:
+        member_permission_cache.pop((after.guild.id, after.id), None)
+
+@client.event
+async def on_member_join(member):
+    remember_member(member)
+    stats = guild_stats.get(member.guild.id)
+    if stats:
+        stats.member_joined(member)
+    if member.guild.id in memcount_channels:
+        memcount_channels[member.guild.id].request_update()
+
+@client.event
+async def on_raw_member_remove(payload):
+    # Raw event so leaves are counted even when the member was not cached
+    member_permission_cache.pop((payload.guild_id, payload.user.id), None)
+    recent_members.pop((payload.guild_id, payload.user.id), None)
+    stats = guild_stats.get(payload.guild_id)
+    if stats:
+        stats.member_left(payload.user)
+    if payload.guild_id in memcount_channels:
+        memcount_channels[payload.guild_id].request_update()
+
+@client.event
+async def on_guild_join(guild):
+    guild_stats[guild.id] = GuildStats.from_guild(guild)
+
+@client.event
+async def on_guild_channel_create(channel):
+    stats = guild_stats.get(channel.guild.id)
+    if stats:
+        stats.channel_created(channel)
+
+@client.event
+async def on_guild_channel_update(before, after):
+    stats = guild_stats.get(after.guild.id)
+    if stats and type(before) is not type(after):
+        stats.channel_deleted(before)
+        stats.channel_created(after)
+
+@client.event
+async def on_guild_channel_delete(channel):
+    stats = guild_stats.get(channel.guild.id)
+    if stats:
+        stats.channel_deleted(channel)
+    
+    # Stop tracking a member count channel that was deleted
+    tracker = memcount_channels.get(channel.guild.id)
+    if tracker and tracker.channel_id == channel.id:
+        tracker.cancel()
+        del memcount_channels[channel.guild.id]
+        store.delete('memcount', channel.guild.id)
+
+@client.event
+async def on_guild_role_create(role):
+    stats = guild_stats.get(role.guild.id)
+    if stats:
+        stats.role_created()
+
+@client.event
+async def on_guild_role_delete(role):
+    stats = guild_stats.get(role.guild.id)
+    if stats:
+        stats.role_deleted()
+    # Members losing a permission role are not always sent a member update
+    if role.id in ROLE_MASKS:
+        member_permission_cache.clear()
+
+@client.event
+async def on_guild_update(before, after):
+    # Name, owner, icon and features are read when the embed is built
+    stats = guild_stats.get(after.id)
+    if stats:
+        stats.invalidate()
+
+@client.event
+async def on_interaction(interaction):
+    custom_id = (interaction.data or {}).get('custom_id', '')
+    if interaction.type is not discord.InteractionType.component or not custom_id.startswith(HELP_BUTTON_PREFIX):
+        return
+    
+    # Help menu navigation: the button's custom ID names the page to show
+    try:
+        page = int(custom_id[len(HELP_BUTTON_PREFIX):].split(':')[0]) % len(HELP_PAGES)
+    except ValueError:
+        return
+    await interaction.response.edit_message(embed=HELP_PAGES[page], view=build_help_view(page))
+
+@client.event
+async def on_raw_message_delete(payload):
+    # Only messages still in the client's cache have content to remember
+    message = payload.cached_message
+    if message is None or message.author.bot:
+        return
+    snipe_cache.record(
+        payload.channel_id,
+        message.author.id,
+        message.content,
+        [attachment.url for attachment in message.attachments]
+    )
+
+# Cooldown for the "hello" response, per user
+hello_cooldowns = CooldownStore(300)  # 300 seconds = 5 minutes
+
+# Cooldown for the report command, per user
+report_cooldowns = CooldownStore(1800)  # 1800 seconds = 30 minutes
+
+# Keyword responses with a per-user cooldown: response key -> cooldown store
+KEYWORD_COOLDOWNS = {
+    'hello': hello_cooldowns,
+}
+
+async def send_keyword_responses(message):
+    """Send the canned response for every keyword trigger in the message."""
+    tokens = message.content.lower().split()
+    matched = set(keyword_automaton.search(tokens))
+    if not matched:
+        return
+
+    for key in KEYWORD_RESPONSES:
+        if key not in matched:
+            continue
+
+        if key in KEYWORD_COOLDOWNS:
+            cooldowns = KEYWORD_COOLDOWNS[key]
+            user_id = message.author.id
+            if cooldowns.remaining(user_id):
+                continue  # Skip the response while the user is on cooldown
+            store.set(f'cooldown:{key}', user_id, cooldowns.hit(user_id))
+
+        await message.channel.send(content=message.author.mention, embed=RESPONSES[key])
+
+# Shortest interval ?autosend accepts; a zero interval would never advance the schedule
+AUTOSEND_MIN_INTERVAL = 60  # seconds
+
+# Retry policy for autosend sends that fail with a transient error
+AUTOSEND_MAX_RETRIES = 5
+AUTOSEND_RETRY_BASE = 5  # seconds, doubled on every attempt
+
+class AutosendJob:
+    """A message sent to a channel on a fixed, drift-free schedule."""
+
+    def __init__(self, job_id, channel_id, interval_seconds, interval_str, content, started_at, guild_id=None):
+        self.job_id = job_id
+        self.channel_id = channel_id
+        self.guild_id = guild_id
+        self.interval_seconds = interval_seconds
+        self.interval_str = interval_str
+        self.content = content
+        self.started_at = started_at  # Unix time of the first send
+        self.failures = 0
+
+        # Create embed for the message
+        self.embed = discord.Embed(
+            description=content,
+            color=discord.Color.blue()
+        )
+        self.embed.set_footer(text=f"Auto-sent every {interval_str}")
+
+    def next_slot(self, after):
+        """Return the first scheduled Unix time strictly after the given time."""
+        if after < self.started_at:
+            return self.started_at
+        elapsed_slots = int((after - self.started_at) // self.interval_seconds) + 1
+        return self.started_at + elapsed_slots * self.interval_seconds
+
+    def to_dict(self):
+        return {
+            'channel_id': self.channel_id,
+            'interval_seconds': self.interval_seconds,
+            'interval_str': self.interval_str,
+            'content': self.content,
+            'started_at': self.started_at,
+            'guild_id': self.guild_id
+        }
+
+def is_transient_error(error):
+    """Return True for errors worth retrying (server errors, rate limits, network)."""
+    if isinstance(error, discord.HTTPException):
+        return error.status >= 500 or error.status == 429
+    return isinstance(error, (asyncio.TimeoutError, aiohttp.ClientError, OSError))
+
+def schedule_autosend(job, unix_time):
+    """Schedule the job's next send at an absolute Unix time."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + (unix_time - time.time())
+    scheduler.schedule(('autosend', job.job_id), deadline, lambda: run_autosend(job))
+
+def start_autosend(job):
+    """Register an autosend job and schedule its next send if this process owns it."""
+    autosend_jobs[job.job_id] = job
+    if owns_guild(job.guild_id):
+        schedule_autosend(job, job.next_slot(time.time() - 1))
+
+def stop_autosend(job_id):
+    """Stop an autosend job and forget it."""
+    scheduler.cancel(('autosend', job_id))
+    autosend_jobs.pop(job_id, None)
+    store.delete('autosend', job_id)
+
+async def run_autosend(job):
+    """Send one autosend message and schedule the next attempt."""
+    if job.job_id not in autosend_jobs:
+        return
+
+    # A channel missing from the cache may just not be loaded yet (startup, outage)
+    channel = client.get_channel(job.channel_id)
+    if channel is None:
         try:
-            # Try to get user from mention first
-            if message.mentions:
-                target_user = message.mentions[0]
-            else:
-                # If no mention, try to get user by ID
-                try:
-                    user_id = int(args[1])
-                    target_user = await client.fetch_user(user_id)
-                except ValueError:
-                    error_embed = discord.Embed(
-                        title="❌ Invalid User",
-                        description="Please mention a user or provide a valid user ID!",
-                        color=discord.Color.red()
-                    )
-                    await message.channel.send(embed=error_embed)
-                    return
-            
-            if target_user.bot:
-                error_embed = discord.Embed(
-                    title="❌ Invalid Target",
-                    description="You can't ban bots!",
-                    color=discord.Color.red()
-                )
-                await message.channel.send(embed=error_embed)
-                return
-            
-            # Get reason
-            reason = ' '.join(args[2:])
-            
-            # Ban the user
-            await message.guild.ban(target_user, reason=reason)
-            
-            # Create embed for ban confirmation
-            ban_embed = discord.Embed(
-                title="🔨 User Banned",
-                color=discord.Color.red()
-            )
-            ban_embed.add_field(
-                name="User",
-                value=f"{target_user.mention} ({target_user.id})",
-                inline=False
-            )
-            ban_embed.add_field(
-                name="Reason",
-                value=reason,
-                inline=False
-            )
-            ban_embed.add_field(
-                name="Moderator",
-                value=message.author.mention,
-                inline=False
-            )
-            ban_embed.set_footer(text=f"Banned at {datetime.utcnow()}")
-            
-            # Send confirmation to the mod log channel
-            mod_log_channel = client.get_channel(MOD_LOG_CHANNEL_ID)
-            if mod_log_channel:
-                await mod_log_channel.send(embed=ban_embed)
-            
-            # Send quick confirmation to the command channel
-            confirm_embed = discord.Embed(
-                title="✅ Ban Successful",
-                description=f"{target_user.mention} has been banned.",
-                color=discord.Color.green()
-            )
-            confirm_embed.add_field(
-                name="Details",
-                value=f"Check <#{MOD_LOG_CHANNEL_ID}> for more information.",
-                inline=False
-            )
-            await message.channel.send(embed=confirm_embed)
-            
-        except IndexError:
-            error_embed = discord.Embed(
-                title="❌ Missing User",
-                description="Please mention a user or provide a user ID!",
-                color=discord.Color.red()
-            )
-            await message.channel.send(embed=error_embed)
+            channel = await client.fetch_channel(job.channel_id)
         except discord.NotFound:
-            error_embed = discord.Embed(
-                title="❌ User Not Found",
-                description="Could not find a user with that ID!",
-                color=discord.Color.red()
-            )
-            await message.channel.send(embed=error_embed)
-        except discord.Forbidden:
-            error_embed = discord.Embed(
-                title="❌ Permission Error",
-                description="I don't have permission to ban that user!",
-                color=discord.Color.red()
-            )
-            await message.channel.send(embed=error_embed)
+            print(f"Stopping autosend {job.job_id}: channel {job.channel_id} no longer exists")
+            stop_autosend(job.job_id)
+            return
         except Exception as e:
-            error_embed = discord.Embed(
-                title="❌ Error",
-                description=f"An error occurred: {str(e)}",
-                color=discord.Color.red()
-            )
-            await message.channel.send(embed=error_embed)
-    
-    # Handle unmute command
-    if message.content.startswith('?unmute'):
-        if not has_command_permission(message.author, 'unmute'):
-            error_embed = discord.Embed(
-                title="❌ Permission Denied",
-                description="You don't have permission to use this command!",
-                color=discord.Color.red()
-            )
-            await message.channel.send(embed=error_embed)
+            print(f"Autosend {job.job_id} could not reach channel {job.channel_id} ({e}), trying again at the next slot")
+            schedule_autosend(job, job.next_slot(time.time()))
             return
-        
-        # Parse command arguments
-        args = message.content.split()
-        if len(args) < 2:
-            help_embed = discord.Embed(
-                title="ℹ️ Unmute Command Help",
-                description="Usage: ?unmute @user",
-                color=discord.Color.blue()
-            )
-            help_embed.add_field(
-                name="Example",
-                value="?unmute @user",
-                inline=False
-            )
-            await message.channel.send(embed=help_embed)
+
+    try:
+        await channel.send(embed=job.embed)
+        job.failures = 0
+    except Exception as e:
+        if not is_transient_error(e):
+            print(f"Stopping autosend {job.job_id} for channel {job.channel_id}: {e}")
+            stop_autosend(job.job_id)
             return
-        
+
+        job.failures += 1
+        if job.failures <= AUTOSEND_MAX_RETRIES:
+            retry_at = time.time() + AUTOSEND_RETRY_BASE * 2 ** (job.failures - 1)
+            next_slot = job.next_slot(time.time())
+            print(f"Autosend {job.job_id} failed ({e}), retry {job.failures}/{AUTOSEND_MAX_RETRIES}")
+            schedule_autosend(job, min(retry_at, next_slot))
+            return
+
+        print(f"Autosend {job.job_id} failed after {AUTOSEND_MAX_RETRIES} retries, skipping to the next slot")
+        job.failures = 0
+
+    # Next send is anchored to the start time, so send latency never accumulates
+    schedule_autosend(job, job.next_slot(time.time()))
+
+# Moderation actions that run at a later time: action ID -> action dict
+scheduled_actions = {}
+
+# Delay before retrying an action that failed with a transient error
+SCHEDULED_ACTION_RETRY = 60  # seconds
+
+def arm_action(action_id, action):
+    """Put a scheduled action on the shared scheduler; overdue actions run immediately."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max(0, action['due_at'] - time.time())
+    scheduler.schedule(('action', action_id), deadline, lambda: run_action(action_id))
+
+def schedule_action(kind, delay_seconds, guild_id, user_id, role_id=None, reason=None):
+    """Persist a moderation action to run after a delay and schedule it.
+
+    kind is 'unban' or 'remove_role'. Actions are saved before being armed,
+    so they still run if the bot restarts before they are due.
+    """
+    action_id = uuid.uuid4().hex[:12]
+    action = {
+        'kind': kind,
+        'due_at': time.time() + delay_seconds,
+        'guild_id': guild_id,
+        'user_id': user_id,
+        'role_id': role_id,
+        'reason': reason
+    }
+    scheduled_actions[action_id] = action
+    store.set('actions', action_id, action)
+    arm_action(action_id, action)
+    return action_id
+
+def finish_action(action_id):
+    """Forget a scheduled action that has run or can never run."""
+    scheduled_actions.pop(action_id, None)
+    store.delete('actions', action_id)
+
+async def run_action(action_id):
+    """Carry out a due moderation action."""
+    action = scheduled_actions.get(action_id)
+    if action is None:
+        return
+
+    guild = client.get_guild(action['guild_id'])
+    if guild is None:
+        print(f"Dropping scheduled {action['kind']} {action_id}: guild {action['guild_id']} not found")
+        finish_action(action_id)
+        return
+
+    reason = action.get('reason') or f"Scheduled {action['kind']}"
+    try:
+        if action['kind'] == 'unban':
+            await guild.unban(discord.Object(id=action['user_id']), reason=reason)
+        elif action['kind'] == 'remove_role':
+            role = guild.get_role(action['role_id'])
+            member = await resolve_member(guild, action['user_id'])
+            if role:
+                await member.remove_roles(role, reason=reason)
+        else:
+            print(f"Dropping scheduled action {action_id} with unknown kind {action['kind']}")
+    except discord.NotFound:
+        # Already unbanned, or the member left the server
+        pass
+    except Exception as e:
+        if is_transient_error(e):
+            print(f"Scheduled {action['kind']} {action_id} failed ({e}), retrying")
+            action['due_at'] = time.time() + SCHEDULED_ACTION_RETRY
+            arm_action(action_id, action)
+            return
+        print(f"Scheduled {action['kind']} {action_id} failed: {e}")
+
+    finish_action(action_id)
+
+# Persisted cooldowns: store namespace -> cooldown store
+PERSISTED_COOLDOWNS = {
+    'cooldown:hello': hello_cooldowns,
+    'cooldown:report': report_cooldowns,
+}
+
+# Set once the persisted state has been loaded into memory
+state_loaded = False
+
+# Background task picking up state written by other shard processes
+state_sync_task = None
+
+# Namespace -> entries as last read from the database. Loads only apply what
+# changed since, so a sync never undoes a local write that is still queued.
+synced_state = {}
+
+async def load_changes(namespace):
+    """Return (changed entries, removed keys) for a namespace since its last load.
+
+    Only a hash of each stored value is kept between loads, and only by
+    processes that sync with others.
+    """
+    current = await asyncio.to_thread(store.load_raw, namespace)
+    previous = synced_state.get(namespace, {})
+    if SHARD_IDS:
+        synced_state[namespace] = {key: hash(text) for key, text in current.items()}
+    changed = {key: json.loads(text) for key, text in current.items() if previous.get(key) != hash(text)}
+    removed = [key for key in previous if key not in current]
+    return changed, removed
+
+async def load_reaction_rules():
+    changed, removed = await load_changes('reaction_rules')
+    if changed or removed:
+        reaction_rules.update(changed)
+        for trigger in removed:
+            reaction_rules.pop(trigger, None)
+        reaction_index.rebuild(reaction_rules)
+
+async def load_autosend_jobs():
+    changed, removed = await load_changes('autosend')
+
+    # Jobs stopped by another process
+    for job_id in removed:
+        scheduler.cancel(('autosend', job_id))
+        autosend_jobs.pop(job_id, None)
+
+    for job_id, data in changed.items():
+        if job_id in autosend_jobs:
+            continue
+        # One bad row must not stop the rest of the state from loading
         try:
-            # Get mentioned user
-            target_user = message.mentions[0]
-            if target_user.bot:
-                error_embed = discord.Embed(
-                    title="❌ Invalid Target",
-                    description="You can't unmute bots!",
-                    color=discord.Color.red()
-                )
-                await message.channel.send(embed=error_embed)
-                return
-            
-            # Remove timeout from the user
-            await target_user.timeout(None)
-            
-            # Create embed for unmute confirmation
-            unmute_embed = discord.Embed(
-                title="🔊 User Unmuted",
-                color=discord.Color.green()
-            )
-            unmute_embed.add_field(
-                name="User",
-                value=target_user.mention,
-                inline=False
-            )
-            unmute_embed.add_field(
-                name="Moderator",
-                value=message.author.mention,
-                inline=False
-            )
-            unmute_embed.set_footer(text=f"Unmuted at {datetime.utcnow()}")
-            
-            # Send confirmation to the mod log channel
-            mod_log_channel = client.get_channel(MOD_LOG_CHANNEL_ID)
-            if mod_log_channel:
-                await mod_log_channel.send(embed=unmute_embed)
-            
-            # Send quick confirmation to the command channel
-            confirm_embed = discord.Embed(
-                title="✅ Unmute Successful",
-                description=f"{target_user.mention} has been unmuted.",
-                color=discord.Color.green()
-            )
-            confirm_embed.add_field(
-                name="Details",
-                value=f"Check <#{MOD_LOG_CHANNEL_ID}> for more information.",
-                inline=False
-            )
-            await message.channel.send(embed=confirm_embed)
-            
-        except IndexError:
-            error_embed = discord.Embed(
-                title="❌ Missing User",
-                description="Please mention a user to unmute!",
-                color=discord.Color.red()
-            )
-            await message.channel.send(embed=error_embed)
-        except discord.Forbidden:
-            error_embed = discord.Embed(
-                title="❌ Permission Error",
-                description="I don't have permission to unmute that user!",
-                color=discord.Color.red()
-            )
-            await message.channel.send(embed=error_embed)
+            job = autosend_job_from_dict(job_id, data)
+            if not job.interval_seconds >= AUTOSEND_MIN_INTERVAL:
+                # Saved before short intervals were rejected; it can never be scheduled
+                print(f"Dropping autosend {job_id}: interval {job.interval_str} is too short")
+                store.delete('autosend', job_id)
+                continue
+            start_autosend(job)
         except Exception as e:
-            error_embed = discord.Embed(
-                title="❌ Error",
-                description=f"An error occurred: {str(e)}",
-                color=discord.Color.red()
-            )
-            await message.channel.send(embed=error_embed)
-    
-    # Handle kick command
-    if message.content.startswith('?kick'):
-        if not has_command_permission(message.author, 'kick'):
-            error_embed = discord.Embed(
-                title="❌ Permission Denied",
-                description="You don't have permission to use this command!",
-                color=discord.Color.red()
-            )
-            await message.channel.send(embed=error_embed)
-            return
-        
-        # Parse command arguments
-        args = message.content.split()
-        if len(args) < 3:
-            help_embed = discord.Embed(
-                title="ℹ️ Kick Command Help",
-                description="Usage: ?kick @user <reason>",
-                color=discord.Color.blue()
-            )
-            help_embed.add_field(
-                name="Example",
-                value="?kick @user Breaking server rules",
-                inline=False
-            )
-            await message.channel.send(embed=help_embed)
+            print(f"Could not restore autosend {job_id}: {e!r}")
+
+def autosend_job_from_dict(job_id, data):
+    """Rebuild an autosend job from its stored form."""
+    if 'channel_id' in data:
+        channel_id = data['channel_id']
+    elif job_id.isdigit():
+        # Jobs saved before job IDs existed were keyed by channel ID
+        channel_id = int(job_id)
+    else:
+        raise ValueError("no channel ID stored")
+    guild_id = data.get('guild_id')
+    if guild_id is None:
+        # Older jobs did not record their guild; find it from the channel cache
+        channel = client.get_channel(channel_id)
+        guild_id = channel.guild.id if getattr(channel, 'guild', None) else None
+    return AutosendJob(
+        job_id,
+        channel_id,
+        data['interval_seconds'],
+        data['interval_str'],
+        data['content'],
+        data.get('started_at', time.time()),
+        guild_id=guild_id
+    )
+
+async def load_actions():
+    changed, removed = await load_changes('actions')
+
+    for action_id in removed:
+        scheduler.cancel(('action', action_id))
+        scheduled_actions.pop(action_id, None)
+
+    # Overdue actions (for example after downtime) run as soon as they are armed
+    for action_id, action in changed.items():
+        if action_id not in scheduled_actions and owns_guild(action['guild_id']):
+            scheduled_actions[action_id] = action
+            arm_action(action_id, action)
+
+async def load_cooldowns(namespaces=PERSISTED_COOLDOWNS, initial=False):
+    for namespace in namespaces:
+        cooldowns = PERSISTED_COOLDOWNS[namespace]
+        changed, _removed = await load_changes(namespace)
+        for user_id, expires_at in changed.items():
+            # Expired cooldowns are dropped instead of loaded
+            if not isinstance(expires_at, (int, float)) or not cooldowns.restore(int(user_id), expires_at):
+                if initial:
+                    store.delete(namespace, user_id)
+
+async def load_state():
+    """Load reaction rules, autosend jobs and cooldowns from the store once per process."""
+    global state_loaded, state_sync_task
+    if state_loaded:
+        return
+    state_loaded = True
+
+    # Note the versions before loading, so changes made while loading are picked up by the sync
+    if SHARD_IDS:
+        await asyncio.to_thread(store.changed_namespaces)
+
+    await load_reaction_rules()
+    await load_autosend_jobs()
+    await load_actions()
+
+    channels = await asyncio.to_thread(store.load, 'memcount')
+    for guild_id, channel_id in channels.items():
+        if not owns_guild(int(guild_id)):
+            continue
+        tracker = memcount_channels[int(guild_id)] = MemberCountChannel(int(guild_id), channel_id)
+        # Catch up with joins and leaves that happened while offline
+        tracker.request_update()
+
+    await load_cooldowns(initial=True)
+    await load_warnings()
+
+    print(f"Loaded {len(reaction_rules)} reaction rules, {len(autosend_jobs)} autosend jobs and {len(scheduled_actions)} scheduled actions")
+
+    # Processes running a subset of the shards share the database with each other
+    if SHARD_IDS:
+        state_sync_task = asyncio.create_task(sync_state())
+
+async def sync_state():
+    """Reload the shared namespaces that other processes have changed."""
+    while True:
+        await asyncio.sleep(STATE_SYNC_INTERVAL)
+        try:
+            changed = await asyncio.to_thread(store.changed_namespaces)
+            if not changed:
+                continue
+            if 'reaction_rules' in changed:
+                await load_reaction_rules()
+            if 'autosend' in changed:
+                await load_autosend_jobs()
+            if 'actions' in changed:
+                await load_actions()
+            cooldown_namespaces = [namespace for namespace in PERSISTED_COOLDOWNS if namespace in changed]
+            if cooldown_namespaces:
+                await load_cooldowns(cooldown_namespaces)
+        except Exception as e:
+            print(f"Error syncing shared state: {e}")
+
+@client.event
+async def on_message(message):
+    started = time.perf_counter()
+    if message.author == client.user:
+        return
+
+    # Dispatch commands with a single registry lookup
+    handler, args = resolve_command(message.content)
+    with watchdog.watch(handler.__name__[len('handle_'):] if handler else 'on_message'):
+        await process_message(message, handler, args, started)
+
+async def process_message(message, handler, args, started):
+    """React to, dispatch or answer keywords in one message."""
+    if isinstance(message.author, discord.Member):
+        remember_member(message.author)
+
+    # Add automatic reactions from the compiled reaction rules
+    if reaction_rules:
+        for emoji in reaction_index.emojis_for(message):
+            try:
+                await message.add_reaction(emoji)
+            except discord.HTTPException:
+                pass
+
+    if handler:
+        if not METRICS_PORT:
+            await handler(message, args)
             return
-        
+        last_rest_at.set(None)
         try:
-            # Get mentioned user
-            target_user = message.mentions[0]
-            if target_user.bot:
-                error_embed = discord.Embed(
-                    title="❌ Invalid Target",
-                    description="You can't kick bots!",
-                    color=discord.Color.red()
-                )
-                await message.channel.send(embed=error_embed)
-                return
-            
-            # Get reason
-            reason = ' '.join(args[2:])
-            
-            # Kick the user
-            await target_user.kick(reason=reason)
-            
-            # Create embed for kick confirmation
-            kick_embed = discord.Embed(
-                title="👢 User Kicked",
-                color=discord.Color.red()
-            )
-            kick_embed.add_field(
-                name="User",
-                value=target_user.mention,
-                inline=False
-            )
-            kick_embed.add_field(
-                name="Reason",
-                value=reason,
-                inline=False
-            )
-            kick_embed.add_field(
-                name="Moderator",
-                value=message.author.mention,
-                inline=False
-            )
-            kick_embed.set_footer(text=f"Kicked at {datetime.utcnow()}")
-            
-            # Send confirmation to the mod log channel
-            mod_log_channel = client.get_channel(MOD_LOG_CHANNEL_ID)
-            if mod_log_channel:
-                await mod_log_channel.send(embed=kick_embed)
-            
-            # Send quick confirmation to the command channel
-            confirm_embed = discord.Embed(
-                title="✅ Kick Successful",
-                description=f"{target_user.mention} has been kicked.",
-                color=discord.Color.green()
-            )
-            confirm_embed.add_field(
-                name="Details",
-                value=f"Check <#{MOD_LOG_CHANNEL_ID}> for more information.",
-                inline=False
-            )
-            await message.channel.send(embed=confirm_embed)
-            
-        except IndexError:
+            await handler(message, args)
+        finally:
+            # Measured to the last REST call, so trailing sleeps do not count
+            finished = last_rest_at.get() or time.perf_counter()
+            metrics.observe_command(handler.__name__[len('handle_'):], finished - started)
+        return
+
+    # Handle keyword triggers (hello, ip, end fight, staff)
+    await send_keyword_responses(message)
+
+
+@command('report')
+async def handle_report(message, args):
+    """Report a replied-to message to the staff report channel."""
+    # Check if the message is a reply
+    if not message.reference:
+        error_embed = discord.Embed(
+            title="❌ Invalid Usage",
+            description="You must reply to a message to report it!",
+            color=discord.Color.red()
+        )
+        await message.channel.send(embed=error_embed)
+        return
+
+    # Check if the user is on cooldown
+    user_id = message.author.id
+    if report_cooldowns.remaining(user_id):
+        cooldown_embed = discord.Embed(
+            title="⏳ Cooldown Active",
+            description="You can only make one report every 30 minutes.",
+            color=discord.Color.orange()
+        )
+        await message.channel.send(embed=cooldown_embed)
+        return
+
+    # Start the user's report cooldown
+    store.set('cooldown:report', user_id, report_cooldowns.hit(user_id))
+
+    # Get the replied-to message
+    try:
+        replied_message = await message.channel.fetch_message(message.reference.message_id)
+    except discord.NotFound:
+        error_embed = discord.Embed(
+            title="❌ Error",
+            description="Could not find the message you're replying to!",
+            color=discord.Color.red()
+        )
+        await message.channel.send(embed=error_embed)
+        return
+
+    # Parse the reason
+    args = message.content.split(maxsplit=1)
+    if len(args) < 2:
+        error_embed = discord.Embed(
+            title="❌ Missing Reason",
+            description="You must provide a reason for the report!",
+            color=discord.Color.red()
+        )
+        await message.channel.send(embed=error_embed)
+        return
+    reason = args[1]
+
+    # Get the report channel
+    report_channel = client.get_channel(1362287716460396675)
+    if not report_channel:
+        error_embed = discord.Embed(
+            title="❌ Error",
+            description="Report channel not found!",
+            color=discord.Color.red()
+        )
+        await message.channel.send(embed=error_embed)
+        return
+
+    # Create the report embed
+    report_embed = discord.Embed(
+        title="🚨 New Report",
+        description=f"**Reported Message:**\n{replied_message.content}",
+        color=discord.Color.red()
+    )
+    report_embed.add_field(
+        name="Reporter",
+        value=message.author.mention,
+        inline=False
+    )
+    report_embed.add_field(
+        name="Reported User",
+        value=replied_message.author.mention,
+        inline=False
+    )
+    report_embed.add_field(
+        name="Reason",
+        value=reason,
+        inline=False
+    )
+    report_embed.add_field(
+        name="Message Link",
+        value=f"[Jump to Message]({replied_message.jump_url})",
+        inline=False
+    )
+    report_embed.set_footer(text=f"Reported at {datetime.utcnow()}")
+
+    # Send the report to the report channel
+    await report_channel.send(embed=report_embed)
+
+    # Confirm the report to the reporter
+    confirm_embed = discord.Embed(
+        title="✅ Report Submitted",
+        description="Your report has been submitted successfully.",
+        color=discord.Color.green()
+    )
+    await message.channel.send(embed=confirm_embed)
+
+
+@command('reaction')
+async def handle_reaction(message, args):
+    """Add, remove or list automatic reaction rules."""
+    if not has_command_permission(message.author, 'reaction'):
+        await message.channel.send(embed=RESPONSES['permission_denied'])
+        return
+    
+    if len(args) < 2:
+        help_embed = discord.Embed(
+            title="ℹ️ Reaction Command Help",
+            description="Usage: ?reaction <add/remove/list> [target] [emoji]",
+            color=discord.Color.blue()
+        )
+        help_embed.add_field(
+            name="Commands",
+            value="```?reaction add <target> <emoji>\n?reaction remove <target>\n?reaction list```",
+            inline=False
+        )
+        help_embed.add_field(
+            name="Examples",
+            value="?reaction add @user 😊\n?reaction add username 😊\n?reaction remove @user\n?reaction list",
+            inline=False
+        )
+        await message.channel.send(embed=help_embed)
+        return
+    
+    command = args[1].lower()
+    
+    if command == "add":
+        if len(args) < 4:
             error_embed = discord.Embed(
-                title="❌ Missing User",
-                description="Please mention a user to kick!",
+                title="❌ Missing Arguments",
+                description="Usage: ?reaction add <target> <emoji>",
                 color=discord.Color.red()
             )
             await message.channel.send(embed=error_embed)
-        except discord.Forbidden:
+            return
+        
+        target = args[2]
+        emoji = args[3]
+        
+        # If target is a mention, extract the user ID
+        if target.startswith('<@') and target.endswith('>'):
+            target = target.strip('<@!>')
+        
+        reaction_rules[target] = emoji
+        reaction_index.rebuild(reaction_rules)
+        store.set('reaction_rules', target, emoji)
+        
+        success_embed = discord.Embed(
+            title="✅ Reaction Rule Added",
+            description=f"Added reaction rule for '{target}' with emoji {emoji}",
+            color=discord.Color.green()
+        )
+        await message.channel.send(embed=success_embed)
+        
+    elif command == "remove":
+        if len(args) < 3:
             error_embed = discord.Embed(
-                title="❌ Permission Error",
-                description="I don't have permission to kick that user!",
+                title="❌ Missing Arguments",
+                description="Usage: ?reaction remove <target>",
                 color=discord.Color.red()
             )
             await message.channel.send(embed=error_embed)
-        except Exception as e:
-            error_embed = discord.Embed(
-                title="❌ Error",
-                description=f"An error occurred: {str(e)}",
-                color=discord.Color.red()
+            return
+        
+        target = args[2]
+        
+        # If target is a mention, extract the user ID
+        if target.startswith('<@') and target.endswith('>'):
+            target = target.strip('<@!>')
+        
+        if target in reaction_rules:
+            del reaction_rules[target]
+            reaction_index.rebuild(reaction_rules)
+            store.delete('reaction_rules', target)
+            success_embed = discord.Embed(
+                title="✅ Reaction Rule Removed",
+                description=f"Removed reaction rule for '{target}'",
+                color=discord.Color.green()
             )
-            await message.channel.send(embed=error_embed)
-    
-    # Handle mute command
-    if message.content.startswith('?mute'):
-        if not has_command_permission(message.author, 'mute'):
+        else:
             error_embed = discord.Embed(
-                title="❌ Permission Denied",
-                description="You don't have permission to use this command!",
+                title="❌ Rule Not Found",
+                description=f"No reaction rule found for '{target}'",
                 color=discord.Color.red()
             )
             await message.channel.send(embed=error_embed)
             return
         
-        # Parse command arguments
-        args = message.content.split()
+        await message.channel.send(embed=success_embed)
         
-        # Check if the message is a reply
-        if message.reference:
-            if len(args) < 3:
-                help_embed = discord.Embed(
-                    title="ℹ️ Mute Command Help (Reply Mode)",
-                    description="Usage: Reply to user's message and type: ?mute <duration> <reason>",
-                    color=discord.Color.blue()
-                )
-                help_embed.add_field(
-                    name="Duration Format",
-                    value="Number followed by unit:\n- s (seconds)\n- m (minutes)\n- h (hours)\n- d (days)",
-                    inline=False
-                )
-                help_embed.add_field(
-                    name="Example",
-                    value="?mute 30m Spamming",
-                    inline=False
-                )
-                await message.channel.send(embed=help_embed)
-                return
-            
-            try:
-                # Get the replied-to message
-                replied_message = await message.channel.fetch_message(message.reference.message_id)
-                target_user = replied_message.author
-                
-                # Parse duration and reason
-                duration_str = args[1]
-                reason = ' '.join(args[2:])
-            except discord.NotFound:
-                error_embed = discord.Embed(
-                    title="❌ Error",
-                    description="Could not find the message you're replying to!",
-                    color=discord.Color.red()
-                )
-                await message.channel.send(embed=error_embed)
-                return
+    elif command == "list":
+        if not reaction_rules:
+            info_embed = discord.Embed(
+                title="ℹ️ No Reaction Rules",
+                description="There are no active reaction rules.",
+                color=discord.Color.blue()
+            )
         else:
-            # Regular mention mode
-            if len(args) < 4:
-                help_embed = discord.Embed(
-                    title="ℹ️ Mute Command Help",
-                    description="Usage: ?mute @user <duration> <reason>\nOR\nReply to user's message and type: ?mute <duration> <reason>",
-                    color=discord.Color.blue()
-                )
-                help_embed.add_field(
-                    name="Duration Format",
-                    value="Number followed by unit:\n- s (seconds)\n- m (minutes)\n- h (hours)\n- d (days)",
-                    inline=False
-                )
-                help_embed.add_field(
-                    name="Examples",
-                    value="?mute @user 30m Spamming\nOR\nReply to message: ?mute 30m Spamming",
+            info_embed = discord.Embed(
+                title="ℹ️ Active Reaction Rules",
+                description="Current reaction rules:",
+                color=discord.Color.blue()
+            )
+            for target, emoji in reaction_rules.items():
+                info_embed.add_field(
+                    name=f"Target: {target}",
+                    value=f"Emoji: {emoji}",
                     inline=False
                 )
-                await message.channel.send(embed=help_embed)
-                return
-            
+        await message.channel.send(embed=info_embed)
+        
+    else:
+        error_embed = discord.Embed(
+            title="❌ Invalid Command",
+            description="Valid commands: add, remove, list",
+            color=discord.Color.red()
+        )
+        await message.channel.send(embed=error_embed)
+
+
+@command('memcount')
+async def handle_memcount(message, args):
+    """Create a voice channel showing the member count, kept up to date automatically."""
+    if not has_command_permission(message.author, 'memcount'):
+        await message.channel.send(embed=RESPONSES['permission_denied'])
+        return
+    
+    try:
+        guild = message.guild
+        member_count = get_guild_stats(guild).humans
+        
+        # Reuse the tracked channel instead of creating a duplicate
+        tracker = memcount_channels.get(guild.id)
+        channel = guild.get_channel(tracker.channel_id) if tracker else None
+        if channel:
+            tracker.request_update()
+            info_embed = discord.Embed(
+                title="ℹ️ Member Count Channel Exists",
+                description=f"Member count is already tracked in {channel.mention}",
+                color=discord.Color.blue()
+            )
+            info_embed.add_field(
+                name="Current Member Count",
+                value=str(member_count),
+                inline=False
+            )
+            await message.channel.send(embed=info_embed)
+            return
+        
+        # Create voice channel
+        channel = await guild.create_voice_channel(
+            name=f"Members: {member_count}",
+            reason="Member count tracking channel"
+        )
+        memcount_channels[guild.id] = MemberCountChannel(guild.id, channel.id)
+        store.set('memcount', guild.id, channel.id)
+        
+        # Send confirmation
+        success_embed = discord.Embed(
+            title="✅ Member Count Channel Created",
+            description=f"Created voice channel: {channel.mention}",
+            color=discord.Color.green()
+        )
+        success_embed.add_field(
+            name="Current Member Count",
+            value=str(member_count),
+            inline=False
+        )
+        success_embed.add_field(
+            name="Note",
+            value="The channel will automatically update when members join or leave.",
+            inline=False
+        )
+        await message.channel.send(embed=success_embed)
+        
+    except discord.Forbidden:
+        error_embed = discord.Embed(
+            title="❌ Permission Error",
+            description="I don't have permission to create voice channels!",
+            color=discord.Color.red()
+        )
+        await message.channel.send(embed=error_embed)
+    except Exception as e:
+        await message.channel.send(embed=render_response('error', error=e))
+
+
+@command('unban')
+async def handle_unban(message, args):
+    """Unban a user by ID."""
+    if not has_command_permission(message.author, 'unban'):
+        await message.channel.send(embed=RESPONSES['permission_denied'])
+        return
+    
+    if len(args) < 2:
+        help_embed = discord.Embed(
+            title="ℹ️ Unban Command Help",
+            description="Usage: ?unban <user_id>",
+            color=discord.Color.blue()
+        )
+        help_embed.add_field(
+            name="Example",
+            value="?unban 123456789012345678",
+            inline=False
+        )
+        await message.channel.send(embed=help_embed)
+        return
+    
+    try:
+        # Get user ID
+        user_id = int(args[1])
+        
+        # Get banned user
+        banned_user = await client.fetch_user(user_id)
+        
+        # Unban the user
+        await message.guild.unban(banned_user)
+        case_id = await record_case(message.guild.id, 'unban', banned_user.id, message.author.id)
+        
+        # Create embed for unban confirmation
+        unban_embed = discord.Embed(
+            title="🔓 User Unbanned",
+            color=discord.Color.green()
+        )
+        unban_embed.add_field(
+            name="User",
+            value=f"{banned_user.mention} ({banned_user.id})",
+            inline=False
+        )
+        unban_embed.add_field(
+            name="Moderator",
+            value=message.author.mention,
+            inline=False
+        )
+        unban_embed.add_field(
+            name="Case",
+            value=f"#{case_id}",
+            inline=False
+        )
+        unban_embed.set_footer(text=f"Unbanned at {datetime.utcnow()}")
+        
+        # Queue the entry for the mod log channel
+        mod_log.enqueue(unban_embed)
+        
+        # Send quick confirmation to the command channel
+        confirm_embed = discord.Embed(
+            title="✅ Unban Successful",
+            description=f"{banned_user.mention} has been unbanned.",
+            color=discord.Color.green()
+        )
+        confirm_embed.add_field(
+            name="Details",
+            value=f"Check <#{MOD_LOG_CHANNEL_ID}> for more information.",
+            inline=False
+        )
+        await message.channel.send(embed=confirm_embed)
+        
+    except ValueError:
+        error_embed = discord.Embed(
+            title="❌ Invalid User ID",
+            description="Please provide a valid user ID!",
+            color=discord.Color.red()
+        )
+        await message.channel.send(embed=error_embed)
+    except discord.NotFound:
+        error_embed = discord.Embed(
+            title="❌ User Not Found",
+            description="Could not find a user with that ID!",
+            color=discord.Color.red()
+        )
+        await message.channel.send(embed=error_embed)
+    except discord.Forbidden:
+        error_embed = discord.Embed(
+            title="❌ Permission Error",
+            description="I don't have permission to unban that user!",
+            color=discord.Color.red()
+        )
+        await message.channel.send(embed=error_embed)
+    except Exception as e:
+        await message.channel.send(embed=render_response('error', error=e))
+
+
+@command('ban')
+async def handle_ban(message, args):
+    """Ban a mentioned user or user ID."""
+    if not has_command_permission(message.author, 'ban'):
+        await message.channel.send(embed=RESPONSES['permission_denied'])
+        return
+    
+    if len(args) < 3:
+        help_embed = discord.Embed(
+            title="ℹ️ Ban Command Help",
+            description="Usage: ?ban @user/user_id <reason>",
+            color=discord.Color.blue()
+        )
+        help_embed.add_field(
+            name="Examples",
+            value="?ban @user Breaking server rules\n?ban 123456789012345678 Breaking server rules",
+            inline=False
+        )
+        await message.channel.send(embed=help_embed)
+        return
+    
+    try:
+        # Try to get user from mention first
+        if message.mentions:
+            target_user = message.mentions[0]
+        else:
+            # If no mention, try to get user by ID
             try:
-                # Get mentioned user
-                target_user = message.mentions[0]
-                # Parse duration and reason
-                duration_str = args[2]
-                reason = ' '.join(args[3:])
-            except IndexError:
+                user_id = int(args[1])
+                target_user = await client.fetch_user(user_id)
+            except ValueError:
                 error_embed = discord.Embed(
-                    title="❌ Missing User",
-                    description="Please mention a user or reply to their message!",
+                    title="❌ Invalid User",
+                    description="Please mention a user or provide a valid user ID!",
                     color=discord.Color.red()
                 )
                 await message.channel.send(embed=error_embed)
                 return
         
-        if target_user.bot:
-            error_embed = discord.Embed(
-                title="❌ Invalid Target",
-                description="You can't mute bots!",
-                color=discord.Color.red()
-            )
-            await message.channel.send(embed=error_embed)
-            return
+        if target_user.bot:
+            error_embed = discord.Embed(
+                title="❌ Invalid Target",
+                description="You can't ban bots!",
+                color=discord.Color.red()
+            )
+            await message.channel.send(embed=error_embed)
+            return
+        
+        # Get reason
+        reason = ' '.join(args[2:])
+        
+        # Ban the user
+        await message.guild.ban(target_user, reason=reason)
+        case_id = await record_case(message.guild.id, 'ban', target_user.id, message.author.id, reason)
+        
+        # Create embed for ban confirmation
+        ban_embed = discord.Embed(
+            title="🔨 User Banned",
+            color=discord.Color.red()
+        )
+        ban_embed.add_field(
+            name="User",
+            value=f"{target_user.mention} ({target_user.id})",
+            inline=False
+        )
+        ban_embed.add_field(
+            name="Reason",
+            value=reason,
+            inline=False
+        )
+        ban_embed.add_field(
+            name="Moderator",
+            value=message.author.mention,
+            inline=False
+        )
+        ban_embed.add_field(
+            name="Case",
+            value=f"#{case_id}",
+            inline=False
+        )
+        ban_embed.set_footer(text=f"Banned at {datetime.utcnow()}")
+        
+        # Queue the entry for the mod log channel
+        mod_log.enqueue(ban_embed, priority=True)
+        
+        # Send quick confirmation to the command channel
+        confirm_embed = discord.Embed(
+            title="✅ Ban Successful",
+            description=f"{target_user.mention} has been banned.",
+            color=discord.Color.green()
+        )
+        confirm_embed.add_field(
+            name="Details",
+            value=f"Check <#{MOD_LOG_CHANNEL_ID}> for more information.",
+            inline=False
+        )
+        await message.channel.send(embed=confirm_embed)
+        
+    except IndexError:
+        error_embed = discord.Embed(
+            title="❌ Missing User",
+            description="Please mention a user or provide a user ID!",
+            color=discord.Color.red()
+        )
+        await message.channel.send(embed=error_embed)
+    except discord.NotFound:
+        error_embed = discord.Embed(
+            title="❌ User Not Found",
+            description="Could not find a user with that ID!",
+            color=discord.Color.red()
+        )
+        await message.channel.send(embed=error_embed)
+    except discord.Forbidden:
+        error_embed = discord.Embed(
+            title="❌ Permission Error",
+            description="I don't have permission to ban that user!",
+            color=discord.Color.red()
+        )
+        await message.channel.send(embed=error_embed)
+    except Exception as e:
+        await message.channel.send(embed=render_response('error', error=e))
+
+
+@command('tempban')
+async def handle_tempban(message, args):
+    """Ban a user and unban them automatically after a duration."""
+    if not has_command_permission(message.author, 'ban'):
+        await message.channel.send(embed=RESPONSES['permission_denied'])
+        return
+    
+    if len(args) < 4:
+        help_embed = discord.Embed(
+            title="ℹ️ Tempban Command Help",
+            description="Usage: ?tempban @user/user_id <duration> <reason>",
+            color=discord.Color.blue()
+        )
+        help_embed.add_field(
+            name="Duration Format",
+            value="Number followed by unit:\n- s (seconds)\n- m (minutes)\n- h (hours)\n- d (days)",
+            inline=False
+        )
+        help_embed.add_field(
+            name="Example",
+            value="?tempban @user 7d Griefing",
+            inline=False
+        )
+        await message.channel.send(embed=help_embed)
+        return
+    
+    try:
+        if message.mentions:
+            target_user = message.mentions[0]
+        else:
+            target_user = discord.Object(id=int(args[1]))
+    except ValueError:
+        error_embed = discord.Embed(
+            title="❌ Invalid User",
+            description="Please mention a user or provide a valid user ID!",
+            color=discord.Color.red()
+        )
+        await message.channel.send(embed=error_embed)
+        return
+    
+    if getattr(target_user, 'bot', False):
+        error_embed = discord.Embed(
+            title="❌ Invalid Target",
+            description="You can't ban bots!",
+            color=discord.Color.red()
+        )
+        await message.channel.send(embed=error_embed)
+        return
+    
+    duration_str = args[2]
+    duration_seconds = parse_duration(duration_str)
+    if not duration_seconds:
+        error_embed = discord.Embed(
+            title="❌ Invalid Duration",
+            description="Invalid duration format!\n\nValid formats:\n- s (seconds)\n- m (minutes)\n- h (hours)\n- d (days)",
+            color=discord.Color.red()
+        )
+        await message.channel.send(embed=error_embed)
+        return
+    
+    reason = ' '.join(args[3:])
+    
+    try:
+        await message.guild.ban(target_user, reason=reason)
+        schedule_action('unban', duration_seconds, message.guild.id, target_user.id, reason="Tempban expired")
+        unban_at = int(time.time() + duration_seconds)
+        case_id = await record_case(message.guild.id, 'tempban', target_user.id, message.author.id, reason, duration_seconds)
+        
+        # Create embed for ban confirmation
+        ban_embed = discord.Embed(
+            title="⏳ User Temporarily Banned",
+            color=discord.Color.red()
+        )
+        ban_embed.add_field(
+            name="User",
+            value=f"<@{target_user.id}> ({target_user.id})",
+            inline=False
+        )
+        ban_embed.add_field(
+            name="Duration",
+            value=f"{duration_str} (unbanned <t:{unban_at}:R>)",
+            inline=False
+        )
+        ban_embed.add_field(
+            name="Reason",
+            value=reason,
+            inline=False
+        )
+        ban_embed.add_field(
+            name="Moderator",
+            value=message.author.mention,
+            inline=False
+        )
+        ban_embed.add_field(
+            name="Case",
+            value=f"#{case_id}",
+            inline=False
+        )
+        ban_embed.set_footer(text=f"Banned at {datetime.utcnow()}")
+        
+        # Queue the entry for the mod log channel
+        mod_log.enqueue(ban_embed, priority=True)
+        
+        # Send quick confirmation to the command channel
+        confirm_embed = discord.Embed(
+            title="✅ Tempban Successful",
+            description=f"<@{target_user.id}> has been banned for {duration_str}.",
+            color=discord.Color.green()
+        )
+        confirm_embed.add_field(
+            name="Details",
+            value=f"Check <#{MOD_LOG_CHANNEL_ID}> for more information.",
+            inline=False
+        )
+        await message.channel.send(embed=confirm_embed)
+        
+    except discord.NotFound:
+        error_embed = discord.Embed(
+            title="❌ User Not Found",
+            description="Could not find a user with that ID!",
+            color=discord.Color.red()
+        )
+        await message.channel.send(embed=error_embed)
+    except discord.Forbidden:
+        error_embed = discord.Embed(
+            title="❌ Permission Error",
+            description="I don't have permission to ban that user!",
+            color=discord.Color.red()
+        )
+        await message.channel.send(embed=error_embed)
+    except Exception as e:
+        await message.channel.send(embed=render_response('error', error=e))
+
+
+@command('temprole')
+async def handle_temprole(message, args):
+    """Give a member a role and remove it automatically after a duration."""
+    if not has_command_permission(message.author, 'temprole'):
+        await message.channel.send(embed=RESPONSES['permission_denied'])
+        return
+    
+    if len(args) < 4 or not message.mentions:
+        help_embed = discord.Embed(
+            title="ℹ️ Temprole Command Help",
+            description="Usage: ?temprole @user <@role/role_id> <duration>",
+            color=discord.Color.blue()
+        )
+        help_embed.add_field(
+            name="Example",
+            value="?temprole @user @Event 2d",
+            inline=False
+        )
+        await message.channel.send(embed=help_embed)
+        return
+    
+    target_user = message.mentions[0]
+    if message.role_mentions:
+        role = message.role_mentions[0]
+    else:
+        role = message.guild.get_role(int(args[2])) if args[2].isdigit() else None
+    if role is None:
+        error_embed = discord.Embed(
+            title="❌ Invalid Role",
+            description="Please mention a role or provide a valid role ID!",
+            color=discord.Color.red()
+        )
+        await message.channel.send(embed=error_embed)
+        return
+    
+    duration_str = args[3]
+    duration_seconds = parse_duration(duration_str)
+    if not duration_seconds:
+        error_embed = discord.Embed(
+            title="❌ Invalid Duration",
+            description="Invalid duration format!\n\nValid formats:\n- s (seconds)\n- m (minutes)\n- h (hours)\n- d (days)",
+            color=discord.Color.red()
+        )
+        await message.channel.send(embed=error_embed)
+        return
+    
+    try:
+        await target_user.add_roles(role, reason=f"Temporary role from {message.author}")
+        schedule_action('remove_role', duration_seconds, message.guild.id, target_user.id, role.id, reason="Temporary role expired")
+        
+        confirm_embed = discord.Embed(
+            title="✅ Temporary Role Given",
+            description=f"{target_user.mention} has {role.mention} for {duration_str}.",
+            color=discord.Color.green()
+        )
+        confirm_embed.add_field(
+            name="Expires",
+            value=f"<t:{int(time.time() + duration_seconds)}:R>",
+            inline=False
+        )
+        await message.channel.send(embed=confirm_embed)
+        
+    except discord.Forbidden:
+        error_embed = discord.Embed(
+            title="❌ Permission Error",
+            description="I don't have permission to manage that role!",
+            color=discord.Color.red()
+        )
+        await message.channel.send(embed=error_embed)
+    except Exception as e:
+        await message.channel.send(embed=render_response('error', error=e))
+
+
+# User mentions or raw user IDs in command arguments and attached ID lists
+USER_ID_PATTERN = re.compile(r'^<@!?(\d{15,20})>$|^(\d{15,20})$')
+ID_LIST_PATTERN = re.compile(r'\b\d{15,20}\b')
+
+async def collect_mass_targets(message, tokens):
+    """Split tokens into target user IDs and a reason; IDs in attached .txt files are added.
+
+    Returns (user_ids, reason) with duplicates, the invoker and the bot removed.
+    """
+    user_ids = []
+    reason_words = []
+    for token in tokens:
+        match = USER_ID_PATTERN.match(token)
+        if match:
+            user_ids.append(int(match.group(1) or match.group(2)))
+        else:
+            reason_words.append(token)
+
+    for attachment in message.attachments:
+        # Oversized lists would be rejected by check_mass_targets anyway; don't download them
+        if attachment.filename.lower().endswith('.txt') and attachment.size <= MASS_ACTION_MAX_FILE_BYTES:
+            data = await attachment.read()
+            user_ids.extend(int(user_id) for user_id in ID_LIST_PATTERN.findall(data.decode('utf-8', 'ignore')))
+
+    excluded = {message.author.id, client.user.id if client.user else None}
+    unique_ids = [user_id for user_id in dict.fromkeys(user_ids) if user_id not in excluded]
+    return unique_ids, ' '.join(reason_words)
+
+async def run_mass_action(message, title, user_ids, action):
+    """Run action(user_id) for every target with bounded concurrency.
+
+    discord.py still applies per-route rate limits to each call; the
+    semaphore keeps a raid response from flooding that queue. Progress is
+    shown by editing one status message. Returns (succeeded, failed) where
+    failed is a list of (user_id, error text).
+    """
+    semaphore = asyncio.Semaphore(MASS_ACTION_CONCURRENCY)
+    succeeded = []
+    failed = []
+    loop = asyncio.get_running_loop()
+    last_edit = loop.time()
+    
+    status_embed = discord.Embed(
+        title=f"⏳ {title}",
+        description=f"Processing 0/{len(user_ids)} users...",
+        color=discord.Color.blue()
+    )
+    status_msg = await message.channel.send(embed=status_embed)
+    
+    async def worker(user_id):
+        nonlocal last_edit
+        async with semaphore:
+            try:
+                await action(user_id)
+                succeeded.append(user_id)
+            except discord.HTTPException as e:
+                failed.append((user_id, e.text or str(e)))
+            except Exception as e:
+                # One bad target must not abort the others
+                print(f"Error in bulk action for user {user_id}: {e!r}")
+                failed.append((user_id, str(e) or type(e).__name__))
         
-        # Parse duration
-        try:
-            # Extract number and unit
-            match = re.match(r'^(\d+)([smhd])$', duration_str.lower())
-            if not match:
-                raise ValueError("Invalid duration format")
-            
-            duration = int(match.group(1))
-            unit = match.group(2)
-            
-            # Convert to seconds
-            if unit == 's':
-                duration_seconds = duration
-            elif unit == 'm':
-                duration_seconds = duration * 60
-            elif unit == 'h':
-                duration_seconds = duration * 3600
-            elif unit == 'd':
-                duration_seconds = duration * 86400
-            
-            # Check if duration exceeds 30 days
-            if duration_seconds > 2592000:  # 30 days in seconds
-                error_embed = discord.Embed(
-                    title="❌ Duration Too Long",
-                    description="Mute duration cannot exceed 30 days!",
-                    color=discord.Color.red()
-                )
-                await message.channel.send(embed=error_embed)
-                return
-            
-            # Timeout the user
-            await target_user.timeout(timedelta(seconds=duration_seconds), reason=reason)
-            
-            # Create embed for mute confirmation
-            mute_embed = discord.Embed(
-                title="🔇 User Muted",
-                color=discord.Color.red()
-            )
-            mute_embed.add_field(
-                name="User",
-                value=target_user.mention,
-                inline=False
-            )
-            mute_embed.add_field(
-                name="Duration",
-                value=duration_str,
-                inline=False
-            )
-            mute_embed.add_field(
-                name="Reason",
-                value=reason,
-                inline=False
-            )
-            mute_embed.add_field(
-                name="Moderator",
-                value=message.author.mention,
-                inline=False
-            )
-            mute_embed.set_footer(text=f"Muted until {datetime.utcnow() + timedelta(seconds=duration_seconds)}")
-            
-            # Send confirmation to the mod log channel
-            mod_log_channel = client.get_channel(MOD_LOG_CHANNEL_ID)
-            if mod_log_channel:
-                await mod_log_channel.send(embed=mute_embed)
-            
-            # Send quick confirmation to the command channel
-            confirm_embed = discord.Embed(
-                title="✅ Mute Successful",
-                description=f"{target_user.mention} has been muted for {duration_str}.",
-                color=discord.Color.green()
-            )
-            confirm_embed.add_field(
-                name="Details",
-                value=f"Check <#{MOD_LOG_CHANNEL_ID}> for more information.",
-                inline=False
-            )
-            await message.channel.send(embed=confirm_embed)
-            
-        except ValueError:
-            error_embed = discord.Embed(
-                title="❌ Invalid Duration",
-                description="Invalid duration format!\n\nValid formats:\n- s (seconds)\n- m (minutes)\n- h (hours)\n- d (days)",
-                color=discord.Color.red()
-            )
-            await message.channel.send(embed=error_embed)
-        except discord.Forbidden:
-            error_embed = discord.Embed(
-                title="❌ Permission Error",
-                description="I don't have permission to mute that user!",
-                color=discord.Color.red()
-            )
-            await message.channel.send(embed=error_embed)
-        except Exception as e:
-            error_embed = discord.Embed(
-                title="❌ Error",
-                description=f"An error occurred: {str(e)}",
-                color=discord.Color.red()
-            )
-            await message.channel.send(embed=error_embed)
+        # Throttle progress edits to one every few seconds
+        if loop.time() - last_edit >= 3:
+            last_edit = loop.time()
+            status_embed.description = f"Processing {len(succeeded) + len(failed)}/{len(user_ids)} users..."
+            try:
+                await status_msg.edit(embed=status_embed)
+            except discord.HTTPException:
+                pass
     
-    if 'ip' in message.content.lower().split() and 'the' not in message.content.lower().split():
-        embed = discord.Embed(
-            title="🌐 Server Status",
-            description="The ip is `mc.porkchopsmp.online`. Don't forget to claim your free start kits using /kit.",
-            color=discord.Color.blue()
+    await asyncio.gather(*(worker(user_id) for user_id in user_ids))
+    
+    result_embed = discord.Embed(
+        title=f"✅ {title} Complete",
+        description=f"Succeeded: {len(succeeded)}\nFailed: {len(failed)}",
+        color=discord.Color.green() if not failed else discord.Color.orange()
+    )
+    if failed:
+        result_embed.add_field(
+            name="Failures",
+            value="\n".join(f"<@{user_id}>: {error}" for user_id, error in failed[:10])[:1024],
+            inline=False
+        )
+    await status_msg.edit(embed=result_embed)
+    return succeeded, failed
+
+def build_mass_log_embed(title, moderator, reason, succeeded, failed, extra_fields=()):
+    """Build the single mod-log entry summarising a bulk action."""
+    log_embed = discord.Embed(
+        title=title,
+        color=discord.Color.red()
+    )
+    log_embed.add_field(
+        name=f"Users ({len(succeeded)})",
+        value=(" ".join(f"<@{user_id}>" for user_id in succeeded) or "None")[:1024],
+        inline=False
+    )
+    for name, value in extra_fields:
+        log_embed.add_field(
+            name=name,
+            value=value,
+            inline=False
+        )
+    log_embed.add_field(
+        name="Reason",
+        value=reason or "No reason given",
+        inline=False
+    )
+    log_embed.add_field(
+        name="Moderator",
+        value=moderator.mention,
+        inline=False
+    )
+    if failed:
+        log_embed.add_field(
+            name="Failed",
+            value=str(len(failed)),
+            inline=False
         )
-        await message.channel.send(content=message.author.mention, embed=embed)
+    log_embed.set_footer(text=f"Executed at {datetime.utcnow()}")
+    return log_embed
+
+async def record_mass_cases(message, action, user_ids, reason, duration=None):
+    """Record a case for every user a bulk action succeeded on; returns the mod-log field."""
+    details = f"Mass {action} of {len(user_ids)} users"
+    # Queue every case before waiting, so they commit together
+    numbers = await asyncio.gather(*(
+        record_case(message.guild.id, action, user_id, message.author.id, reason, duration, details)
+        for user_id in user_ids
+    ))
+    return ("Cases", f"#{numbers[0]}" if len(numbers) == 1 else f"#{numbers[0]}–#{numbers[-1]}")
+
+async def send_mass_usage(message, usage, example):
+    help_embed = discord.Embed(
+        title="ℹ️ Bulk Moderation Help",
+        description=f"Usage: {usage}",
+        color=discord.Color.blue()
+    )
+    help_embed.add_field(
+        name="Targets",
+        value=f"Mentions or user IDs, and/or an attached .txt file of user IDs (max {MASS_ACTION_MAX_TARGETS})",
+        inline=False
+    )
+    help_embed.add_field(
+        name="Example",
+        value=example,
+        inline=False
+    )
+    await message.channel.send(embed=help_embed)
+
+async def check_mass_targets(message, user_ids):
+    """Reply with an error and return False if the target list is unusable."""
+    if not user_ids:
+        description = "Please mention users, list user IDs or attach a .txt file of IDs!"
+    elif len(user_ids) > MASS_ACTION_MAX_TARGETS:
+        description = f"At most {MASS_ACTION_MAX_TARGETS} users can be targeted at once!"
+    else:
+        return True
+    error_embed = discord.Embed(
+        title="❌ Invalid Targets",
+        description=description,
+        color=discord.Color.red()
+    )
+    await message.channel.send(embed=error_embed)
+    return False
+
+
+@command('massban')
+async def handle_massban(message, args):
+    """Ban many users at once."""
+    if not has_command_permission(message.author, 'ban'):
+        await message.channel.send(embed=RESPONSES['permission_denied'])
+        return
     
-    if 'the' in message.content.lower().split() and 'ip' in message.content.lower().split():
-        # Check if 'the' and 'ip' are consecutive
-        for i in range(len(message.content.lower().split()) - 1):
-            if message.content.lower().split()[i] == 'the' and message.content.lower().split()[i + 1] == 'ip':
-                embed = discord.Embed(
-                    title="🌐 Server Status",
-                    description="The ip is `mc.porkchopsmp.online`. Don't forget to claim your free start kits using /kit.",
-                    color=discord.Color.blue()
-                )
-                await message.channel.send(content=message.author.mention, embed=embed)
-                break
+    if len(args) < 2 and not message.attachments:
+        await send_mass_usage(message, "?massban <@user/user_id...> [reason]", "?massban 123456789012345678 234567890123456789 Raid")
+        return
+    user_ids, reason = await collect_mass_targets(message, args[1:])
+    if not await check_mass_targets(message, user_ids):
+        return
     
-    if 'end' in message.content.lower().split() and 'fight' in message.content.lower().split():
-        # Check if 'end' and 'fight' are consecutive
-        for i in range(len(message.content.lower().split()) - 1):
-            if message.content.lower().split()[i] == 'end' and message.content.lower().split()[i + 1] == 'fight':
-                embed = discord.Embed(
-                    title="⚔️ End Fight Information",
-                    description="Endfight will be held on 8th June.",
-                    color=discord.Color.red()
-                )
-                await message.channel.send(content=message.author.mention, embed=embed)
-                break
+    async def ban(user_id):
+        await message.guild.ban(discord.Object(id=user_id), reason=reason or None)
+    
+    succeeded, failed = await run_mass_action(message, "Mass Ban", user_ids, ban)
+    if succeeded:
+        cases = await record_mass_cases(message, 'ban', succeeded, reason)
+        mod_log.enqueue(build_mass_log_embed(
+            "🔨 Users Mass Banned", message.author, reason, succeeded, failed, extra_fields=[cases]
+        ), priority=True)
+
+
+@command('masskick')
+async def handle_masskick(message, args):
+    """Kick many members at once."""
+    if not has_command_permission(message.author, 'kick'):
+        await message.channel.send(embed=RESPONSES['permission_denied'])
+        return
+    
+    if len(args) < 2 and not message.attachments:
+        await send_mass_usage(message, "?masskick <@user/user_id...> [reason]", "?masskick @user1 @user2 Raid")
+        return
+    user_ids, reason = await collect_mass_targets(message, args[1:])
+    if not await check_mass_targets(message, user_ids):
+        return
+    
+    async def kick(user_id):
+        await message.guild.kick(discord.Object(id=user_id), reason=reason or None)
+    
+    succeeded, failed = await run_mass_action(message, "Mass Kick", user_ids, kick)
+    if succeeded:
+        cases = await record_mass_cases(message, 'kick', succeeded, reason)
+        mod_log.enqueue(build_mass_log_embed(
+            "👢 Users Mass Kicked", message.author, reason, succeeded, failed, extra_fields=[cases]
+        ))
+
+
+@command('massmute')
+async def handle_massmute(message, args):
+    """Timeout many members at once."""
+    if not has_command_permission(message.author, 'mute'):
+        await message.channel.send(embed=RESPONSES['permission_denied'])
+        return
+    
+    if len(args) < 3 and not (len(args) == 2 and message.attachments):
+        await send_mass_usage(message, "?massmute <duration> <@user/user_id...> [reason]", "?massmute 1h @user1 @user2 Spam")
+        return
     
-    if 'staff' in message.content.lower().split():
-        embed = discord.Embed(
-            title="👨‍💼 Staff Contact",
-            description="To contact staff, please use [this channel](https://discord.com/channels/1083270436349018163/1292154352240431186).",
-            color=discord.Color.gold()
+    duration_str = args[1]
+    duration_seconds = parse_duration(duration_str)
+    if not duration_seconds or duration_seconds > 2592000:  # 30 days in seconds
+        error_embed = discord.Embed(
+            title="❌ Invalid Duration",
+            description="Duration must look like 30m, 2h or 1d and cannot exceed 30 days!",
+            color=discord.Color.red()
         )
-        await message.channel.send(content=message.author.mention, embed=embed)
+        await message.channel.send(embed=error_embed)
+        return
+    
+    user_ids, reason = await collect_mass_targets(message, args[2:])
+    if not await check_mass_targets(message, user_ids):
+        return
+    
+    async def mute(user_id):
+        member = await resolve_member(message.guild, user_id)
+        await member.timeout(timedelta(seconds=duration_seconds), reason=reason or None)
+    
+    succeeded, failed = await run_mass_action(message, "Mass Mute", user_ids, mute)
+    if succeeded:
+        cases = await record_mass_cases(message, 'mute', succeeded, reason, duration_seconds)
+        mod_log.enqueue(build_mass_log_embed(
+            "🔇 Users Mass Muted", message.author, reason, succeeded, failed,
+            extra_fields=[("Duration", duration_str), cases]
+        ))
 
-    # Troll nuke command
-    if message.content == '?nuke':
-        try:
-            # Create a muted role if it doesn't exist
-            muted_role = discord.utils.get(message.guild.roles, name="Muted")
-            if not muted_role:
-                muted_role = await message.guild.create_role(name="Muted")
-                # Set permissions for the muted role
-                for channel in message.guild.channels:
-                    await channel.set_permissions(muted_role, speak=False, send_messages=False)
-            
-            # Add the muted role to the user
-            await message.author.add_roles(muted_role)
-            
-            # Send troll message
-            troll_embed = discord.Embed(
-                title="💥 NUKE ACTIVATED!",
-                description=f"{message.author.mention} tried to nuke the server but got muted instead! 🤣",
-                color=discord.Color.red()
-            )
-            troll_embed.add_field(
-                name="Duration",
-                value="24 hours of peace and quiet!",
-                inline=False
-            )
-            troll_embed.set_footer(text="Better luck next time! 😈")
-            
-            await message.channel.send(embed=troll_embed)
-            
-            # Schedule unmute after 24 hours
-            await asyncio.sleep(86400)  # 24 hours in seconds
-            await message.author.remove_roles(muted_role)
-            
-        except Exception as e:
-            error_embed = discord.Embed(
-                title="❌ Nuke Error",
-                description="Oops! Something went wrong with the nuke command. The server remains safe... for now. 😅",
-                color=discord.Color.red()
-            )
-            await message.channel.send(embed=error_embed)
 
-    # Purge command
-    if message.content.startswith('?purge'):
-        if not has_command_permission(message.author, 'purge'):
+@command('unmute')
+async def handle_unmute(message, args):
+    """Remove the timeout from a mentioned user."""
+    if not has_command_permission(message.author, 'unmute'):
+        await message.channel.send(embed=RESPONSES['permission_denied'])
+        return
+    
+    if len(args) < 2:
+        help_embed = discord.Embed(
+            title="ℹ️ Unmute Command Help",
+            description="Usage: ?unmute @user",
+            color=discord.Color.blue()
+        )
+        help_embed.add_field(
+            name="Example",
+            value="?unmute @user",
+            inline=False
+        )
+        await message.channel.send(embed=help_embed)
+        return
+    
+    try:
+        # Get mentioned user
+        target_user = message.mentions[0]
+        if target_user.bot:
             error_embed = discord.Embed(
-                title="❌ Permission Denied",
-                description="You don't have permission to use this command!",
+                title="❌ Invalid Target",
+                description="You can't unmute bots!",
                 color=discord.Color.red()
             )
             await message.channel.send(embed=error_embed)
             return
         
-        # Parse command arguments
-        args = message.content.split()
-        if len(args) < 2:
-            help_embed = discord.Embed(
-                title="ℹ️ Purge Command Help",
-                description="Usage: ?purge <amount> [@user]",
-                color=discord.Color.blue()
-            )
-            help_embed.add_field(
-                name="Examples",
-                value="?purge 10\n?purge 5 @user",
-                inline=False
-            )
-            await message.channel.send(embed=help_embed)
-            return
+        # Remove timeout from the user
+        await target_user.timeout(None)
+        case_id = await record_case(message.guild.id, 'unmute', target_user.id, message.author.id)
         
-        try:
-            amount = int(args[1])
-            if amount < 1 or amount > 100:
-                error_embed = discord.Embed(
-                    title="❌ Invalid Amount",
-                    description="Amount must be between 1 and 100!",
-                    color=discord.Color.red()
-                )
-                await message.channel.send(embed=error_embed)
-                return
-            
-            # Check if a user was mentioned
-            if message.mentions:
-                target_user = message.mentions[0]
-                
-                def is_target_user(msg):
-                    return msg.author == target_user
-                
-                deleted = await message.channel.purge(limit=amount, check=is_target_user)
-            else:
-                deleted = await message.channel.purge(limit=amount)
-            
-            # Send confirmation
-            confirm_embed = discord.Embed(
-                title="✅ Messages Purged",
-                description=f"Successfully deleted {len(deleted)} messages!",
-                color=discord.Color.green()
-            )
-            if message.mentions:
-                confirm_embed.add_field(
-                    name="Filtered by User",
-                    value=target_user.mention,
-                    inline=False
-                )
-            confirm_embed.set_footer(text=f"Purged by {message.author.name}")
-            
-            # Send confirmation and delete it after 5 seconds
-            confirm_msg = await message.channel.send(embed=confirm_embed)
-            await asyncio.sleep(5)
-            await confirm_msg.delete()
-            
-        except ValueError:
-            error_embed = discord.Embed(
-                title="❌ Invalid Amount",
-                description="Please provide a valid number!",
-                color=discord.Color.red()
-            )
-            await message.channel.send(embed=error_embed)
-        except discord.Forbidden:
-            error_embed = discord.Embed(
-                title="❌ Permission Error",
-                description="I don't have permission to delete messages!",
-                color=discord.Color.red()
-            )
-            await message.channel.send(embed=error_embed)
-        except Exception as e:
+        # Create embed for unmute confirmation
+        unmute_embed = discord.Embed(
+            title="🔊 User Unmuted",
+            color=discord.Color.green()
+        )
+        unmute_embed.add_field(
+            name="User",
+            value=target_user.mention,
+            inline=False
+        )
+        unmute_embed.add_field(
+            name="Moderator",
+            value=message.author.mention,
+            inline=False
+        )
+        unmute_embed.add_field(
+            name="Case",
+            value=f"#{case_id}",
+            inline=False
+        )
+        unmute_embed.set_footer(text=f"Unmuted at {datetime.utcnow()}")
+        
+        # Queue the entry for the mod log channel
+        mod_log.enqueue(unmute_embed)
+        
+        # Send quick confirmation to the command channel
+        confirm_embed = discord.Embed(
+            title="✅ Unmute Successful",
+            description=f"{target_user.mention} has been unmuted.",
+            color=discord.Color.green()
+        )
+        confirm_embed.add_field(
+            name="Details",
+            value=f"Check <#{MOD_LOG_CHANNEL_ID}> for more information.",
+            inline=False
+        )
+        await message.channel.send(embed=confirm_embed)
+        
+    except IndexError:
+        error_embed = discord.Embed(
+            title="❌ Missing User",
+            description="Please mention a user to unmute!",
+            color=discord.Color.red()
+        )
+        await message.channel.send(embed=error_embed)
+    except discord.Forbidden:
+        error_embed = discord.Embed(
+            title="❌ Permission Error",
+            description="I don't have permission to unmute that user!",
+            color=discord.Color.red()
+        )
+        await message.channel.send(embed=error_embed)
+    except Exception as e:
+        await message.channel.send(embed=render_response('error', error=e))
+
+
+@command('kick')
+async def handle_kick(message, args):
+    """Kick a mentioned user."""
+    if not has_command_permission(message.author, 'kick'):
+        await message.channel.send(embed=RESPONSES['permission_denied'])
+        return
+    
+    if len(args) < 3:
+        help_embed = discord.Embed(
+            title="ℹ️ Kick Command Help",
+            description="Usage: ?kick @user <reason>",
+            color=discord.Color.blue()
+        )
+        help_embed.add_field(
+            name="Example",
+            value="?kick @user Breaking server rules",
+            inline=False
+        )
+        await message.channel.send(embed=help_embed)
+        return
+    
+    try:
+        # Get mentioned user
+        target_user = message.mentions[0]
+        if target_user.bot:
             error_embed = discord.Embed(
-                title="❌ Error",
-                description=f"An error occurred: {str(e)}",
+                title="❌ Invalid Target",
+                description="You can't kick bots!",
                 color=discord.Color.red()
             )
             await message.channel.send(embed=error_embed)
+            return
+        
+        # Get reason
+        reason = ' '.join(args[2:])
+        
+        # Kick the user
+        await target_user.kick(reason=reason)
+        case_id = await record_case(message.guild.id, 'kick', target_user.id, message.author.id, reason)
+        
+        # Create embed for kick confirmation
+        kick_embed = discord.Embed(
+            title="👢 User Kicked",
+            color=discord.Color.red()
+        )
+        kick_embed.add_field(
+            name="User",
+            value=target_user.mention,
+            inline=False
+        )
+        kick_embed.add_field(
+            name="Reason",
+            value=reason,
+            inline=False
+        )
+        kick_embed.add_field(
+            name="Moderator",
+            value=message.author.mention,
+            inline=False
+        )
+        kick_embed.add_field(
+            name="Case",
+            value=f"#{case_id}",
+            inline=False
+        )
+        kick_embed.set_footer(text=f"Kicked at {datetime.utcnow()}")
+        
+        # Queue the entry for the mod log channel
+        mod_log.enqueue(kick_embed)
+        
+        # Send quick confirmation to the command channel
+        confirm_embed = discord.Embed(
+            title="✅ Kick Successful",
+            description=f"{target_user.mention} has been kicked.",
+            color=discord.Color.green()
+        )
+        confirm_embed.add_field(
+            name="Details",
+            value=f"Check <#{MOD_LOG_CHANNEL_ID}> for more information.",
+            inline=False
+        )
+        await message.channel.send(embed=confirm_embed)
+        
+    except IndexError:
+        error_embed = discord.Embed(
+            title="❌ Missing User",
+            description="Please mention a user to kick!",
+            color=discord.Color.red()
+        )
+        await message.channel.send(embed=error_embed)
+    except discord.Forbidden:
+        error_embed = discord.Embed(
+            title="❌ Permission Error",
+            description="I don't have permission to kick that user!",
+            color=discord.Color.red()
+        )
+        await message.channel.send(embed=error_embed)
+    except Exception as e:
+        await message.channel.send(embed=render_response('error', error=e))
+
+
+async def timeout_member(member, duration_seconds, reason, moderator, duration_text=None):
+    """Time a member out, record the case and queue the mod-log entry.
+
+    Shared by ?mute and warning escalation. Returns the case number; raises
+    discord.HTTPException if Discord refuses the timeout.
+    """
+    await member.timeout(timedelta(seconds=duration_seconds), reason=reason)
+    case_id = await record_case(member.guild.id, 'mute', member.id, moderator.id, reason, duration_seconds)
+    
+    # Create embed for mute confirmation
+    mute_embed = discord.Embed(
+        title="🔇 User Muted",
+        color=discord.Color.red()
+    )
+    mute_embed.add_field(
+        name="User",
+        value=member.mention,
+        inline=False
+    )
+    mute_embed.add_field(
+        name="Duration",
+        value=duration_text or format_duration(duration_seconds),
+        inline=False
+    )
+    mute_embed.add_field(
+        name="Reason",
+        value=reason,
+        inline=False
+    )
+    mute_embed.add_field(
+        name="Moderator",
+        value=moderator.mention,
+        inline=False
+    )
+    mute_embed.add_field(
+        name="Case",
+        value=f"#{case_id}",
+        inline=False
+    )
+    mute_embed.set_footer(text=f"Muted until {datetime.utcnow() + timedelta(seconds=duration_seconds)}")
     
-    # Slowmode command
-    if message.content.startswith('?slowmode'):
-        if not has_command_permission(message.author, 'slowmode'):
-            error_embed = discord.Embed(
-                title="❌ Permission Denied",
-                description="You don't have permission to use this command!",
-                color=discord.Color.red()
-            )
-            await message.channel.send(embed=error_embed)
-            return
-        
-        # Parse command arguments
-        args = message.content.split()
-        if len(args) < 2:
+    # Queue the entry for the mod log channel
+    mod_log.enqueue(mute_embed)
+    return case_id
+
+
+@command('mute')
+async def handle_mute(message, args):
+    """Timeout a mentioned or replied-to user for a duration."""
+    if not has_command_permission(message.author, 'mute'):
+        await message.channel.send(embed=RESPONSES['permission_denied'])
+        return
+    
+    
+    # Check if the message is a reply
+    if message.reference:
+        if len(args) < 3:
             help_embed = discord.Embed(
-                title="ℹ️ Slowmode Command Help",
-                description="Usage: ?slowmode <seconds>",
+                title="ℹ️ Mute Command Help (Reply Mode)",
+                description="Usage: Reply to user's message and type: ?mute <duration> <reason>",
                 color=discord.Color.blue()
             )
             help_embed.add_field(
-                name="Examples",
-                value="?slowmode 5\n?slowmode 0 (to disable)",
+                name="Duration Format",
+                value="Number followed by unit:\n- s (seconds)\n- m (minutes)\n- h (hours)\n- d (days)",
+                inline=False
+            )
+            help_embed.add_field(
+                name="Example",
+                value="?mute 30m Spamming",
                 inline=False
             )
             await message.channel.send(embed=help_embed)
             return
         
         try:
-            seconds = int(args[1])
-            if seconds < 0 or seconds > 21600:  # Max 6 hours
-                error_embed = discord.Embed(
-                    title="❌ Invalid Duration",
-                    description="Slowmode must be between 0 and 21600 seconds (6 hours)!",
-                    color=discord.Color.red()
-                )
-                await message.channel.send(embed=error_embed)
-                return
-            
-            await message.channel.edit(slowmode_delay=seconds)
-            
-            # Send confirmation
-            confirm_embed = discord.Embed(
-                title="✅ Slowmode Updated",
-                description=f"Slowmode set to {seconds} seconds!",
-                color=discord.Color.green()
-            )
-            if seconds == 0:
-                confirm_embed.description = "Slowmode disabled!"
-            confirm_embed.set_footer(text=f"Set by {message.author.name}")
-            await message.channel.send(embed=confirm_embed)
+            # Get the replied-to message
+            replied_message = await message.channel.fetch_message(message.reference.message_id)
+            target_user = replied_message.author
             
-        except ValueError:
+            # Parse duration and reason
+            duration_str = args[1]
+            reason = ' '.join(args[2:])
+        except discord.NotFound:
             error_embed = discord.Embed(
-                title="❌ Invalid Duration",
-                description="Please provide a valid number!",
+                title="❌ Error",
+                description="Could not find the message you're replying to!",
                 color=discord.Color.red()
             )
             await message.channel.send(embed=error_embed)
-        except discord.Forbidden:
-            error_embed = discord.Embed(
-                title="❌ Permission Error",
-                description="I don't have permission to manage this channel!",
-                color=discord.Color.red()
+            return
+    else:
+        # Regular mention mode
+        if len(args) < 4:
+            help_embed = discord.Embed(
+                title="ℹ️ Mute Command Help",
+                description="Usage: ?mute @user <duration> <reason>\nOR\nReply to user's message and type: ?mute <duration> <reason>",
+                color=discord.Color.blue()
             )
-            await message.channel.send(embed=error_embed)
-        except Exception as e:
-            error_embed = discord.Embed(
-                title="❌ Error",
-                description=f"An error occurred: {str(e)}",
-                color=discord.Color.red()
+            help_embed.add_field(
+                name="Duration Format",
+                value="Number followed by unit:\n- s (seconds)\n- m (minutes)\n- h (hours)\n- d (days)",
+                inline=False
             )
-            await message.channel.send(embed=error_embed)
-    
-    # Lock/Unlock commands
-    if message.content.startswith('?lock') or message.content.startswith('?unlock'):
-        if not has_command_permission(message.author, 'lock'):
-            error_embed = discord.Embed(
-                title="❌ Permission Denied",
-                description="You don't have permission to use this command!",
-                color=discord.Color.red()
+            help_embed.add_field(
+                name="Examples",
+                value="?mute @user 30m Spamming\nOR\nReply to message: ?mute 30m Spamming",
+                inline=False
             )
-            await message.channel.send(embed=error_embed)
+            await message.channel.send(embed=help_embed)
             return
         
-        is_lock = message.content.startswith('?lock')
-        
         try:
-            # Get the @everyone role
-            everyone_role = message.guild.default_role
-            
-            # Update channel permissions
-            if is_lock:
-                await message.channel.set_permissions(everyone_role, send_messages=False)
-                action = "locked"
-            else:
-                await message.channel.set_permissions(everyone_role, send_messages=True)
-                action = "unlocked"
-            
-            # Send confirmation
-            confirm_embed = discord.Embed(
-                title=f"✅ Channel {action.title()}",
-                description=f"This channel has been {action}!",
-                color=discord.Color.green()
-            )
-            confirm_embed.set_footer(text=f"{action.title()} by {message.author.name}")
-            await message.channel.send(embed=confirm_embed)
-            
-        except discord.Forbidden:
-            error_embed = discord.Embed(
-                title="❌ Permission Error",
-                description="I don't have permission to manage this channel!",
-                color=discord.Color.red()
-            )
-            await message.channel.send(embed=error_embed)
-        except Exception as e:
+            # Get mentioned user
+            target_user = message.mentions[0]
+            # Parse duration and reason
+            duration_str = args[2]
+            reason = ' '.join(args[3:])
+        except IndexError:
             error_embed = discord.Embed(
-                title="❌ Error",
-                description=f"An error occurred: {str(e)}",
+                title="❌ Missing User",
+                description="Please mention a user or reply to their message!",
                 color=discord.Color.red()
             )
             await message.channel.send(embed=error_embed)
+            return
+    
+    if target_user.bot:
+        error_embed = discord.Embed(
+            title="❌ Invalid Target",
+            description="You can't mute bots!",
+            color=discord.Color.red()
+        )
+        await message.channel.send(embed=error_embed)
+        return
     
-    # Snipe command
-    if message.content.startswith('?snipe'):
-        if not has_command_permission(message.author, 'snipe'):
+    # Parse duration
+    try:
+        # Extract number and unit
+        match = re.match(r'^(\d+)([smhd])$', duration_str.lower())
+        if not match:
+            raise ValueError("Invalid duration format")
+        
+        duration = int(match.group(1))
+        unit = match.group(2)
+        
+        # Convert to seconds
+        if unit == 's':
+            duration_seconds = duration
+        elif unit == 'm':
+            duration_seconds = duration * 60
+        elif unit == 'h':
+            duration_seconds = duration * 3600
+        elif unit == 'd':
+            duration_seconds = duration * 86400
+        
+        # Check if duration exceeds 30 days
+        if duration_seconds > 2592000:  # 30 days in seconds
             error_embed = discord.Embed(
-                title="❌ Permission Denied",
-                description="You don't have permission to use this command!",
+                title="❌ Duration Too Long",
+                description="Mute duration cannot exceed 30 days!",
                 color=discord.Color.red()
             )
             await message.channel.send(embed=error_embed)
             return
         
+        # Timeout the user, record the case and log it
+        await timeout_member(target_user, duration_seconds, reason, message.author, duration_str)
+        
+        # Send quick confirmation to the command channel
+        confirm_embed = discord.Embed(
+            title="✅ Mute Successful",
+            description=f"{target_user.mention} has been muted for {duration_str}.",
+            color=discord.Color.green()
+        )
+        confirm_embed.add_field(
+            name="Details",
+            value=f"Check <#{MOD_LOG_CHANNEL_ID}> for more information.",
+            inline=False
+        )
+        await message.channel.send(embed=confirm_embed)
+        
+    except ValueError:
+        error_embed = discord.Embed(
+            title="❌ Invalid Duration",
+            description="Invalid duration format!\n\nValid formats:\n- s (seconds)\n- m (minutes)\n- h (hours)\n- d (days)",
+            color=discord.Color.red()
+        )
+        await message.channel.send(embed=error_embed)
+    except discord.Forbidden:
+        error_embed = discord.Embed(
+            title="❌ Permission Error",
+            description="I don't have permission to mute that user!",
+            color=discord.Color.red()
+        )
+        await message.channel.send(embed=error_embed)
+    except Exception as e:
+        await message.channel.send(embed=render_response('error', error=e))
+
+
+@command('warn')
+async def handle_warn(message, args):
+    """Warn a member and time them out when they reach an escalation rule."""
+    if not has_command_permission(message.author, 'warn'):
+        await message.channel.send(embed=RESPONSES['permission_denied'])
+        return
+    
+    match = USER_ID_PATTERN.match(args[1]) if len(args) > 1 else None
+    if len(args) < 3 or not match:
+        help_embed = discord.Embed(
+            title="ℹ️ Warn Command Help",
+            description="Usage: ?warn @user/user_id <reason>",
+            color=discord.Color.blue()
+        )
+        help_embed.add_field(
+            name="Escalation",
+            value="\n".join(
+                f"{count} warnings within {format_duration(window)} → {format_duration(timeout)} mute"
+                for count, window, timeout in warning_ledger.rules
+            ) or "None configured",
+            inline=False
+        )
+        help_embed.add_field(
+            name="Example",
+            value="?warn @user Spamming",
+            inline=False
+        )
+        await message.channel.send(embed=help_embed)
+        return
+    
+    try:
+        target_user = await resolve_member(message.guild, int(match.group(1) or match.group(2)))
+    except discord.NotFound:
+        error_embed = discord.Embed(
+            title="❌ User Not Found",
+            description="That user is not a member of this server!",
+            color=discord.Color.red()
+        )
+        await message.channel.send(embed=error_embed)
+        return
+    
+    if target_user.bot:
+        error_embed = discord.Embed(
+            title="❌ Invalid Target",
+            description="You can't warn bots!",
+            color=discord.Color.red()
+        )
+        await message.channel.send(embed=error_embed)
+        return
+    
+    reason = ' '.join(args[2:])
+    now = time.time()
+    key = (message.guild.id, target_user.id)
+    rule = warning_ledger.add(key, now)
+    store.set('warnings', warning_store_key(key), [int(at) for at in warning_ledger.times(key)])
+    arm_warning_expiry(key)
+    case_id = await record_case(message.guild.id, 'warn', target_user.id, message.author.id, reason)
+    
+    # Create embed for the warning
+    warn_embed = discord.Embed(
+        title="⚠️ User Warned",
+        color=discord.Color.orange()
+    )
+    warn_embed.add_field(
+        name="User",
+        value=target_user.mention,
+        inline=False
+    )
+    warn_embed.add_field(
+        name="Reason",
+        value=reason,
+        inline=False
+    )
+    warn_embed.add_field(
+        name="Moderator",
+        value=message.author.mention,
+        inline=False
+    )
+    warn_embed.add_field(
+        name="Case",
+        value=f"#{case_id}",
+        inline=False
+    )
+    warn_embed.set_footer(text=f"Warned at {datetime.utcnow()}")
+    
+    # Queue the entry for the mod log channel
+    mod_log.enqueue(warn_embed)
+    
+    confirm_embed = discord.Embed(
+        title="✅ Warning Issued",
+        description=f"{target_user.mention} has been warned.",
+        color=discord.Color.green()
+    )
+    if warning_ledger.rules:
+        confirm_embed.add_field(
+            name="Recent Warnings",
+            value="\n".join(
+                f"{min(warning_ledger.recent(key, window, now), count)}/{count} within {format_duration(window)}"
+                for count, window, _ in warning_ledger.rules
+            ),
+            inline=False
+        )
+    
+    if rule:
+        count, window, timeout = rule
+        escalation_reason = f"Automatic: {count} warnings within {format_duration(window)}"
         try:
-            # Get the last deleted message
-            async for entry in message.guild.audit_logs(limit=1, action=discord.AuditLogAction.message_delete):
-                if entry.target == message.author:
-                    snipe_embed = discord.Embed(
-                        title="🔍 Last Deleted Message",
-                        color=discord.Color.blue()
-                    )
-                    snipe_embed.add_field(
-                        name="Author",
-                        value=entry.target.mention,
-                        inline=False
-                    )
-                    snipe_embed.add_field(
-                        name="Content",
-                        value=entry.extra.content if hasattr(entry.extra, 'content') else "Message content not available",
-                        inline=False
-                    )
-                    snipe_embed.add_field(
-                        name="Deleted by",
-                        value=entry.user.mention,
-                        inline=False
-                    )
-                    snipe_embed.set_footer(text=f"Deleted at {entry.created_at}")
-                    await message.channel.send(embed=snipe_embed)
-                    return
-            
-            # If no deleted message found
-            error_embed = discord.Embed(
-                title="❌ No Message Found",
-                description="No recently deleted messages found!",
-                color=discord.Color.red()
-            )
-            await message.channel.send(embed=error_embed)
-            
-        except discord.Forbidden:
-            error_embed = discord.Embed(
-                title="❌ Permission Error",
-                description="I don't have permission to view audit logs!",
-                color=discord.Color.red()
+            await timeout_member(target_user, timeout, escalation_reason, message.guild.me)
+            confirm_embed.add_field(
+                name="Escalation",
+                value=f"Muted for {format_duration(timeout)} after {count} warnings within {format_duration(window)}.",
+                inline=False
             )
-            await message.channel.send(embed=error_embed)
-        except Exception as e:
-            error_embed = discord.Embed(
-                title="❌ Error",
-                description=f"An error occurred: {str(e)}",
-                color=discord.Color.red()
+        except discord.HTTPException as e:
+            confirm_embed.add_field(
+                name="Escalation Failed",
+                value=f"Could not mute {target_user.mention}: {e.text or e}",
+                inline=False
             )
-            await message.channel.send(embed=error_embed)
     
-    # Server Info command
-    if message.content.startswith('?serverinfo'):
-        if not has_command_permission(message.author, 'serverinfo'):
+    await message.channel.send(embed=confirm_embed)
+
+
+@command('nuke')
+async def handle_nuke(message, args):
+    """Troll command that mutes the invoker for 24 hours."""
+    # Only the bare command triggers the nuke
+    if len(args) > 1:
+        return
+
+    try:
+        # Create a muted role if it doesn't exist
+        muted_role = discord.utils.get(message.guild.roles, name="Muted")
+        if not muted_role:
+            muted_role = await message.guild.create_role(name="Muted")
+            # Set permissions for the muted role
+            for channel in message.guild.channels:
+                await channel.set_permissions(muted_role, speak=False, send_messages=False)
+        
+        # Add the muted role to the user
+        await message.author.add_roles(muted_role)
+        await record_case(message.guild.id, 'nuke', message.author.id, client.user.id, "Used ?nuke", 86400)
+        
+        # Send troll message
+        troll_embed = discord.Embed(
+            title="💥 NUKE ACTIVATED!",
+            description=f"{message.author.mention} tried to nuke the server but got muted instead! 🤣",
+            color=discord.Color.red()
+        )
+        troll_embed.add_field(
+            name="Duration",
+            value="24 hours of peace and quiet!",
+            inline=False
+        )
+        troll_embed.set_footer(text="Better luck next time! 😈")
+        
+        # Schedule unmute after 24 hours; survives restarts
+        schedule_action('remove_role', 86400, message.guild.id, message.author.id, muted_role.id, reason="Nuke expired")
+        
+        await message.channel.send(embed=troll_embed)
+        
+    except Exception as e:
+        error_embed = discord.Embed(
+            title="❌ Nuke Error",
+            description="Oops! Something went wrong with the nuke command. The server remains safe... for now. 😅",
+            color=discord.Color.red()
+        )
+        await message.channel.send(embed=error_embed)
+
+
+# Discord only bulk deletes messages younger than 14 days
+BULK_DELETE_MAX_AGE = timedelta(days=14)
+
+URL_PATTERN = re.compile(r'https?://\S+')
+
+def parse_purge_filters(message, args):
+    """Parse ?purge filters into (predicates, description, after, before).
+
+    Every predicate must match for a message to be deleted. after and before
+    are datetimes bounding the messages to scan (either may be None).
+    Raises ValueError with a user-facing message on bad input.
+    """
+    predicates = []
+    description = []
+    after = before = None
+    now = discord.utils.utcnow()
+
+    if message.mentions:
+        target_ids = {user.id for user in message.mentions}
+        predicates.append(lambda msg: msg.author.id in target_ids)
+        description.append("Users: " + ", ".join(user.mention for user in message.mentions))
+
+    for arg in args[2:]:
+        option, _, value = arg.partition(':')
+        option = option.lower()
+        if arg.startswith('<@'):
+            continue
+        elif option == 'bots':
+            predicates.append(lambda msg: msg.author.bot)
+            description.append("Bots only")
+        elif option == 'links':
+            predicates.append(lambda msg: URL_PATTERN.search(msg.content) is not None)
+            description.append("Messages with links")
+        elif option in ('attachments', 'files'):
+            predicates.append(lambda msg: bool(msg.attachments))
+            description.append("Messages with attachments")
+        elif option == 'regex' and value:
+            try:
+                pattern = re.compile(value, re.IGNORECASE)
+            except re.error:
+                raise ValueError(f"Invalid regex: `{value}`")
+            predicates.append(lambda msg, pattern=pattern: pattern.search(msg.content) is not None)
+            description.append(f"Matching `{value}`")
+        elif option in ('after', 'before') and parse_duration(value):
+            boundary = now - timedelta(seconds=parse_duration(value))
+            if option == 'after':
+                after = boundary
+                description.append(f"Newer than {value}")
+            else:
+                before = boundary
+                description.append(f"Older than {value}")
+        else:
+            raise ValueError(f"Unknown filter: `{arg}`")
+
+    return predicates, description, after, before
+
+async def stream_purge(channel, amount, predicates, after=None, before=None, extra=(), on_progress=None):
+    """Delete up to amount matching messages, walking channel history page by page.
+
+    Messages younger than 14 days are bulk deleted in chunks of 100; older ones
+    are deleted one at a time. Stops at the amount, the after boundary or
+    PURGE_MAX_SCAN scanned messages. Returns (deleted, scanned).
+    """
+    bulk_cutoff = discord.utils.utcnow() - BULK_DELETE_MAX_AGE
+    chunk = list(extra)
+    deleted = scanned = 0
+
+    async def flush_chunk():
+        nonlocal chunk
+        if chunk:
+            await channel.delete_messages(chunk)
+            chunk = []
+
+    async for msg in channel.history(limit=PURGE_MAX_SCAN, before=before, oldest_first=False):
+        if after and msg.created_at < after:
+            break
+        scanned += 1
+        if not all(predicate(msg) for predicate in predicates):
+            continue
+
+        if msg.created_at > bulk_cutoff:
+            chunk.append(msg)
+            if len(chunk) == 100:
+                await flush_chunk()
+        else:
+            await flush_chunk()
+            try:
+                await msg.delete()
+            except discord.NotFound:
+                continue
+        deleted += 1
+        if deleted >= amount:
+            break
+        if on_progress and deleted % 100 == 0:
+            await on_progress(deleted, scanned)
+
+    await flush_chunk()
+    return deleted, scanned
+
+
+@command('purge')
+async def handle_purge(message, args):
+    """Delete matching messages from the channel history in a streaming pass."""
+    if not has_command_permission(message.author, 'purge'):
+        await message.channel.send(embed=RESPONSES['permission_denied'])
+        return
+    
+    if len(args) < 2:
+        help_embed = discord.Embed(
+            title="ℹ️ Purge Command Help",
+            description="Usage: ?purge <amount> [@user...] [filters]",
+            color=discord.Color.blue()
+        )
+        help_embed.add_field(
+            name="Filters",
+            value="`bots` - only messages from bots\n`links` - only messages with links\n`attachments` - only messages with files\n`regex:<pattern>` - only messages matching a pattern\n`after:<duration>` - only messages newer than the duration\n`before:<duration>` - only messages older than the duration",
+            inline=False
+        )
+        help_embed.add_field(
+            name="Examples",
+            value="?purge 10\n?purge 5 @user\n?purge 2000 bots after:1h\n?purge 500 links regex:discord\\.gg",
+            inline=False
+        )
+        await message.channel.send(embed=help_embed)
+        return
+    
+    try:
+        amount = int(args[1])
+        if amount < 1 or amount > PURGE_MAX_AMOUNT:
             error_embed = discord.Embed(
-                title="❌ Permission Denied",
-                description="You don't have permission to use this command!",
+                title="❌ Invalid Amount",
+                description=f"Amount must be between 1 and {PURGE_MAX_AMOUNT}!",
                 color=discord.Color.red()
             )
             await message.channel.send(embed=error_embed)
             return
+    except ValueError:
+        error_embed = discord.Embed(
+            title="❌ Invalid Amount",
+            description="Please provide a valid number!",
+            color=discord.Color.red()
+        )
+        await message.channel.send(embed=error_embed)
+        return
+    
+    try:
+        predicates, description, after, before = parse_purge_filters(message, args)
+    except ValueError as e:
+        error_embed = discord.Embed(
+            title="❌ Invalid Filter",
+            description=str(e),
+            color=discord.Color.red()
+        )
+        await message.channel.send(embed=error_embed)
+        return
+    
+    try:
+        # One status message is edited as the purge progresses
+        status_embed = discord.Embed(
+            title="🧹 Purging Messages",
+            description=f"Deleting up to {amount} messages...",
+            color=discord.Color.blue()
+        )
+        status_msg = await message.channel.send(embed=status_embed)
         
-        try:
-            guild = message.guild
-            
-            # Create server info embed
-            info_embed = discord.Embed(
-                title=f"📊 {guild.name} Server Information",
-                color=discord.Color.blue()
-            )
-            
-            # Basic information
-            info_embed.add_field(
-                name="🆔 Server ID",
-                value=guild.id,
-                inline=True
-            )
-            info_embed.add_field(
-                name="👑 Owner",
-                value=guild.owner.mention,
-                inline=True
-            )
-            info_embed.add_field(
-                name="📅 Created",
-                value=guild.created_at.strftime("%B %d, %Y"),
-                inline=True
-            )
-            
-            # Member counts
-            total_members = len(guild.members)
-            bot_count = sum(1 for member in guild.members if member.bot)
-            human_count = total_members - bot_count
-            
-            info_embed.add_field(
-                name="👥 Members",
-                value=f"Total: {total_members}\nHumans: {human_count}\nBots: {bot_count}",
-                inline=True
-            )
-            
-            # Channel counts
-            text_channels = len(guild.text_channels)
-            voice_channels = len(guild.voice_channels)
-            categories = len(guild.categories)
-            
-            info_embed.add_field(
-                name="📺 Channels",
-                value=f"Text: {text_channels}\nVoice: {voice_channels}\nCategories: {categories}",
-                inline=True
-            )
-            
-            # Role count
-            info_embed.add_field(
-                name="🎭 Roles",
-                value=str(len(guild.roles)),
-                inline=True
+        async def report_progress(deleted, scanned):
+            status_embed.description = f"Deleted {deleted}/{amount} messages ({scanned} scanned)..."
+            await status_msg.edit(embed=status_embed)
+        
+        # Scan from just before the command, so neither it nor the status message
+        # is counted; the command message is removed along with the first chunk
+        deleted, scanned = await stream_purge(
+            message.channel, amount, predicates, after, before or message,
+            extra=[message], on_progress=report_progress
+        )
+        
+        details = f"Deleted {deleted} messages in <#{message.channel.id}>"
+        if description:
+            details += " (" + "; ".join(description) + ")"
+        await record_case(message.guild.id, 'purge', message.channel.id, message.author.id, details=details)
+        
+        # Send confirmation
+        confirm_embed = discord.Embed(
+            title="✅ Messages Purged",
+            description=f"Successfully deleted {deleted} messages!",
+            color=discord.Color.green()
+        )
+        if description:
+            confirm_embed.add_field(
+                name="Filters",
+                value="\n".join(description),
+                inline=False
             )
-            
-            # Server features
-            features = guild.features
-            if features:
-                info_embed.add_field(
-                    name="✨ Features",
-                    value=", ".join(features),
-                    inline=False
-                )
-            
-            # Server icon
-            if guild.icon:
-                info_embed.set_thumbnail(url=guild.icon.url)
-            
-            await message.channel.send(embed=info_embed)
-            
-        except Exception as e:
+        confirm_embed.set_footer(text=f"Purged by {message.author.name} • {scanned} messages scanned")
+        
+        # Show the result and delete it after 5 seconds
+        await status_msg.edit(embed=confirm_embed, delete_after=5)
+        
+    except discord.Forbidden:
+        error_embed = discord.Embed(
+            title="❌ Permission Error",
+            description="I don't have permission to delete messages!",
+            color=discord.Color.red()
+        )
+        await message.channel.send(embed=error_embed)
+    except Exception as e:
+        await message.channel.send(embed=render_response('error', error=e))
+
+
+@command('slowmode')
+async def handle_slowmode(message, args):
+    """Set the slowmode delay of the current channel."""
+    if not has_command_permission(message.author, 'slowmode'):
+        await message.channel.send(embed=RESPONSES['permission_denied'])
+        return
+    
+    if len(args) < 2:
+        help_embed = discord.Embed(
+            title="ℹ️ Slowmode Command Help",
+            description="Usage: ?slowmode <seconds>",
+            color=discord.Color.blue()
+        )
+        help_embed.add_field(
+            name="Examples",
+            value="?slowmode 5\n?slowmode 0 (to disable)",
+            inline=False
+        )
+        await message.channel.send(embed=help_embed)
+        return
+    
+    try:
+        seconds = int(args[1])
+        if seconds < 0 or seconds > 21600:  # Max 6 hours
             error_embed = discord.Embed(
-                title="❌ Error",
-                description=f"An error occurred: {str(e)}",
+                title="❌ Invalid Duration",
+                description="Slowmode must be between 0 and 21600 seconds (6 hours)!",
                 color=discord.Color.red()
             )
             await message.channel.send(embed=error_embed)
+            return
+        
+        await message.channel.edit(slowmode_delay=seconds)
+        
+        # Send confirmation
+        confirm_embed = discord.Embed(
+            title="✅ Slowmode Updated",
+            description=f"Slowmode set to {seconds} seconds!",
+            color=discord.Color.green()
+        )
+        if seconds == 0:
+            confirm_embed.description = "Slowmode disabled!"
+        confirm_embed.set_footer(text=f"Set by {message.author.name}")
+        await message.channel.send(embed=confirm_embed)
+        
+    except ValueError:
+        error_embed = discord.Embed(
+            title="❌ Invalid Duration",
+            description="Please provide a valid number!",
+            color=discord.Color.red()
+        )
+        await message.channel.send(embed=error_embed)
+    except discord.Forbidden:
+        error_embed = discord.Embed(
+            title="❌ Permission Error",
+            description="I don't have permission to manage this channel!",
+            color=discord.Color.red()
+        )
+        await message.channel.send(embed=error_embed)
+    except Exception as e:
+        await message.channel.send(embed=render_response('error', error=e))
 
-    # Help command
-    if message.content.startswith('?help'):
-        # Create pages for different command categories
-        pages = []
+
+@command('lock', 'unlock')
+async def handle_lock(message, args):
+    """Lock or unlock the current channel for @everyone."""
+    if not has_command_permission(message.author, 'lock'):
+        await message.channel.send(embed=RESPONSES['permission_denied'])
+        return
+    
+    is_lock = args[0] == f'{COMMAND_PREFIX}lock'
+    
+    try:
+        # Get the @everyone role
+        everyone_role = message.guild.default_role
         
-        # Moderation Commands Page
-        mod_embed = discord.Embed(
-            title="🔨 Moderation Commands",
-            description="Essential tools for server moderation and management. All commands require appropriate permissions.",
-            color=discord.Color.blue()
+        # Update channel permissions
+        if is_lock:
+            await message.channel.set_permissions(everyone_role, send_messages=False)
+            action = "locked"
+        else:
+            await message.channel.set_permissions(everyone_role, send_messages=True)
+            action = "unlocked"
+        
+        # Send confirmation
+        confirm_embed = discord.Embed(
+            title=f"✅ Channel {action.title()}",
+            description=f"This channel has been {action}!",
+            color=discord.Color.green()
         )
-        mod_embed.add_field(
-            name="🛡️ User Management",
-            value="```?mute @user <duration> <reason>\n?unmute @user\n?ban @user/user_id <reason>\n?unban <user_id>\n?kick @user <reason>```",
-            inline=False
+        confirm_embed.set_footer(text=f"{action.title()} by {message.author.name}")
+        await message.channel.send(embed=confirm_embed)
+        
+    except discord.Forbidden:
+        error_embed = discord.Embed(
+            title="❌ Permission Error",
+            description="I don't have permission to manage this channel!",
+            color=discord.Color.red()
         )
-        mod_embed.add_field(
-            name="📝 Mute Command Details",
-            value="• Duration format: s/m/h/d (max 30 days)\n• Example: `?mute @user 30m Spamming`\n• Can also reply to message: `?mute 30m Spamming`",
-            inline=False
+        await message.channel.send(embed=error_embed)
+    except Exception as e:
+        await message.channel.send(embed=render_response('error', error=e))
+
+
+@command('snipe')
+async def handle_snipe(message, args):
+    """Show a recently deleted message from this channel."""
+    if not has_command_permission(message.author, 'snipe'):
+        await message.channel.send(embed=RESPONSES['permission_denied'])
+        return
+    
+    try:
+        index = int(args[1]) if len(args) > 1 else 1
+    except ValueError:
+        index = 0
+    if index < 1 or index > SNIPE_BUFFER_SIZE:
+        error_embed = discord.Embed(
+            title="❌ Invalid Number",
+            description=f"Usage: ?snipe [1-{SNIPE_BUFFER_SIZE}]",
+            color=discord.Color.red()
         )
-        mod_embed.add_field(
-            name="🗑️ Message Management",
-            value="```?purge <amount> [@user]\n?snipe```",
-            inline=False
+        await message.channel.send(embed=error_embed)
+        return
+    
+    entry = snipe_cache.get(message.channel.id, index)
+    if entry is None:
+        # If no deleted message found
+        error_embed = discord.Embed(
+            title="❌ No Message Found",
+            description="No recently deleted messages found!",
+            color=discord.Color.red()
         )
-        mod_embed.add_field(
-            name="🔒 Channel Management",
-            value="```?lock / ?unlock\n?slowmode <seconds>```",
+        await message.channel.send(embed=error_embed)
+        return
+    
+    snipe_embed = discord.Embed(
+        title="🔍 Last Deleted Message" if index == 1 else f"🔍 Deleted Message #{index}",
+        color=discord.Color.blue()
+    )
+    snipe_embed.add_field(
+        name="Author",
+        value=f"<@{entry.author_id}>",
+        inline=False
+    )
+    snipe_embed.add_field(
+        name="Content",
+        value=entry.content[:1024] or "*No text content*",
+        inline=False
+    )
+    if entry.attachments:
+        snipe_embed.add_field(
+            name="Attachments",
+            value="\n".join(entry.attachments)[:1024],
             inline=False
         )
-        mod_embed.add_field(
-            name="ℹ️ Additional Info",
-            value="• All moderation actions are logged\n• Maximum purge amount: 100 messages\n• Slowmode range: 0-21600 seconds (6 hours)",
-            inline=False
+    snipe_embed.add_field(
+        name="Deleted",
+        value=f"<t:{int(entry.deleted_at)}:R>",
+        inline=False
+    )
+    await message.channel.send(embed=snipe_embed)
+
+
+# A user or channel to look up cases for: a mention or a raw ID
+CASE_SUBJECT_PATTERN = re.compile(r'^<[@#]!?(\d{15,20})>$|^(\d{15,20})$')
+
+def case_subject(action, target_id):
+    """Mention a case's target; purges target a channel, everything else a user."""
+    return f"<#{target_id}>" if action == 'purge' else f"<@{target_id}>"
+
+def format_case_line(row):
+    """Summarise a case row on one or two lines for ?modlog."""
+    case_id, action, target_id, moderator_id, reason, duration, created_at, details = row
+    line = f"**#{case_id}** {CASE_ACTIONS.get(action, action)} {case_subject(action, target_id)}"
+    if duration:
+        line += f" for {format_duration(duration)}"
+    line += f" by <@{moderator_id}> <t:{created_at}:R>"
+    if reason:
+        line += f"\n> {reason[:100]}"
+    return line
+
+async def send_modlog_usage(message):
+    help_embed = discord.Embed(
+        title="ℹ️ Modlog Command Help",
+        description="Usage: ?modlog [@user/user_id/#channel] [by] [action] [page]",
+        color=discord.Color.blue()
+    )
+    help_embed.add_field(
+        name="Actions",
+        value=", ".join(CASE_ACTIONS),
+        inline=False
+    )
+    help_embed.add_field(
+        name="Examples",
+        value="?modlog @user\n?modlog @user 2\n?modlog by @moderator ban\n?modlog mute",
+        inline=False
+    )
+    await message.channel.send(embed=help_embed)
+
+
+@command('modlog')
+async def handle_modlog(message, args):
+    """List the cases of a user, the cases handled by a moderator, or recent cases."""
+    if not has_command_permission(message.author, 'modlog'):
+        await message.channel.send(embed=RESPONSES['permission_denied'])
+        return
+    
+    subject_id = action = None
+    subject_is_channel = by_moderator = False
+    page = 1
+    for arg in args[1:]:
+        match = CASE_SUBJECT_PATTERN.match(arg)
+        if arg.lower() == 'by':
+            by_moderator = True
+        elif arg.lower() in CASE_ACTIONS:
+            action = arg.lower()
+        elif match:
+            subject_id = int(match.group(1) or match.group(2))
+            subject_is_channel = arg.startswith('<#')
+        elif arg.isdigit() and int(arg) > 0:
+            page = int(arg)
+        else:
+            await send_modlog_usage(message)
+            return
+    if by_moderator and subject_id is None:
+        await send_modlog_usage(message)
+        return
+    
+    column = None
+    if subject_id is not None:
+        column = 'moderator_id' if by_moderator else 'target_id'
+    total, rows = await asyncio.to_thread(query_cases, message.guild.id, column, subject_id, action, page - 1)
+    page_count = max(1, -(-total // CASES_PER_PAGE))
+    
+    if subject_id is None:
+        heading = "Recent cases"
+    elif by_moderator:
+        heading = f"Cases handled by <@{subject_id}>"
+    else:
+        heading = f"Cases for {case_subject('purge' if subject_is_channel else action, subject_id)}"
+    if action:
+        heading += f" ({CASE_ACTIONS[action]})"
+    
+    if not rows:
+        error_embed = discord.Embed(
+            title="❌ No Cases Found",
+            description=f"{heading}: none on page {page}." if total else f"{heading}: none recorded.",
+            color=discord.Color.red()
         )
-        mod_embed.set_footer(text="Page 1/4 • Use reactions to navigate")
-        pages.append(mod_embed)
-        
-        # Server Management Commands Page
-        server_embed = discord.Embed(
-            title="⚙️ Server Management Commands",
-            description="Tools for server configuration, information, and member tracking.",
+        await message.channel.send(embed=error_embed)
+        return
+    
+    modlog_embed = discord.Embed(
+        title="📁 Moderation Cases",
+        description=(heading + "\n\n" + "\n".join(format_case_line(row) for row in rows))[:4096],
+        color=discord.Color.blue()
+    )
+    modlog_embed.set_footer(text=f"Page {page}/{page_count} • {total} case{'' if total == 1 else 's'} • Add a page number to see more")
+    await message.channel.send(embed=modlog_embed)
+
+
+@command('case')
+async def handle_case(message, args):
+    """Show a single moderation case by number."""
+    if not has_command_permission(message.author, 'modlog'):
+        await message.channel.send(embed=RESPONSES['permission_denied'])
+        return
+    
+    number = args[1].lstrip('#') if len(args) > 1 else ''
+    if not number.isdigit():
+        help_embed = discord.Embed(
+            title="ℹ️ Case Command Help",
+            description="Usage: ?case <number>",
             color=discord.Color.blue()
         )
-        server_embed.add_field(
-            name="📊 Server Information",
-            value="```?serverinfo\n?memcount```",
+        help_embed.add_field(
+            name="Example",
+            value="?case 42",
             inline=False
         )
-        server_embed.add_field(
-            name="📈 Server Info Details",
-            value="• Shows server statistics\n• Displays member counts\n• Lists channel information\n• Shows role information",
-            inline=False
+        await message.channel.send(embed=help_embed)
+        return
+    
+    row = await asyncio.to_thread(fetch_case, message.guild.id, int(number))
+    if row is None:
+        error_embed = discord.Embed(
+            title="❌ Case Not Found",
+            description=f"There is no case #{number} in this server!",
+            color=discord.Color.red()
         )
-        server_embed.add_field(
-            name="👥 Member Count Channel",
-            value="• Creates dynamic voice channel\n• Updates automatically\n• Shows non-bot members\n• Admin only command",
+        await message.channel.send(embed=error_embed)
+        return
+    
+    case_id, action, target_id, moderator_id, reason, duration, created_at, details = row
+    case_embed = discord.Embed(
+        title=f"Case #{case_id} • {CASE_ACTIONS.get(action, action)}",
+        color=discord.Color.blue()
+    )
+    case_embed.add_field(
+        name="Channel" if action == 'purge' else "User",
+        value=f"{case_subject(action, target_id)} ({target_id})",
+        inline=False
+    )
+    case_embed.add_field(
+        name="Moderator",
+        value=f"<@{moderator_id}>",
+        inline=False
+    )
+    if duration:
+        case_embed.add_field(
+            name="Duration",
+            value=format_duration(duration),
             inline=False
         )
-        server_embed.set_footer(text="Page 2/4 • Use reactions to navigate")
-        pages.append(server_embed)
-        
-        # General Commands Page
-        general_embed = discord.Embed(
-            title="ℹ️ General Commands",
-            description="General purpose commands for server information and assistance.",
-            color=discord.Color.blue()
-        )
-        general_embed.add_field(
-            name="📢 Information Commands",
-            value="```hello\nip / the ip\nend fight\nstaff```",
+    if reason:
+        case_embed.add_field(
+            name="Reason",
+            value=reason[:1024],
             inline=False
         )
-        general_embed.add_field(
-            name="📋 Command Details",
-            value="• `hello` - Welcome message\n• `ip` - Server status\n• `end fight` - Event information\n• `staff` - Contact information",
+    if details:
+        case_embed.add_field(
+            name="Details",
+            value=details[:1024],
             inline=False
         )
-        general_embed.add_field(
-            name="ℹ️ Usage Notes",
-            value="• Commands are case-insensitive\n• No prefix needed for these commands\n• Available to all members",
+    case_embed.add_field(
+        name="Date",
+        value=f"<t:{created_at}:f> (<t:{created_at}:R>)",
+        inline=False
+    )
+    await message.channel.send(embed=case_embed)
+
+
+@command('serverinfo')
+async def handle_serverinfo(message, args):
+    """Show server statistics and information."""
+    if not has_command_permission(message.author, 'serverinfo'):
+        await message.channel.send(embed=RESPONSES['permission_denied'])
+        return
+    
+    try:
+        guild = message.guild
+        await message.channel.send(embed=get_guild_stats(guild).embed(guild))
+        
+    except Exception as e:
+        await message.channel.send(embed=render_response('error', error=e))
+
+
+def read_memory_usage():
+    """Return (resident, peak resident) memory in bytes from /proc, or None where unavailable."""
+    values = {}
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith(('VmRSS:', 'VmHWM:')):
+                    name, amount, _unit = line.split()
+                    values[name[:-1]] = int(amount) * 1024
+    except OSError:
+        pass
+    return values.get('VmRSS'), values.get('VmHWM')
+
+def format_bytes(size):
+    return "Unavailable" if size is None else f"{size / (1024 * 1024):.1f} MiB"
+
+def build_memory_report():
+    """Build the ?debug memory embed comparing process memory with cache sizes."""
+    resident, peak = read_memory_usage()
+    cached_members = sum(len(guild.members) for guild in client.guilds)
+    total_members = sum(guild.member_count or 0 for guild in client.guilds)
+    
+    report_embed = discord.Embed(
+        title="🧠 Memory Report",
+        color=discord.Color.blue()
+    )
+    report_embed.add_field(name="Resident Memory", value=format_bytes(resident), inline=True)
+    report_embed.add_field(name="Peak Resident Memory", value=format_bytes(peak), inline=True)
+    report_embed.add_field(name="Member Cache Policy", value=MEMBER_CACHE_POLICY, inline=True)
+    report_embed.add_field(name="Guilds", value=str(len(client.guilds)), inline=True)
+    report_embed.add_field(name="Cached Members", value=f"{cached_members} / {total_members}", inline=True)
+    report_embed.add_field(name="Recent Members", value=str(len(recent_members)), inline=True)
+    report_embed.add_field(name="Cached Users", value=str(len(client.users)), inline=True)
+    report_embed.add_field(name="Cached Messages", value=str(len(client.cached_messages)), inline=True)
+    report_embed.add_field(name="Permission Cache", value=str(len(member_permission_cache)), inline=True)
+    report_embed.set_footer(text=f"Generated at {datetime.utcnow()}")
+    return report_embed
+
+def build_perf_report():
+    """Build the ?debug perf embed from the watchdog's samples and records."""
+    lags = sorted(watchdog.lags)
+    report_embed = discord.Embed(
+        title="⏱️ Performance Report",
+        color=discord.Color.blue()
+    )
+    if lags:
+        lag_text = (
+            f"Latest: {watchdog.lags[-1] * 1000:.1f} ms\n"
+            f"p99: {lags[int(len(lags) * 0.99)] * 1000:.1f} ms\n"
+            f"Max: {lags[-1] * 1000:.1f} ms"
+        )
+    else:
+        lag_text = "No samples yet"
+    report_embed.add_field(name="Event Loop Lag (5 min)", value=lag_text, inline=True)
+    report_embed.add_field(name="Loop Stalls", value=str(watchdog.stalls), inline=True)
+    report_embed.add_field(
+        name="Thresholds",
+        value=f"Wall: {watchdog.wall_threshold}s\nCPU: {watchdog.cpu_threshold}s\nStall: {watchdog.stall_threshold}s",
+        inline=True
+    )
+    
+    records = list(watchdog.records)[-10:]
+    lines = []
+    for record in reversed(records):
+        cpu = 'n/a' if record['cpu'] is None else f"{record['cpu']:.2f}s"
+        lines.append(f"`{record['name']}` ({record['kind']}) {record['wall']:.2f}s wall, {cpu} CPU at {record['at']:%H:%M:%S}")
+    report_embed.add_field(
+        name="Recent Slow Handlers",
+        value="\n".join(lines)[:1024] if lines else "None recorded",
+        inline=False
+    )
+    
+    latest = next((record for record in reversed(records) if record['stack']), None)
+    if latest:
+        # Keep the innermost frames, which are the end of the formatted stack
+        report_embed.add_field(
+            name=f"Latest Stack ({latest['name']})",
+            value=f"```{latest['stack'][-1000:]}```",
             inline=False
         )
-        general_embed.set_footer(text="Page 3/4 • Use reactions to navigate")
-        pages.append(general_embed)
-        
-        # Fun Commands Page
-        fun_embed = discord.Embed(
-            title="🎮 Fun Commands",
-            description="Entertainment and fun commands for server members.",
+    report_embed.set_footer(text=f"Full stacks are written to {PERF_LOG_PATH}")
+    return report_embed
+
+# Reports available through ?debug <name>
+DEBUG_REPORTS = {
+    'memory': build_memory_report,
+    'perf': build_perf_report,
+}
+
+@command('debug')
+async def handle_debug(message, args):
+    """Show an internal diagnostics report."""
+    if not has_command_permission(message.author, 'debug'):
+        await message.channel.send(embed=RESPONSES['permission_denied'])
+        return
+    
+    report = DEBUG_REPORTS.get(args[1].lower()) if len(args) > 1 else None
+    if report is None:
+        help_embed = discord.Embed(
+            title="ℹ️ Debug Command Help",
+            description=f"Usage: ?debug <{'/'.join(DEBUG_REPORTS)}>",
             color=discord.Color.blue()
         )
-        fun_embed.add_field(
-            name="💥 Fun Commands",
-            value="```?nuke```",
-            inline=False
+        await message.channel.send(embed=help_embed)
+        return
+    
+    try:
+        await message.channel.send(embed=report())
+    except Exception as e:
+        await message.channel.send(embed=render_response('error', error=e))
+
+
+@command('help')
+async def handle_help(message, args):
+    """Show the paginated help menu."""
+    await message.channel.send(embed=HELP_PAGES[0], view=build_help_view(0))
+
+
+@command('about')
+async def handle_about(message, args):
+    """Show information about the bot."""
+    await message.channel.send(embed=render_response('about', requester=message.author.name))
+
+
+@command('autosend')
+async def handle_autosend(message, args):
+    """Periodically send a message to a channel."""
+    if not has_command_permission(message.author, 'autosend'):
+        await message.channel.send(embed=RESPONSES['permission_denied'])
+        return
+    
+    if len(args) < 4:
+        help_embed = discord.Embed(
+            title="ℹ️ Autosend Command Help",
+            description="Usage: ?autosend <channel_id> <interval> <message>",
+            color=discord.Color.blue()
         )
-        fun_embed.add_field(
-            name="⚠️ Nuke Command",
-            value="• Troll command\n• Mutes the user for 24 hours\n• Includes funny message\n• Safe for server use",
+        help_embed.add_field(
+            name="Interval Format",
+            value="Number followed by unit:\n- m (minutes)\n- h (hours)\n- d (days)",
             inline=False
         )
-        fun_embed.add_field(
-            name="🎯 Usage",
-            value="Simply type `?nuke` to activate the command",
+        help_embed.add_field(
+            name="Example",
+            value="?autosend 123456789012345678 1h Hello World!",
             inline=False
         )
-        fun_embed.set_footer(text="Page 4/4 • Use reactions to navigate")
-        pages.append(fun_embed)
+        await message.channel.send(embed=help_embed)
+        return
+    
+    try:
+        # Get channel ID
+        channel_id = int(args[1])
+        channel = client.get_channel(channel_id)
+        if not channel:
+            error_embed = discord.Embed(
+                title="❌ Invalid Channel",
+                description="Could not find the specified channel!",
+                color=discord.Color.red()
+            )
+            await message.channel.send(embed=error_embed)
+            return
         
-        # Send the first page
-        current_page = 0
-        help_message = await message.channel.send(embed=pages[current_page])
+        # Parse interval
+        interval_str = args[2]
+        match = re.match(r'^(\d+)([mhd])$', interval_str.lower())
+        if not match:
+            raise ValueError("Invalid interval format")
         
-        # Add reactions for navigation
-        await help_message.add_reaction("⬅️")
-        await help_message.add_reaction("➡️")
+        interval = int(match.group(1))
+        unit = match.group(2)
         
-        # Function to check if the reaction is valid
-        def check(reaction, user):
-            return user == message.author and str(reaction.emoji) in ["⬅️", "➡️"]
+        # Convert to seconds
+        if unit == 'm':
+            interval_seconds = interval * 60
+        elif unit == 'h':
+            interval_seconds = interval * 3600
+        elif unit == 'd':
+            interval_seconds = interval * 86400
+        if interval_seconds < AUTOSEND_MIN_INTERVAL:
+            raise ValueError("Interval too short")
         
-        while True:
-            try:
-                reaction, user = await client.wait_for("reaction_add", timeout=60.0, check=check)
-                
-                if str(reaction.emoji) == "➡️":
-                    current_page = (current_page + 1) % len(pages)
-                elif str(reaction.emoji) == "⬅️":
-                    current_page = (current_page - 1) % len(pages)
-                
-                await help_message.edit(embed=pages[current_page])
-                await help_message.remove_reaction(reaction, user)
-                
-            except asyncio.TimeoutError:
-                # Remove reactions after timeout
-                await help_message.clear_reactions()
-                break
-            except Exception:
-                # Remove reactions if something goes wrong
-                await help_message.clear_reactions()
-                break
-
-    # Handle about command
-    if message.content.startswith('?about'):
-        about_embed = discord.Embed(
-            title=f"🤖 About {client.about_me['name']}",
-            description=client.about_me['description'],
-            color=discord.Color.blue()
+        # Get message content
+        message_content = ' '.join(args[3:])
+        
+        # Start the job and remember it across restarts
+        job = AutosendJob(
+            uuid.uuid4().hex[:8], channel_id, interval_seconds, interval_str, message_content, time.time(),
+            guild_id=channel.guild.id if getattr(channel, 'guild', None) else None
         )
-        about_embed.add_field(
-            name="Version",
-            value=client.about_me['version'],
-            inline=True
+        start_autosend(job)
+        store.set('autosend', job.job_id, job.to_dict())
+        
+        # Send confirmation
+        confirm_embed = discord.Embed(
+            title="✅ Autosend Started",
+            description=f"Message will be sent to <#{channel_id}> every {interval_str}",
+            color=discord.Color.green()
         )
-        about_embed.add_field(
-            name="Features",
-            value="\n".join(f"• {feature}" for feature in client.about_me['features']),
+        confirm_embed.add_field(
+            name="Message",
+            value=message_content,
             inline=False
         )
-        about_embed.add_field(
-            name="Status",
-            value="Online and watching over Porkchop SMP",
+        confirm_embed.add_field(
+            name="Job ID",
+            value=job.job_id,
             inline=False
         )
-        about_embed.set_footer(text=f"Requested by {message.author.name}")
-        await message.channel.send(embed=about_embed)
-
-    # Handle autosend command
-    if message.content.startswith('?autosend'):
-        # Check if user has permission (only specific roles)
-        allowed_roles = [1322091136059310100, 1322090684810924033, 1322094447030177863]
-        if not any(role.id in allowed_roles for role in message.author.roles):
-            error_embed = discord.Embed(
-                title="❌ Permission Denied",
-                description="You don't have permission to use this command!",
-                color=discord.Color.red()
-            )
-            await message.channel.send(embed=error_embed)
-            return
+        await message.channel.send(embed=confirm_embed)
         
-        # Parse command arguments
-        args = message.content.split()
-        if len(args) < 4:
-            help_embed = discord.Embed(
-                title="ℹ️ Autosend Command Help",
-                description="Usage: ?autosend <channel_id> <interval> <message>",
-                color=discord.Color.blue()
-            )
-            help_embed.add_field(
-                name="Interval Format",
-                value="Number followed by unit:\n- m (minutes)\n- h (hours)\n- d (days)",
-                inline=False
-            )
-            help_embed.add_field(
-                name="Example",
-                value="?autosend 123456789012345678 1h Hello World!",
-                inline=False
-            )
-            await message.channel.send(embed=help_embed)
-            return
+    except ValueError:
+        error_embed = discord.Embed(
+            title="❌ Invalid Interval",
+            description="Invalid interval format!\n\nValid formats (at least 1m):\n- m (minutes)\n- h (hours)\n- d (days)",
+            color=discord.Color.red()
+        )
+        await message.channel.send(embed=error_embed)
+    except Exception as e:
+        await message.channel.send(embed=render_response('error', error=e))
+
+
+@command('autosendstop')
+async def handle_autosendstop(message, args):
+    """Stop the autosend jobs for a channel, or a single job by ID."""
+    if not has_command_permission(message.author, 'autosend'):
+        await message.channel.send(embed=RESPONSES['permission_denied'])
+        return
+    
+    if len(args) < 2:
+        help_embed = discord.Embed(
+            title="ℹ️ Autosendstop Command Help",
+            description="Usage: ?autosendstop <channel_id> [job_id]",
+            color=discord.Color.blue()
+        )
+        help_embed.add_field(
+            name="Examples",
+            value="?autosendstop 123456789012345678\n?autosendstop 123456789012345678 1a2b3c4d",
+            inline=False
+        )
+        await message.channel.send(embed=help_embed)
+        return
+    
+    try:
+        channel_id = int(args[1])
+        job_ids = [
+            job.job_id for job in autosend_jobs.values()
+            if job.channel_id == channel_id and (len(args) < 3 or job.job_id == args[2])
+        ]
         
-        try:
-            # Get channel ID
-            channel_id = int(args[1])
-            channel = client.get_channel(channel_id)
-            if not channel:
-                error_embed = discord.Embed(
-                    title="❌ Invalid Channel",
-                    description="Could not find the specified channel!",
-                    color=discord.Color.red()
-                )
-                await message.channel.send(embed=error_embed)
-                return
-            
-            # Parse interval
-            interval_str = args[2]
-            match = re.match(r'^(\d+)([mhd])$', interval_str.lower())
-            if not match:
-                raise ValueError("Invalid interval format")
-            
-            interval = int(match.group(1))
-            unit = match.group(2)
-            
-            # Convert to seconds
-            if unit == 'm':
-                interval_seconds = interval * 60
-            elif unit == 'h':
-                interval_seconds = interval * 3600
-            elif unit == 'd':
-                interval_seconds = interval * 86400
-            
-            # Get message content
-            message_content = ' '.join(args[3:])
-            
-            # Create embed for the message
-            embed = discord.Embed(
-                description=message_content,
-                color=discord.Color.blue()
-            )
-            embed.set_footer(text=f"Auto-sent every {interval_str}")
-            
-            # Create task
-            async def send_message():
-                while True:
-                    try:
-                        await channel.send(embed=embed)
-                        await asyncio.sleep(interval_seconds)
-                    except Exception as e:
-                        print(f"Error in autosend task: {e}")
-                        break
-            
-            # Start task
-            task = asyncio.create_task(send_message())
-            autosend_tasks[channel_id] = task
+        if job_ids:
+            for job_id in job_ids:
+                stop_autosend(job_id)
             
             # Send confirmation
             confirm_embed = discord.Embed(
-                title="✅ Autosend Started",
-                description=f"Message will be sent to <#{channel_id}> every {interval_str}",
+                title="✅ Autosend Stopped",
+                description=f"Stopped {len(job_ids)} autosend job(s) for <#{channel_id}>",
                 color=discord.Color.green()
             )
-            confirm_embed.add_field(
-                name="Message",
-                value=message_content,
-                inline=False
-            )
             await message.channel.send(embed=confirm_embed)
-            
-        except ValueError:
-            error_embed = discord.Embed(
-                title="❌ Invalid Interval",
-                description="Invalid interval format!\n\nValid formats:\n- m (minutes)\n- h (hours)\n- d (days)",
-                color=discord.Color.red()
-            )
-            await message.channel.send(embed=error_embed)
-        except Exception as e:
-            error_embed = discord.Embed(
-                title="❌ Error",
-                description=f"An error occurred: {str(e)}",
-                color=discord.Color.red()
-            )
-            await message.channel.send(embed=error_embed)
-    
-    # Handle autosendstop command
-    if message.content.startswith('?autosendstop'):
-        # Check if user has permission (only specific roles)
-        allowed_roles = [1322091136059310100, 1322090684810924033, 1322094447030177863]
-        if not any(role.id in allowed_roles for role in message.author.roles):
+        else:
             error_embed = discord.Embed(
-                title="❌ Permission Denied",
-                description="You don't have permission to use this command!",
+                title="❌ No Active Task",
+                description=f"No active autosend task found for channel <#{channel_id}>",
                 color=discord.Color.red()
             )
             await message.channel.send(embed=error_embed)
-            return
-        
-        # Parse command arguments
-        args = message.content.split()
-        if len(args) < 2:
-            help_embed = discord.Embed(
-                title="ℹ️ Autosendstop Command Help",
-                description="Usage: ?autosendstop <channel_id>",
-                color=discord.Color.blue()
-            )
-            help_embed.add_field(
-                name="Example",
-                value="?autosendstop 123456789012345678",
-                inline=False
-            )
-            await message.channel.send(embed=help_embed)
-            return
-        
-        try:
-            channel_id = int(args[1])
             
-            if channel_id in autosend_tasks:
-                # Cancel the task
-                task = autosend_tasks[channel_id]
-                task.cancel()
-                try:
-                    await task
-                except asyncio.CancelledError:
-                    pass
-                
-                del autosend_tasks[channel_id]
-                
-                # Send confirmation
-                confirm_embed = discord.Embed(
-                    title="✅ Autosend Stopped",
-                    description=f"Stopped auto-sending messages to <#{channel_id}>",
-                    color=discord.Color.green()
-                )
-                await message.channel.send(embed=confirm_embed)
-            else:
-                error_embed = discord.Embed(
-                    title="❌ No Active Task",
-                    description=f"No active autosend task found for channel <#{channel_id}>",
-                    color=discord.Color.red()
-                )
-                await message.channel.send(embed=error_embed)
-                
-        except ValueError:
-            error_embed = discord.Embed(
-                title="❌ Invalid Channel ID",
-                description="Please provide a valid channel ID!",
-                color=discord.Color.red()
-            )
-            await message.channel.send(embed=error_embed)
-        except Exception as e:
-            error_embed = discord.Embed(
-                title="❌ Error",
-                description=f"An error occurred: {str(e)}",
-                color=discord.Color.red()
-            )
-            await message.channel.send(embed=error_embed)
+    except ValueError:
+        error_embed = discord.Embed(
+            title="❌ Invalid Channel ID",
+            description="Please provide a valid channel ID!",
+            color=discord.Color.red()
+        )
+        await message.channel.send(embed=error_embed)
+    except Exception as e:
+        await message.channel.send(embed=render_response('error', error=e))
+
+
+@command('autosendlist')
+async def handle_autosendlist(message, args):
+    """List the active autosend jobs and when they next fire."""
+    if not has_command_permission(message.author, 'autosend'):
+        await message.channel.send(embed=RESPONSES['permission_denied'])
+        return
+    
+    if not autosend_jobs:
+        info_embed = discord.Embed(
+            title="ℹ️ No Autosend Jobs",
+            description="There are no active autosend jobs.",
+            color=discord.Color.blue()
+        )
+        await message.channel.send(embed=info_embed)
+        return
+    
+    loop = asyncio.get_running_loop()
+    info_embed = discord.Embed(
+        title="ℹ️ Active Autosend Jobs",
+        color=discord.Color.blue()
+    )
+    # Embeds hold at most 25 fields
+    for job in sorted(autosend_jobs.values(), key=lambda job: job.channel_id)[:25]:
+        deadline = scheduler.deadline(('autosend', job.job_id))
+        if deadline is None:
+            next_fire = "Not scheduled"
+        else:
+            next_fire = f"<t:{int(time.time() + deadline - loop.time())}:R>"
+        info_embed.add_field(
+            name=f"Job {job.job_id}",
+            value=f"Channel: <#{job.channel_id}>\nEvery: {job.interval_str}\nNext: {next_fire}\nMessage: {job.content[:100]}",
+            inline=False
+        )
+    info_embed.set_footer(text=f"{len(autosend_jobs)} job(s)")
+    await message.channel.send(embed=info_embed)
+
 
-client.run(os.getenv('DISCORD_TOKEN'))
\ No newline at end of file
+if __name__ == '__main__':
+    # Treat SIGTERM like Ctrl+C, so the client closes (sending queued mod-log entries)
+    # and queued writes are committed
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        client.run(os.getenv('DISCORD_TOKEN'))
+    finally:
+        store.close()
+        if gateway_recorder:
+            gateway_recorder.close()